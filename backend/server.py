@@ -1,8 +1,11 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, Cookie
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, Cookie, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne, UpdateMany, ReplaceOne, DeleteOne, ASCENDING, TEXT, ReturnDocument
+from pymongo.errors import OperationFailure, DuplicateKeyError, BulkWriteError
 import os
 import logging
 from pathlib import Path
@@ -15,9 +18,32 @@ import razorpay
 import httpx
 from enum import Enum
 import re
-import resend
 import asyncio
 import secrets
+import base64
+import json
+import hashlib
+import math
+import time
+import inspect
+import functools
+import csv
+import io
+from urllib.parse import urlencode
+from cachetools import TTLCache
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # only needed with RESPONSE_CACHE_BACKEND=redis
+    aioredis = None
+
+try:
+    import h2  # noqa: F401  httpx speaks HTTP/2 only when h2 is installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -34,10 +60,17 @@ logging.basicConfig(level=logging.INFO)
 
 razorpay_client = razorpay.Client(auth=(os.environ.get('RAZORPAY_KEY_ID', ''), os.environ.get('RAZORPAY_KEY_SECRET', '')))
 
-resend.api_key = os.environ.get('RESEND_API_KEY', '')
+RESEND_API_KEY = os.environ.get('RESEND_API_KEY', '')
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'noreply@mysocialcircle.in')
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'https://mysocialcircle.in')
 
+# Hot cache of session_token -> (User, expires_at). Entries live for a short TTL so
+# changes made through another worker (logout, role change) propagate quickly.
+session_cache = TTLCache(
+    maxsize=int(os.environ.get('SESSION_CACHE_SIZE', '10000')),
+    ttl=int(os.environ.get('SESSION_CACHE_TTL', '60'))
+)
+
 class Role(str, Enum):
     USER = "USER"
     MENTOR = "MENTOR"
@@ -158,10 +191,28 @@ class Payment(BaseModel):
     status: str
     created_at: datetime
 
+class BatchPurchaseRequest(BaseModel):
+    lead_ids: List[str] = Field(..., min_length=1, max_length=500)
+
+class BatchInviteRequest(BaseModel):
+    lead_ids: List[str] = Field(..., min_length=1, max_length=500)
+    ticket_price: float
+
+class BatchPassRequest(BaseModel):
+    lead_ids: List[str] = Field(..., min_length=1, max_length=500)
+
 class VerifyLeadRequest(BaseModel):
     status: str
     reason: Optional[str] = None
 
+class LeadDecision(BaseModel):
+    lead_id: str
+    status: str
+    reason: Optional[str] = None
+
+class BatchVerifyLeadsRequest(BaseModel):
+    decisions: List[LeadDecision] = Field(..., min_length=1, max_length=5000)
+
 class VerifyMentorRequest(BaseModel):
     status: str
     reason: Optional[str] = None
@@ -182,12 +233,126 @@ class Invitation(BaseModel):
 class InviteGuestRequest(BaseModel):
     ticket_price: float
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+# Response models for the list endpoints. Each one also drives the Mongo
+# projection of its query (see projection_of), so only returned fields are read.
+class BookingView(BaseModel):
+    lead_id: str
+    event_id: str
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    message: Optional[str] = None
+    status: str
+    created_at: Optional[datetime] = None
+    event_title: Optional[str] = None
+
+class GuestInvitationView(BaseModel):
+    invitation_id: str
+    lead_id: str
+    event_id: str
+    ticket_price: float = 0
+    status: str
+    invited_at: Optional[datetime] = None
+    paid_at: Optional[datetime] = None
+    event_title: Optional[str] = None
+    event_datetime: Optional[datetime] = None
+    event_description: Optional[str] = None
+    event_duration: Optional[int] = None
+    host_name: Optional[str] = None
+
+class TicketView(BaseModel):
+    ticket_id: str
+    invitation_id: str
+    event_id: str
+    ticket_price: float = 0
+    status: str
+    created_at: Optional[datetime] = None
+    event_title: Optional[str] = None
+    event_datetime: Optional[datetime] = None
+    event_description: Optional[str] = None
+    event_duration: Optional[int] = None
+    event_category: Optional[str] = None
+    host_name: Optional[str] = None
+
+class HostInvitationView(BaseModel):
+    invitation_id: str
+    lead_id: str
+    event_id: str
+    ticket_price: float = 0
+    status: str
+    invited_at: Optional[datetime] = None
+    paid_at: Optional[datetime] = None
+    guest_name: Optional[str] = None
+    guest_email: Optional[str] = None
+    event_title: Optional[str] = None
+
+class MentorView(BaseModel):
+    mentor_id: str
+    user_id: str
+    bio: Optional[str] = None
+    expertise: List[str] = []
+    experience: Optional[str] = None
+    verification_status: str = "PENDING"
+    created_at: Optional[datetime] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+
+class LeadView(BaseModel):
+    lead_id: str
+    event_id: str
+    user_id: str
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    message: Optional[str] = None
+    status: str
+    verification_status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    event_title: Optional[str] = None
+
+class MentorLeadView(BaseModel):
+    lead_id: str
+    event_id: str
+    user_id: str
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    message: Optional[str] = None
+    status: str
+    created_at: Optional[datetime] = None
+    event_title: Optional[str] = None
+    price_per_lead: float = 0
+
+# bcrypt costs ~250ms of CPU per call at the default cost, so it runs on a
+# dedicated pool instead of the event loop. Requests beyond the pool plus the
+# queue allowance are shed with a 503 rather than piling up.
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '64'))
 
-def verify_password(password: str, hashed: str) -> bool:
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+password_slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE)
+
+def bcrypt_hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+def bcrypt_check(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+async def run_password_task(fn, *args):
+    if password_slots.locked():
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
+    async with password_slots:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, fn, *args)
+
+async def hash_password(password: str) -> str:
+    return await run_password_task(bcrypt_hash, password)
+
+async def verify_password(password: str, hashed: str) -> bool:
+    if not hashed:
+        return False
+    return await run_password_task(bcrypt_check, password, hashed)
+
 def validate_email(email: str) -> bool:
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(pattern, email) is not None
@@ -196,12 +361,123 @@ def validate_phone(phone: str) -> bool:
     pattern = r'^[0-9]{10,15}$'
     return re.match(pattern, phone.replace('+', '').replace('-', '').replace(' ', '')) is not None
 
-async def send_email_async(to_email: str, subject: str, html_content: str):
-    """Send email using Resend API (async wrapper)"""
-    if not resend.api_key or resend.api_key == '':
-        logger.warning("Resend API key not configured, skipping email")
-        return None
-    
+# ==================== OUTBOUND HTTP ====================
+
+# Every upstream API (OAuth session exchange, Resend, and any added later) goes
+# through one pooled client opened on startup, so calls reuse keep-alive
+# connections instead of paying TCP+TLS setup. Each upstream has its own
+# circuit breaker so an outage fails fast instead of tying up requests.
+OAUTH_SESSION_URL = os.environ.get('OAUTH_SESSION_URL', 'https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data')
+RESEND_API_URL = os.environ.get('RESEND_API_URL', 'https://api.resend.com')
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', '10'))
+HTTP_MAX_CONNECTIONS = int(os.environ.get('HTTP_MAX_CONNECTIONS', '100'))
+HTTP_MAX_KEEPALIVE = int(os.environ.get('HTTP_MAX_KEEPALIVE', '20'))
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_SECONDS = float(os.environ.get('CIRCUIT_RESET_SECONDS', '30'))
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+class CircuitBreaker:
+    """Opens after consecutive failures; once reset_seconds pass, one trial call decides whether it closes"""
+    def __init__(self, name: str, threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+    
+    def before_call(self):
+        if self.opened_at is None:
+            return
+        if self.trial_running or time.monotonic() - self.opened_at < self.reset_seconds:
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+        self.trial_running = True
+    
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"Circuit for {self.name} closed")
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+    
+    def record_failure(self):
+        self.failures += 1
+        self.trial_running = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+circuit_breakers = {}
+http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared outbound client, created on first use if startup has not opened it"""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+        )
+    return http_client
+
+async def close_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+async def upstream_request(name: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request on the shared pool; transport errors and 5xx answers count against `name`'s circuit"""
+    if name not in circuit_breakers:
+        circuit_breakers[name] = CircuitBreaker(name, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+    breaker = circuit_breakers[name]
+    breaker.before_call()
+    failed = True
+    try:
+        response = await get_http_client().request(method, url, **kwargs)
+        failed = response.status_code >= 500
+        return response
+    finally:
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+# ==================== EMAIL OUTBOX ====================
+
+# Handlers write emails to the email_outbox collection and return immediately;
+# run_email_outbox() delivers them in the background with retries.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'resend')  # "resend" or "fake"
+OUTBOX_CONCURRENCY = int(os.environ.get('OUTBOX_CONCURRENCY', '4'))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '6'))
+OUTBOX_BACKOFF_SECONDS = float(os.environ.get('OUTBOX_BACKOFF_SECONDS', '30'))
+OUTBOX_POLL_SECONDS = float(os.environ.get('OUTBOX_POLL_SECONDS', '5'))
+OUTBOX_LEASE_SECONDS = 120
+
+class FakeResend:
+    """Offline stand-in for the Resend API: records messages instead of sending them"""
+    def __init__(self):
+        self.sent = []
+        self.fail_next = 0
+    
+    def send(self, params: dict) -> dict:
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise RuntimeError("Simulated Resend failure")
+        email_id = f"fake_{uuid.uuid4().hex[:12]}"
+        self.sent.append({"id": email_id, **params})
+        return {"id": email_id}
+
+fake_resend = FakeResend()
+outbox_wakeup = asyncio.Event()
+
+async def deliver_email(to_email: str, subject: str, html_content: str):
+    """Send one email now; raises on failure so the outbox can retry it"""
     params = {
         "from": SENDER_EMAIL,
         "to": [to_email],
@@ -209,229 +485,1019 @@ async def send_email_async(to_email: str, subject: str, html_content: str):
         "html": html_content
     }
     
+    if EMAIL_BACKEND == "fake":
+        return fake_resend.send(params)
+    
+    if not RESEND_API_KEY:
+        logger.warning("Resend API key not configured, skipping email")
+        return None
+    
+    response = await upstream_request(
+        "resend", "POST", f"{RESEND_API_URL}/emails",
+        json=params,
+        headers={"Authorization": f"Bearer {RESEND_API_KEY}"}
+    )
+    response.raise_for_status()
+    email = response.json()
+    logger.info(f"Email sent to {to_email}: {email.get('id')}")
+    return email
+
+def outbox_doc(to_email: str, subject: str, html_content: str, dedup_key: Optional[str] = None) -> dict:
+    outbox_id = f"mail_{uuid.uuid4().hex[:12]}"
+    now = datetime.now(timezone.utc)
+    return {
+        "outbox_id": outbox_id,
+        "dedup_key": dedup_key or outbox_id,
+        "to": to_email,
+        "subject": subject,
+        "html": html_content,
+        "status": "PENDING",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now
+    }
+
+async def enqueue_email(to_email: str, subject: str, html_content: str, dedup_key: Optional[str] = None):
+    """Queue an email for background delivery; a repeated dedup_key is dropped"""
+    try:
+        await db.email_outbox.insert_one(outbox_doc(to_email, subject, html_content, dedup_key))
+    except DuplicateKeyError:
+        logger.info(f"Email {dedup_key} already queued, skipping")
+        return
+    outbox_wakeup.set()
+
+async def enqueue_emails(messages: List[tuple]):
+    """Queue many (to, subject, html, dedup_key) emails with one insert_many"""
+    if not messages:
+        return
+    try:
+        await db.email_outbox.insert_many([outbox_doc(*message) for message in messages], ordered=False)
+    except BulkWriteError as e:
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+        logger.info(f"{len(e.details['writeErrors'])} emails already queued, skipping")
+    outbox_wakeup.set()
+
+async def claim_outbox_email():
+    """Lease the next due email; expired leases from crashed workers are reclaimed"""
+    now = datetime.now(timezone.utc)
+    return await db.email_outbox.find_one_and_update(
+        {"$or": [
+            {"status": "PENDING", "next_attempt_at": {"$lte": now}},
+            {"status": "SENDING", "lease_expires_at": {"$lte": now}}
+        ]},
+        {
+            "$set": {"status": "SENDING", "lease_expires_at": now + timedelta(seconds=OUTBOX_LEASE_SECONDS)},
+            "$inc": {"attempts": 1}
+        },
+        sort=[("next_attempt_at", ASCENDING)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def send_outbox_email(mail: dict):
     try:
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        logger.info(f"Email sent to {to_email}: {email.get('id')}")
-        return email
+        await deliver_email(mail["to"], mail["subject"], mail["html"])
     except Exception as e:
-        logger.error(f"Failed to send email to {to_email}: {str(e)}")
-        return None
+        if mail["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+            logger.error(f"Giving up on email {mail['outbox_id']} to {mail['to']}: {str(e)}")
+            update = {"status": "FAILED", "last_error": str(e)}
+        else:
+            delay = OUTBOX_BACKOFF_SECONDS * 2 ** (mail["attempts"] - 1)
+            logger.warning(f"Email {mail['outbox_id']} failed (attempt {mail['attempts']}), retrying in {delay}s: {str(e)}")
+            update = {
+                "status": "PENDING",
+                "last_error": str(e),
+                "next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=delay)
+            }
+        await db.email_outbox.update_one({"outbox_id": mail["outbox_id"]}, {"$set": update})
+        return
+    
+    await db.email_outbox.update_one(
+        {"outbox_id": mail["outbox_id"]},
+        {"$set": {"status": "SENT", "sent_at": datetime.now(timezone.utc)}, "$unset": {"html": ""}}
+    )
+
+async def drain_email_outbox() -> int:
+    """Deliver every email that is currently due, one by one; returns how many were attempted"""
+    attempted = 0
+    while True:
+        mail = await claim_outbox_email()
+        if not mail:
+            return attempted
+        await send_outbox_email(mail)
+        attempted += 1
+
+async def run_email_outbox():
+    """Background worker: keep at most OUTBOX_CONCURRENCY deliveries in flight"""
+    slots = asyncio.Semaphore(OUTBOX_CONCURRENCY)
+    in_flight = set()
+    
+    async def send_and_release(mail):
+        try:
+            await send_outbox_email(mail)
+        finally:
+            slots.release()
+    
+    while True:
+        await slots.acquire()
+        outbox_wakeup.clear()
+        try:
+            mail = await claim_outbox_email()
+        except Exception as e:
+            slots.release()
+            logger.error(f"Email outbox poll failed: {str(e)}")
+            await asyncio.sleep(OUTBOX_POLL_SECONDS)
+            continue
+        
+        if not mail:
+            slots.release()
+            try:
+                await asyncio.wait_for(outbox_wakeup.wait(), timeout=OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        
+        task = asyncio.create_task(send_and_release(mail))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
 
 def generate_verification_token() -> str:
     """Generate secure random token for email verification"""
     return secrets.token_urlsafe(32)
 
+# ==================== EMAIL TEMPLATES ====================
+
+# All email bodies live in templates/email and share layout.html. They are
+# compiled once at import; autoescaping covers user-supplied values such as
+# names and lead messages.
+email_env = Environment(
+    loader=FileSystemLoader(ROOT_DIR / "templates" / "email"),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+EMAIL_TEMPLATES = {
+    name: email_env.get_template(name)
+    for name in email_env.list_templates(extensions=["html"])
+    if name != "layout.html"
+}
+
+def render_email(template_name: str, /, **context) -> str:
+    return EMAIL_TEMPLATES[template_name].render(**context)
+
 def create_verification_email(name: str, verification_link: str) -> str:
     """Create HTML email for account verification"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; background-color: #f5f5f5; font-family: Arial, sans-serif;">
-        <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 20px;">
-            <tr>
-                <td align="center">
-                    <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                        <tr>
-                            <td style="background: linear-gradient(135deg, #064E3B 0%, #065F46 100%); padding: 40px; text-align: center; border-radius: 8px 8px 0 0;">
-                                <h1 style="color: #ffffff; margin: 0; font-size: 28px;">LeadBridge</h1>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 40px;">
-                                <h2 style="color: #064E3B; margin-top: 0;">Welcome to LeadBridge, {name}!</h2>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    Thank you for signing up. Please verify your email address to activate your account and start connecting with mentors.
-                                </p>
-                                <table width="100%" cellpadding="0" cellspacing="0" style="margin: 30px 0;">
-                                    <tr>
-                                        <td align="center">
-                                            <a href="{verification_link}" style="background-color: #064E3B; color: #ffffff; padding: 14px 32px; text-decoration: none; border-radius: 6px; font-weight: bold; display: inline-block;">
-                                                Verify Email Address
-                                            </a>
-                                        </td>
-                                    </tr>
-                                </table>
-                                <p style="color: #6B7280; font-size: 14px; line-height: 1.6;">
-                                    If the button doesn't work, copy and paste this link into your browser:<br>
-                                    <a href="{verification_link}" style="color: #064E3B; word-break: break-all;">{verification_link}</a>
-                                </p>
-                                <p style="color: #6B7280; font-size: 14px; line-height: 1.6; margin-top: 30px;">
-                                    This link will expire in 24 hours for security reasons.
-                                </p>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="background-color: #F3F4F6; padding: 20px; text-align: center; border-radius: 0 0 8px 8px;">
-                                <p style="color: #6B7280; font-size: 12px; margin: 0;">
-                                    © 2025 LeadBridge. All rights reserved.
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
+    return render_email("verification.html", name=name, verification_link=verification_link)
 
 def create_booking_confirmation_email(user_name: str, event_title: str, event_date: str) -> str:
     """Create HTML email for booking confirmation"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; background-color: #f5f5f5; font-family: Arial, sans-serif;">
-        <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 20px;">
-            <tr>
-                <td align="center">
-                    <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                        <tr>
-                            <td style="background: linear-gradient(135deg, #064E3B 0%, #065F46 100%); padding: 40px; text-align: center; border-radius: 8px 8px 0 0;">
-                                <h1 style="color: #ffffff; margin: 0; font-size: 28px;">Booking Confirmed!</h1>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 40px;">
-                                <h2 style="color: #064E3B; margin-top: 0;">Hi {user_name},</h2>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    Your booking has been successfully submitted and is now under review.
-                                </p>
-                                <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #F3F4F6; border-radius: 6px; padding: 20px; margin: 20px 0;">
-                                    <tr>
-                                        <td>
-                                            <p style="margin: 0 0 10px 0; color: #6B7280; font-size: 14px;"><strong>Event:</strong></p>
-                                            <p style="margin: 0 0 15px 0; color: #064E3B; font-size: 16px; font-weight: bold;">{event_title}</p>
-                                            <p style="margin: 0 0 10px 0; color: #6B7280; font-size: 14px;"><strong>Date:</strong></p>
-                                            <p style="margin: 0; color: #374151; font-size: 14px;">{event_date}</p>
-                                        </td>
-                                    </tr>
-                                </table>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    Your contact details will be verified and shared with the mentor. You'll receive a notification once the mentor reviews your booking.
-                                </p>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="background-color: #F3F4F6; padding: 20px; text-align: center; border-radius: 0 0 8px 8px;">
-                                <p style="color: #6B7280; font-size: 12px; margin: 0;">
-                                    © 2025 LeadBridge. All rights reserved.
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
+    return render_email("booking_confirmation.html", user_name=user_name, event_title=event_title, event_date=event_date)
 
 def create_mentor_approval_email(mentor_name: str, status: str) -> str:
     """Create HTML email for mentor approval/rejection"""
-    is_approved = status == "APPROVED"
-    title = "Application Approved!" if is_approved else "Application Update"
-    message = "Congratulations! Your mentor application has been approved." if is_approved else "Thank you for your interest. Unfortunately, your mentor application was not approved at this time."
-    
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; background-color: #f5f5f5; font-family: Arial, sans-serif;">
-        <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 20px;">
-            <tr>
-                <td align="center">
-                    <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                        <tr>
-                            <td style="background: linear-gradient(135deg, #064E3B 0%, #065F46 100%); padding: 40px; text-align: center; border-radius: 8px 8px 0 0;">
-                                <h1 style="color: #ffffff; margin: 0; font-size: 28px;">{title}</h1>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 40px;">
-                                <h2 style="color: #064E3B; margin-top: 0;">Hi {mentor_name},</h2>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    {message}
-                                </p>
-                                {('<p style="color: #374151; font-size: 16px; line-height: 1.6;">You can now create events and start receiving verified leads from potential students!</p>' if is_approved else '')}
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="background-color: #F3F4F6; padding: 20px; text-align: center; border-radius: 0 0 8px 8px;">
-                                <p style="color: #6B7280; font-size: 12px; margin: 0;">
-                                    © 2025 LeadBridge. All rights reserved.
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
+    return render_email("mentor_approval.html", mentor_name=mentor_name, is_approved=status == "APPROVED")
 
 def create_lead_notification_email(mentor_name: str, event_title: str, lead_count: int) -> str:
     """Create HTML email for new lead notification to mentor"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0;">
-    </head>
-    <body style="margin: 0; padding: 0; background-color: #f5f5f5; font-family: Arial, sans-serif;">
-        <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 20px;">
-            <tr>
-                <td align="center">
-                    <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                        <tr>
-                            <td style="background: linear-gradient(135deg, #064E3B 0%, #065F46 100%); padding: 40px; text-align: center; border-radius: 8px 8px 0 0;">
-                                <h1 style="color: #ffffff; margin: 0; font-size: 28px;">New Verified Lead!</h1>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 40px;">
-                                <h2 style="color: #064E3B; margin-top: 0;">Hi {mentor_name},</h2>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    Great news! You have {lead_count} new verified lead(s) for your event:
-                                </p>
-                                <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #F3F4F6; border-radius: 6px; padding: 20px; margin: 20px 0;">
-                                    <tr>
-                                        <td>
-                                            <p style="margin: 0; color: #064E3B; font-size: 18px; font-weight: bold;">{event_title}</p>
-                                        </td>
-                                    </tr>
-                                </table>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    Visit your dashboard to purchase and access the lead's contact details.
-                                </p>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="background-color: #F3F4F6; padding: 20px; text-align: center; border-radius: 0 0 8px 8px;">
-                                <p style="color: #6B7280; font-size: 12px; margin: 0;">
-                                    © 2025 LeadBridge. All rights reserved.
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
+    return render_email("lead_notification.html", mentor_name=mentor_name, event_title=event_title, lead_count=lead_count)
+
+def create_lead_purchase_email(host_name: str, event_title: str, lead: dict, amount: float, payment_code: str) -> str:
+    """Create HTML receipt with the purchased lead's contact details"""
+    return render_email("lead_purchase.html", host_name=host_name, event_title=event_title, lead=lead, amount=amount, payment_code=payment_code)
+
+def create_lead_purchase_batch_email(host_name: str, leads: List[dict], amount: float, payment_code: str) -> str:
+    """Create one HTML receipt listing every lead bought with a batch payment"""
+    return render_email("lead_purchase_batch.html", host_name=host_name, leads=leads, amount=amount, payment_code=payment_code)
+
+def create_invitation_email(guest_name: str, event_title: str, ticket_price: float) -> str:
+    """Create HTML email inviting a guest to pay for their ticket"""
+    return render_email("invitation.html", guest_name=guest_name, event_title=event_title, ticket_price=ticket_price)
+
+def create_pass_email(guest_name: str, event_title: str) -> str:
+    """Create HTML email telling a guest the host passed on them"""
+    return render_email("pass.html", guest_name=guest_name, event_title=event_title, events_url=f"{FRONTEND_URL}/events")
+
+def create_ticket_confirmation_email(guest_name: str, event_title: str, ticket_id: str, amount: float) -> str:
+    """Create HTML email confirming a paid ticket"""
+    return render_email("ticket_confirmation.html", guest_name=guest_name, event_title=event_title, ticket_id=ticket_id, amount=amount)
+
+# ==================== BATCHED LOOKUPS ====================
+
+async def fetch_map(collection, key: str, values, projection: Optional[dict] = None) -> dict:
+    """Fetch every document whose `key` is in `values` with one $in query, keyed by `key`"""
+    wanted = list({v for v in values if v is not None})
+    if not wanted:
+        return {}
+
+    fields = {"_id": 0}
+    if projection:
+        fields.update(projection)
+        fields[key] = 1
+
+    docs = await collection.find({key: {"$in": wanted}}, fields).to_list(None)
+    return {doc[key]: doc for doc in docs}
+
+def projection_of(model) -> dict:
+    """Mongo projection reading just the fields of a response model (derived ones are simply absent)"""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+# Event fields shown alongside a guest's invitations and tickets
+EVENT_SUMMARY_FIELDS = {"mentor_id": 1, "title": 1, "event_datetime": 1, "description": 1, "duration": 1, "category": 1}
+
+async def fetch_host_names(mentor_ids, approved_only: bool = False) -> dict:
+    """Map mentor_id -> host display name using one mentors query and one users query"""
+    mentors = await fetch_map(db.mentors, "mentor_id", mentor_ids, {"user_id": 1, "verification_status": 1})
+    if approved_only:
+        mentors = {k: m for k, m in mentors.items() if m.get("verification_status") == "APPROVED"}
+
+    users = await fetch_map(db.users, "user_id", [m.get("user_id") for m in mentors.values()], {"name": 1})
+    return {
+        mentor_id: users.get(mentor.get("user_id"), {}).get("name", "Unknown")
+        for mentor_id, mentor in mentors.items()
+    }
+
+async def fan_out(**steps) -> dict:
+    """
+    Run named queries with as much concurrency as their dependencies allow.
+    
+    Each step is a zero-argument coroutine function, or one whose parameter
+    names are other steps; it then starts as soon as those resolve and gets
+    their results. A step whose dependency resolved to None is skipped and
+    resolves to None too. Returns {name: result}.
+    
+        found = await fan_out(
+            lead=lambda: db.leads.find_one({"lead_id": lead_id}),
+            mentor=lambda: db.mentors.find_one({"user_id": user_id}),
+            event=lambda lead: db.events.find_one({"event_id": lead["event_id"]}),
+        )
+    """
+    tasks = {}
+    
+    async def run(step):
+        args = [await tasks[name] for name in inspect.signature(step).parameters]
+        if any(arg is None for arg in args):
+            return None
+        return await step(*args)
+    
+    # Tasks only start at the next await, so every step exists before any runs
+    for name, step in steps.items():
+        tasks[name] = asyncio.ensure_future(run(step))
+    try:
+        results = await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return dict(zip(tasks, results))
+
+def encode_cursor(values: dict) -> str:
+    """Encode the sort key of the last row of a page as an opaque keyset cursor"""
+    raw = json.dumps(values, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('utf-8').rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def created_range(created_from: Optional[datetime], created_to: Optional[datetime]) -> dict:
+    """Filter on created_at between two optional bounds (inclusive)"""
+    bounds = {}
+    if created_from:
+        bounds["$gte"] = created_from
+    if created_to:
+        bounds["$lte"] = created_to
+    return {"created_at": bounds} if bounds else {}
+
+async def keyset_page(collection, query: dict, id_field: str, projection: dict, cursor: Optional[str], limit: int, descending: bool = False):
+    """
+    One page of `query` ordered by (created_at, id_field), resuming after `cursor`.
+    
+    Returns (docs, next_cursor); next_cursor is None on the last page. Backed by
+    a (..., created_at, id_field) index, every page costs one index range scan
+    however deep into the collection it is.
+    """
+    op, direction = ("$lt", -1) if descending else ("$gt", 1)
+    if cursor:
+        after = decode_cursor(cursor)
+        try:
+            after_dt = datetime.fromisoformat(after["dt"])
+            after_id = after["id"]
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = {**query, "$or": [
+            {"created_at": {op: after_dt}},
+            {"created_at": after_dt, id_field: {op: after_id}}
+        ]}
+    
+    docs = await collection.find(query, projection).sort(
+        [("created_at", direction), (id_field, direction)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor({"dt": docs[-1]["created_at"], "id": docs[-1][id_field]})
+
+# ==================== TRANSACTIONS ====================
+
+# Multi-document transactions need a replica set or mongos; probed on first use
+transactions_available: Optional[bool] = None
+
+async def supports_transactions() -> bool:
+    """Whether the connected deployment accepts multi-document transactions"""
+    global transactions_available
+    if transactions_available is None:
+        try:
+            hello = await client.admin.command("hello")
+            transactions_available = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+        except Exception as e:
+            logger.warning(f"Could not probe MongoDB for transaction support: {str(e)}")
+            transactions_available = False
+        if not transactions_available:
+            logger.warning("MongoDB is not a replica set; multi-document writes run without transactions")
+    return transactions_available
+
+async def run_transaction(callback):
+    """
+    Await callback(session) inside a transaction and return its result.
+    
+    Transient conflicts (two transactions writing the same document) abort and
+    re-run the callback, so it must only write through the session and be safe
+    to repeat. On a standalone server the callback gets session=None and its
+    writes apply one by one.
+    """
+    if not await supports_transactions():
+        return await callback(None)
+    async with await client.start_session() as session:
+        return await session.with_transaction(callback)
+
+# ==================== IDEMPOTENCY ====================
+
+# Payment endpoints accept an Idempotency-Key header. The first response for a
+# key is stored in idempotency_keys (expired by a TTL index) and replayed to
+# retries of the same request instead of running the handler again.
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', '60'))
+
+def request_fingerprint(request: Request, body: bytes) -> str:
+    """Hash of method, path and body identifying what a key was first used for"""
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode('utf-8'))
+    digest.update(body)
+    return digest.hexdigest()
+
+async def claim_idempotency_key(key_id: str, fingerprint: str) -> Optional[dict]:
+    """Reserve a key for the current request; returns the existing record if it is taken"""
+    now = datetime.now(timezone.utc)
+    try:
+        await db.idempotency_keys.insert_one({
+            "_id": key_id,
+            "fingerprint": fingerprint,
+            "status": "IN_PROGRESS",
+            "created_at": now
+        })
+        return None
+    except DuplicateKeyError:
+        pass
+    
+    # A worker that died mid-request leaves its claim behind; take it over once stale
+    stale = await db.idempotency_keys.find_one_and_update(
+        {
+            "_id": key_id,
+            "fingerprint": fingerprint,
+            "status": "IN_PROGRESS",
+            "created_at": {"$lte": now - timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)}
+        },
+        {"$set": {"created_at": now}}
+    )
+    if stale:
+        return None
+    record = await db.idempotency_keys.find_one({"_id": key_id})
+    # Expired between the insert and the read: claim it afresh
+    return record or await claim_idempotency_key(key_id, fingerprint)
+
+def idempotent(handler):
+    """
+    Make an endpoint replay its stored response for a repeated Idempotency-Key.
+    
+    The endpoint must take `request` and `user`; keys are scoped per user.
+    Reusing a key for a different request is a 422, repeating one that is still
+    running a 409. A request that fails releases its key so it can be retried.
+    """
+    @functools.wraps(handler)
+    async def wrapper(*args, request: Request, user: User, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return await handler(*args, request=request, user=user, **kwargs)
+        if len(key) > 255:
+            raise HTTPException(status_code=400, detail="Idempotency-Key must be at most 255 characters")
+    
+        key_id = f"{user.user_id}:{key}"
+        fingerprint = request_fingerprint(request, await request.body())
+        record = await claim_idempotency_key(key_id, fingerprint)
+        if record:
+            if record["fingerprint"] != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            if record["status"] != "COMPLETED":
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+            return JSONResponse(record["response"], status_code=record["status_code"], headers={"Idempotent-Replayed": "true"})
+    
+        try:
+            result = await handler(*args, request=request, user=user, **kwargs)
+        except Exception:
+            await db.idempotency_keys.delete_one({"_id": key_id, "status": "IN_PROGRESS"})
+            raise
+        await db.idempotency_keys.update_one(
+            {"_id": key_id},
+            {"$set": {
+                "status": "COMPLETED",
+                "status_code": 200,
+                "response": jsonable_encoder(result),
+                "completed_at": datetime.now(timezone.utc)
+            }}
+        )
+        return result
+    
+    return wrapper
+
+# ==================== STATS COUNTERS ====================
+
+# The stats collection holds running counters so dashboards read O(1) documents:
+#   "global"            users, mentors, events, leads, leads_<STATUS>,
+#                       lead_revenue, lead_payments, ticket_revenue, ticket_payments
+#   "mentor:<id>"       events, leads, leads_<STATUS>, lead_revenue, lead_payments,
+#                       ticket_revenue, ticket_payments
+#   "event:<id>"        leads, leads_<STATUS>, ticket_revenue, ticket_payments
+# Handlers $inc them at each state transition; reconcile_stats() rebuilds them
+# from the source collections and reports drift.
+
+def lead_transition(from_status: Optional[str], to_status: str, count: int = 1) -> dict:
+    """Counter deltas for leads moving from one status to another (None = newly created)"""
+    if from_status == to_status:
+        return {}
+    deltas = {f"leads_{to_status}": count}
+    if from_status:
+        deltas[f"leads_{from_status}"] = -count
+    else:
+        deltas["leads"] = count
+    return deltas
+
+async def bump_stats(deltas: dict, mentor_id: Optional[str] = None, event_id: Optional[str] = None):
+    """$inc deltas on the global counters and, when given, the mentor's and event's"""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    keys = ["global"]
+    if mentor_id:
+        keys.append(f"mentor:{mentor_id}")
+    if event_id:
+        keys.append(f"event:{event_id}")
+    try:
+        await db.stats.bulk_write(
+            [UpdateOne({"_id": key}, {"$inc": deltas}, upsert=True) for key in keys],
+            ordered=False
+        )
+    except Exception as e:
+        # Counters are derived data; reconcile_stats() repairs any drift
+        logger.error(f"Failed to update stats {deltas} for {keys}: {str(e)}")
+
+async def get_stats(key: str) -> dict:
+    return await db.stats.find_one({"_id": key}) or {}
+
+async def compute_stats() -> dict:
+    """Rebuild every counter document from the source collections"""
+    docs = {"global": {}}
+
+    def add(key: str, field: str, value):
+        doc = docs.setdefault(key, {})
+        doc[field] = doc.get(field, 0) + value
+
+    users, mentors, events_by_mentor, leads, payments, tickets = await asyncio.gather(
+        db.users.count_documents({"role": "USER"}),
+        db.mentors.count_documents({}),
+        db.events.aggregate([{"$group": {"_id": "$mentor_id", "count": {"$sum": 1}}}]).to_list(None),
+        db.leads.aggregate([
+            {"$group": {"_id": {"event_id": "$event_id", "status": "$status"}, "count": {"$sum": 1}}},
+            {"$lookup": {"from": "events", "localField": "_id.event_id", "foreignField": "event_id", "as": "event"}},
+            {"$project": {"count": 1, "mentor_id": {"$arrayElemAt": ["$event.mentor_id", 0]}}}
+        ]).to_list(None),
+        db.payments.aggregate([
+            {"$match": {"status": "COMPLETED"}},
+            {"$group": {"_id": "$mentor_id", "revenue": {"$sum": "$amount"}, "count": {"$sum": 1}}}
+        ]).to_list(None),
+        db.ticket_payments.aggregate([
+            {"$match": {"status": "COMPLETED"}},
+            {"$lookup": {"from": "invitations", "localField": "invitation_id", "foreignField": "invitation_id", "as": "invitation"}},
+            {"$group": {
+                "_id": {
+                    "event_id": {"$arrayElemAt": ["$invitation.event_id", 0]},
+                    "mentor_id": {"$arrayElemAt": ["$invitation.host_id", 0]}
+                },
+                "revenue": {"$sum": "$amount"},
+                "count": {"$sum": 1}
+            }}
+        ]).to_list(None)
+    )
+
+    add("global", "users", users)
+    add("global", "mentors", mentors)
+    for row in events_by_mentor:
+        add("global", "events", row["count"])
+        add(f"mentor:{row['_id']}", "events", row["count"])
+    for row in leads:
+        keys = ["global", f"event:{row['_id']['event_id']}"]
+        if row.get("mentor_id"):
+            keys.append(f"mentor:{row['mentor_id']}")
+        for key in keys:
+            add(key, "leads", row["count"])
+            add(key, f"leads_{row['_id']['status']}", row["count"])
+    for row in payments:
+        for key in ["global", f"mentor:{row['_id']}"]:
+            add(key, "lead_revenue", row["revenue"])
+            add(key, "lead_payments", row["count"])
+    for row in tickets:
+        keys = ["global"]
+        if row["_id"].get("mentor_id"):
+            keys.append(f"mentor:{row['_id']['mentor_id']}")
+        if row["_id"].get("event_id"):
+            keys.append(f"event:{row['_id']['event_id']}")
+        for key in keys:
+            add(key, "ticket_revenue", row["revenue"])
+            add(key, "ticket_payments", row["count"])
+
+    return docs
+
+async def reconcile_stats(dry_run: bool = False) -> dict:
     """
+    Compare stored counters with freshly computed ones and, unless dry_run,
+    overwrite them. Increments that land while this runs may be lost, so run
+    it at a quiet time; the next reconcile picks them up.
+    """
+    actual, stored_docs = await asyncio.gather(
+        compute_stats(),
+        db.stats.find({}).to_list(None)
+    )
+    stored = {doc.pop("_id"): doc for doc in stored_docs}
+
+    drift = []
+    for key in sorted(set(actual) | set(stored)):
+        expected = actual.get(key, {})
+        current = stored.get(key, {})
+        for field in sorted(set(expected) | set(current)):
+            if expected.get(field, 0) != current.get(field, 0):
+                drift.append({
+                    "key": key,
+                    "field": field,
+                    "stored": current.get(field, 0),
+                    "actual": expected.get(field, 0)
+                })
+
+    if not dry_run and drift:
+        stale = [key for key in stored if key not in actual]
+        operations = [ReplaceOne({"_id": key}, values, upsert=True) for key, values in actual.items()]
+        operations += [DeleteOne({"_id": key}) for key in stale]
+        await db.stats.bulk_write(operations, ordered=False)
+
+    if drift:
+        logger.warning(f"Stats drift in {len(drift)} counters{' (dry run)' if dry_run else ', repaired'}")
+    return {"documents": len(actual), "drift": drift, "repaired": bool(drift) and not dry_run}
+
+# ==================== LIVE UPDATES ====================
+
+# Dashboards subscribe to /api/live (server-sent events) and receive small deltas
+# whenever a lead, invitation or ticket they can see changes. Deltas come from a
+# MongoDB change stream when the deployment supports one (replica set / Atlas);
+# otherwise the write handlers publish them through publish_change().
+LIVE_QUEUE_SIZE = int(os.environ.get('LIVE_QUEUE_SIZE', '100'))
+LIVE_HEARTBEAT_SECONDS = float(os.environ.get('LIVE_HEARTBEAT_SECONDS', '15'))
+LIVE_RETRY_SECONDS = float(os.environ.get('LIVE_RETRY_SECONDS', '30'))
+
+# Only these fields leave the server; guest contact details are never pushed
+LIVE_FIELDS = {
+    "leads": ("lead", ["lead_id", "event_id", "status", "verification_status", "invitation_id", "payment_id"]),
+    "invitations": ("invitation", ["invitation_id", "lead_id", "event_id", "status", "ticket_price", "invited_at", "paid_at"]),
+    "tickets": ("ticket", ["ticket_id", "invitation_id", "event_id", "status", "ticket_price", "created_at"]),
+}
+
+# Lead statuses a host's dashboard shows (see get_mentor_leads)
+MENTOR_HIDDEN_LEAD_STATUSES = {"PENDING", "REJECTED"}
+
+class LiveHub:
+    """In-process fan-out of deltas to the SSE connections of each audience"""
+    
+    def __init__(self):
+        self.subscribers = {}
+        self.change_streams = False
+    
+    def subscribe(self, audiences: List[str]) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+        for audience in audiences:
+            self.subscribers.setdefault(audience, set()).add(queue)
+        return queue
+    
+    def unsubscribe(self, audiences: List[str], queue: asyncio.Queue):
+        for audience in audiences:
+            queues = self.subscribers.get(audience)
+            if queues:
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[audience]
+    
+    def publish(self, audiences: List[str], message: dict):
+        for queue in {q for audience in audiences for q in self.subscribers.get(audience, ())}:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A stalled client: drop its backlog and tell it to refetch
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync", "op": "resync", "data": {}})
+
+live_hub = LiveHub()
+event_owner_cache = TTLCache(maxsize=10000, ttl=3600)
+
+async def event_owner(event_id: str) -> Optional[str]:
+    """mentor_id of an event; events never change hands, so it is cached"""
+    if event_id not in event_owner_cache:
+        event = await db.events.find_one({"event_id": event_id}, {"_id": 0, "mentor_id": 1})
+        if not event:
+            return None
+        event_owner_cache[event_id] = event["mentor_id"]
+    return event_owner_cache[event_id]
+
+async def route_change(collection: str, op: str, doc: dict):
+    """Deliver a whitelisted delta of `doc` to the guest and host who can see it"""
+    kind, fields = LIVE_FIELDS[collection]
+    audiences = []
+    if collection == "invitations":
+        audiences = [f"user:{doc.get('guest_id')}", f"mentor:{doc.get('host_id')}"]
+    else:
+        audiences.append(f"user:{doc.get('guest_id') if collection == 'tickets' else doc.get('user_id')}")
+        if collection == "tickets" or doc.get("status") not in MENTOR_HIDDEN_LEAD_STATUSES:
+            mentor_id = await event_owner(doc.get("event_id"))
+            if mentor_id:
+                audiences.append(f"mentor:{mentor_id}")
+    
+    if not any(audience in live_hub.subscribers for audience in audiences):
+        return
+    data = {field: doc[field] for field in fields if field in doc}
+    live_hub.publish(audiences, {"type": kind, "op": op, "data": data})
+
+async def publish_change(collection: str, op: str, doc: dict):
+    """Handler-side feed, used only while no change stream is delivering deltas"""
+    if live_hub.change_streams or not live_hub.subscribers:
+        return
+    try:
+        await route_change(collection, op, doc)
+    except Exception as e:
+        logger.error(f"Failed to publish {collection} change: {str(e)}")
+
+async def run_change_stream():
+    """Feed live_hub from a change stream; on a standalone mongod leave it to the handlers"""
+    pipeline = [{"$match": {
+        "ns.coll": {"$in": list(LIVE_FIELDS)},
+        "operationType": {"$in": ["insert", "update", "replace"]}
+    }}]
+    resume_token = None
+    while True:
+        try:
+            async with db.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                live_hub.change_streams = True
+                logger.info("Live updates fed by MongoDB change stream")
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    if change.get("fullDocument"):
+                        op = "insert" if change["operationType"] == "insert" else "update"
+                        await route_change(change["ns"]["coll"], op, change["fullDocument"])
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as e:
+            live_hub.change_streams = False
+            if e.code == 286:
+                # ChangeStreamHistoryLost: the resume token fell off the oplog
+                resume_token = None
+            if e.code == 40573:
+                # "The $changeStream stage is only supported on replica sets"
+                logger.info("Change streams unavailable, live updates fed by write handlers")
+                return
+            logger.error(f"Change stream failed, write handlers take over: {str(e)}")
+        except Exception as e:
+            live_hub.change_streams = False
+            logger.error(f"Change stream failed, write handlers take over: {str(e)}")
+        await asyncio.sleep(LIVE_RETRY_SECONDS)
+
+# ==================== RESPONSE CACHE ====================
+
+# Public event reads are served from a cache of rendered JSON bodies. Writes
+# that change what those endpoints return call invalidate_event_cache(): event
+# details are deleted by key, and list pages are orphaned by bumping a
+# generation counter that is part of every list key.
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')  # "memory", "redis" or "fake-redis"
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', '60'))
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '5000'))
+RESPONSE_CACHE_MAX_AGE = int(os.environ.get('RESPONSE_CACHE_MAX_AGE', '0'))
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+class MemoryCache:
+    """Per-worker TTL/LRU cache; other workers only see invalidations after the TTL"""
+    
+    def __init__(self, maxsize: int, ttl: int):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.counters = {}
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+    
+    async def set(self, key: str, value: bytes, ttl: int):
+        self.entries[key] = value
+    
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.entries.pop(key, None)
+    
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+    
+    async def get_counter(self, key: str) -> int:
+        return self.counters.get(key, 0)
+
+class RedisCache:
+    """Shared cache on a Redis-compatible store, so invalidations reach every worker"""
+    
+    def __init__(self, redis):
+        self.redis = redis
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.redis.get(key)
+    
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.redis.set(key, value, ex=ttl)
+    
+    async def delete(self, *keys: str):
+        if keys:
+            await self.redis.delete(*keys)
+    
+    async def incr(self, key: str) -> int:
+        return await self.redis.incr(key)
+    
+    async def get_counter(self, key: str) -> int:
+        return int(await self.redis.get(key) or 0)
+
+class FakeRedis:
+    """In-process stand-in for the subset of redis.asyncio.Redis that RedisCache uses"""
+    
+    def __init__(self):
+        self.data = {}
+    
+    def _live(self, key: str):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+    
+    async def get(self, key: str):
+        return self._live(key)
+    
+    async def set(self, key: str, value, ex: Optional[int] = None):
+        self.data[key] = (value, time.monotonic() + ex if ex else None)
+    
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.data.pop(key, None)
+    
+    async def incr(self, key: str) -> int:
+        value = int(self._live(key) or 0) + 1
+        self.data[key] = (str(value).encode(), None)
+        return value
+
+def create_response_cache():
+    if RESPONSE_CACHE_BACKEND == "redis":
+        if aioredis is None:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis needs the redis package (pip install redis)")
+        return RedisCache(aioredis.from_url(REDIS_URL))
+    if RESPONSE_CACHE_BACKEND == "fake-redis":
+        return RedisCache(FakeRedis())
+    return MemoryCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+response_cache = create_response_cache()
+
+def event_cache_key(event_id: str) -> str:
+    return f"resp:event:{event_id}"
+
+async def event_list_cache_key(request: Request) -> str:
+    generation = await response_cache.get_counter("resp:events:generation")
+    query = f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+    return f"resp:events:{generation}:{hashlib.sha1(query.encode('utf-8')).hexdigest()}"
+
+async def invalidate_event_cache(event_ids: List[str] = (), lists: bool = True):
+    """Drop cached details of `event_ids` and, when lists is set, every cached list page"""
+    try:
+        await response_cache.delete(*[event_cache_key(event_id) for event_id in event_ids])
+        if lists:
+            await response_cache.incr("resp:events:generation")
+    except Exception as e:
+        # The TTL bounds staleness if the cache store is unreachable
+        logger.error(f"Failed to invalidate event cache: {str(e)}")
+
+async def cached_json_response(request: Request, key: str, load) -> Response:
+    """
+    Serve `key` from the response cache, calling `load()` -> (body, headers) on a
+    miss. Adds an ETag and answers If-None-Match with 304.
+    """
+    entry = None
+    try:
+        cached = await response_cache.get(key)
+        if cached:
+            entry = json.loads(cached)
+    except Exception as e:
+        logger.error(f"Response cache read failed: {str(e)}")
+    
+    if entry is None:
+        body, headers = await load()
+        content = json.dumps(jsonable_encoder(body), separators=(",", ":"))
+        entry = {
+            "body": content,
+            "etag": f'"{hashlib.sha1(content.encode("utf-8")).hexdigest()}"',
+            "headers": headers
+        }
+        try:
+            await response_cache.set(key, json.dumps(entry).encode("utf-8"), RESPONSE_CACHE_TTL)
+        except Exception as e:
+            logger.error(f"Response cache write failed: {str(e)}")
+    
+    headers = {
+        **entry["headers"],
+        "ETag": entry["etag"],
+        "Cache-Control": f"public, max-age={RESPONSE_CACHE_MAX_AGE}" if RESPONSE_CACHE_MAX_AGE else "public, no-cache"
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry["etag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+# ==================== EVENT SEARCH ====================
+
+# /events/search ranks approved events against a text query over title,
+# description, category and the host's name and expertise (copied onto each
+# event as mentor_name and mentor_expertise), and counts matches per category
+# and price bucket. "mongo"
+# answers with the events text index and one $facet aggregation; "memory" keeps
+# a per-worker inverted index for local runs against stores without $text.
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'mongo')  # "mongo" or "memory"
+SEARCH_WEIGHTS = {"title": 10, "mentor_name": 5, "mentor_expertise": 5, "category": 3, "description": 1}
+SEARCH_STOP_WORDS = frozenset("a an and are as at be by for from in into is it of on or the to with".split())
+# Lower bounds in ₹, matching the catalog's price filter; the last bucket is open-ended
+PRICE_BUCKETS = [0, 1000, 2500, 5000]
+
+def search_terms(text: str) -> List[str]:
+    """Lowercased words minus stop words, with common suffixes stripped (a rough English stemmer)"""
+    terms = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in SEARCH_STOP_WORDS:
+            continue
+        for suffix in ("ing", "ed", "s"):
+            if word.endswith(suffix) and not word.endswith("ss") and len(word) - len(suffix) >= 3:
+                word = word[:-len(suffix)]
+                break
+        terms.append(word)
+    return terms
+
+def price_bucket(price: float) -> Optional[int]:
+    """Lower bound of the PRICE_BUCKETS bucket holding `price`, None below the first"""
+    bounds = [bound for bound in PRICE_BUCKETS if bound <= price]
+    return bounds[-1] if bounds else None
+
+def format_facets(categories: dict, prices: dict) -> dict:
+    """Facet counts as returned to clients; every price bucket is listed, empty or not"""
+    return {
+        "category": [
+            {"value": value, "count": count}
+            for value, count in sorted(categories.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        "price": [
+            {"min": bound, "max": upper, "count": prices.get(bound, 0)}
+            for bound, upper in zip(PRICE_BUCKETS, PRICE_BUCKETS[1:] + [None])
+        ]
+    }
+
+class SearchIndex:
+    """
+    Inverted index over approved events: term -> {event_id: weighted term count}.
+    
+    Rebuilt from Mongo on the first search after the event list cache generation
+    moves, or after RESPONSE_CACHE_TTL, since other workers' writes only bump
+    their own in-memory generation.
+    """
+    
+    def __init__(self):
+        self.generation = None
+        self.built_at = 0.0
+        self.events = {}
+        self.postings = {}
+    
+    async def refresh(self):
+        generation = await response_cache.get_counter("resp:events:generation")
+        if generation == self.generation and time.monotonic() - self.built_at < RESPONSE_CACHE_TTL:
+            return
+        built_at = time.monotonic()
+        events = await db.events.find({"mentor_approved": True}, {"_id": 0}).to_list(None)
+        postings = {}
+        for event in events:
+            for field, weight in SEARCH_WEIGHTS.items():
+                value = event.get(field) or ""
+                text = " ".join(value) if isinstance(value, list) else str(value)
+                for term in search_terms(text):
+                    matches = postings.setdefault(term, {})
+                    matches[event["event_id"]] = matches.get(event["event_id"], 0) + weight
+        self.events = {event["event_id"]: event for event in events}
+        self.postings = postings
+        self.generation, self.built_at = generation, built_at
+    
+    def search(self, terms: List[str]) -> List[tuple]:
+        """(event, score) for every event matching any term; rarer terms count for more"""
+        scores = {}
+        for term in set(terms):
+            matches = self.postings.get(term, {})
+            if not matches:
+                continue
+            idf = math.log(1 + len(self.events) / len(matches))
+            for event_id, weight in matches.items():
+                scores[event_id] = scores.get(event_id, 0) + weight * idf
+        return [(self.events[event_id], score) for event_id, score in scores.items()]
+
+search_index = SearchIndex()
+
+async def search_with_text_index(q: str, base: dict, category_match: dict, price_match: dict, limit: int) -> dict:
+    """One aggregation: the text match feeds the page, its total and both facets"""
+    found = await db.events.aggregate([
+        {"$match": {"mentor_approved": True, "$text": {"$search": q}, **base}},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+        {"$facet": {
+            "results": [
+                {"$match": {**category_match, **price_match}},
+                {"$sort": {"score": -1, "event_datetime": 1, "event_id": 1}},
+                {"$limit": limit},
+                {"$project": {"_id": 0}}
+            ],
+            "total": [{"$match": {**category_match, **price_match}}, {"$count": "n"}],
+            # Each facet ignores its own filter so clients can show the alternatives
+            "category": [{"$match": price_match}, {"$sortByCount": "$category"}],
+            "price": [
+                {"$match": category_match},
+                {"$bucket": {
+                    "groupBy": "$price_per_lead",
+                    "boundaries": PRICE_BUCKETS + [float("inf")],
+                    "default": "other",
+                    "output": {"count": {"$sum": 1}}
+                }}
+            ]
+        }}
+    ]).to_list(1)
+    facets = found[0]
+    return {
+        "results": facets["results"],
+        "total": facets["total"][0]["n"] if facets["total"] else 0,
+        "facets": format_facets(
+            {row["_id"]: row["count"] for row in facets["category"]},
+            {row["_id"]: row["count"] for row in facets["price"] if row["_id"] != "other"}
+        )
+    }
+
+async def search_with_memory_index(terms: List[str], upcoming_from: Optional[datetime], category: Optional[str],
+                                   min_price: Optional[float], max_price: Optional[float], limit: int) -> dict:
+    """The same contract as search_with_text_index, answered from SearchIndex"""
+    await search_index.refresh()
+    hits = []
+    for event, score in search_index.search(terms):
+        when = event["event_datetime"]
+        if upcoming_from and (when.replace(tzinfo=timezone.utc) if when.tzinfo is None else when) < upcoming_from:
+            continue
+        price = event["price_per_lead"]
+        hits.append((
+            {**event, "score": score},
+            category is None or event["category"] == category,
+            (min_price is None or price >= min_price) and (max_price is None or price <= max_price)
+        ))
+    
+    results = [event for event, in_category, in_price in hits if in_category and in_price]
+    results.sort(key=lambda e: (-e["score"], e["event_datetime"], e["event_id"]))
+    categories, prices = {}, {}
+    for event, in_category, in_price in hits:
+        if in_price:
+            categories[event["category"]] = categories.get(event["category"], 0) + 1
+        bucket = price_bucket(event["price_per_lead"])
+        if in_category and bucket is not None:
+            prices[bucket] = prices.get(bucket, 0) + 1
+    return {"results": results[:limit], "total": len(results), "facets": format_facets(categories, prices)}
 
 async def get_current_user(request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None) -> User:
     token = session_token
@@ -442,24 +1508,49 @@ async def get_current_user(request: Request, session_token: Optional[str] = Cook
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    session_doc = await db.user_sessions.find_one({"session_token": token}, {"_id": 0})
-    if not session_doc:
-        raise HTTPException(status_code=401, detail="Invalid session")
-    
-    expires_at = session_doc["expires_at"]
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at)
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    cached = session_cache.get(token)
+    if cached:
+        user, expires_at = cached
+    else:
+        # Session and user in a single round-trip
+        session_docs = await db.user_sessions.aggregate([
+            {"$match": {"session_token": token}},
+            {"$limit": 1},
+            {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "user_id", "as": "user"}},
+            {"$project": {"_id": 0, "expires_at": 1, "user": {"$arrayElemAt": ["$user", 0]}}},
+            # Only what User holds; password_hash and verification_token stay in Mongo
+            {"$project": {"expires_at": 1, **{f"user.{name}": 1 for name in User.model_fields}}}
+        ]).to_list(1)
+        if not session_docs:
+            raise HTTPException(status_code=401, detail="Invalid session")
+        session_doc = session_docs[0]
+        
+        expires_at = session_doc["expires_at"]
+        if isinstance(expires_at, str):
+            expires_at = datetime.fromisoformat(expires_at)
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        
+        if expires_at < datetime.now(timezone.utc):
+            raise HTTPException(status_code=401, detail="Session expired")
+        
+        if not session_doc.get("user"):
+            raise HTTPException(status_code=401, detail="User not found")
+        
+        user = User(**session_doc["user"])
+        session_cache[token] = (user, expires_at)
     
     if expires_at < datetime.now(timezone.utc):
+        session_cache.pop(token, None)
         raise HTTPException(status_code=401, detail="Session expired")
     
-    user_doc = await db.users.find_one({"user_id": session_doc["user_id"]}, {"_id": 0})
-    if not user_doc:
-        raise HTTPException(status_code=401, detail="User not found")
-    
-    return User(**user_doc)
+    return user
+
+def invalidate_cached_user(user_id: str):
+    """Drop cached sessions for a user; call after any write to their role or profile"""
+    for token, (cached_user, _) in list(session_cache.items()):
+        if cached_user.user_id == user_id:
+            session_cache.pop(token, None)
 
 async def require_role(user: User, allowed_roles: List[Role]):
     if user.role not in allowed_roles:
@@ -472,7 +1563,7 @@ async def register(data: RegisterRequest):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     user_id = f"user_{uuid.uuid4().hex[:12]}"
-    password_hash = hash_password(data.password)
+    password_hash = await hash_password(data.password)
     verification_token = generate_verification_token()
     
     user_doc = {
@@ -498,11 +1589,14 @@ async def register(data: RegisterRequest):
             "created_at": datetime.now(timezone.utc)
         }
         await db.mentors.insert_one(mentor_doc)
+        await bump_stats({"mentors": 1})
+    elif data.role == Role.USER:
+        await bump_stats({"users": 1})
     
     # Send verification email
     verification_link = f"{FRONTEND_URL}/verify-email?token={verification_token}"
     html_content = create_verification_email(data.name, verification_link)
-    await send_email_async(data.email, "Verify Your LeadBridge Account", html_content)
+    await enqueue_email(data.email, "Verify Your LeadBridge Account", html_content, f"verify-email:{user_id}")
     
     session_token = f"session_{uuid.uuid4().hex}"
     session_doc = {
@@ -535,7 +1629,7 @@ async def register(data: RegisterRequest):
 @api_router.post("/auth/login")
 async def login(data: LoginRequest):
     user_doc = await db.users.find_one({"email": data.email}, {"_id": 0})
-    if not user_doc or not verify_password(data.password, user_doc.get("password_hash", "")):
+    if not user_doc or not await verify_password(data.password, user_doc.get("password_hash", "")):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     session_token = f"session_{uuid.uuid4().hex}"
@@ -566,51 +1660,60 @@ async def login(data: LoginRequest):
 
 @api_router.post("/auth/session")
 async def exchange_session(data: SessionRequest):
-    async with httpx.AsyncClient() as http_client:
-        response = await http_client.get(
-            "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-            headers={"X-Session-ID": data.session_id}
-        )
-        if response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Invalid session")
-        
-        session_data = response.json()
-    
-    existing_user = await db.users.find_one({"email": session_data["email"]}, {"_id": 0})
-    
-    if existing_user:
-        user_id = existing_user["user_id"]
-        await db.users.update_one(
-            {"user_id": user_id},
-            {"$set": {
-                "name": session_data["name"],
-                "picture": session_data["picture"],
-                "email_verified": True
-            }}
-        )
-    else:
-        user_id = f"user_{uuid.uuid4().hex[:12]}"
-        user_doc = {
-            "user_id": user_id,
-            "email": session_data["email"],
-            "name": session_data["name"],
-            "picture": session_data.get("picture"),
-            "role": "USER",
-            "email_verified": True,
-            "created_at": datetime.now(timezone.utc)
-        }
-        await db.users.insert_one(user_doc)
+    try:
+        response = await upstream_request("oauth", "GET", OAUTH_SESSION_URL, headers={"X-Session-ID": data.session_id})
+    except (CircuitOpenError, httpx.HTTPError) as e:
+        logger.error(f"OAuth session exchange failed: {str(e)}")
+        raise HTTPException(status_code=503, detail="Sign-in is temporarily unavailable, please retry")
+    if response.status_code >= 500:
+        raise HTTPException(status_code=503, detail="Sign-in is temporarily unavailable, please retry")
+    if response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Invalid session")
+    
+    session_data = response.json()
+    
+    # Update the account or create it in one round-trip. Two first logins racing
+    # on the same email meet at the unique users.email index; the loser's retry
+    # then matches the winner's document and becomes a plain update.
+    now = datetime.now(timezone.utc)
+    new_user_id = f"user_{uuid.uuid4().hex[:12]}"
+    for attempt in range(2):
+        try:
+            user_doc = await db.users.find_one_and_update(
+                {"email": session_data["email"]},
+                {
+                    "$set": {
+                        "name": session_data["name"],
+                        "picture": session_data.get("picture"),
+                        "email_verified": True
+                    },
+                    "$setOnInsert": {"user_id": new_user_id, "role": "USER", "created_at": now}
+                },
+                projection=projection_of(User),
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            break
+        except DuplicateKeyError:
+            if attempt:
+                raise
+    created = user_doc["user_id"] == new_user_id
+    if not created:
+        invalidate_cached_user(user_doc["user_id"])
+        if user_doc["role"] == Role.MENTOR.value:
+            await sync_event_host_name(user_doc["user_id"], user_doc["name"])
     
     session_token = session_data["session_token"]
-    session_doc = {
-        "user_id": user_id,
-        "session_token": session_token,
-        "expires_at": datetime.now(timezone.utc) + timedelta(days=7),
-        "created_at": datetime.now(timezone.utc)
-    }
-    await db.user_sessions.insert_one(session_doc)
+    session_write = asyncio.gather(
+        db.user_sessions.insert_one({
+            "user_id": user_doc["user_id"],
+            "session_token": session_token,
+            "expires_at": now + timedelta(days=7),
+            "created_at": now
+        }),
+        bump_stats({"users": 1} if created else {})
+    )
     
-    user_doc = await db.users.find_one({"user_id": user_id}, {"_id": 0})
     response = JSONResponse(content={
         "user_id": user_doc["user_id"],
         "email": user_doc["email"],
@@ -628,6 +1731,7 @@ async def exchange_session(data: SessionRequest):
         path="/",
         max_age=7*24*60*60
     )
+    await session_write
     return response
 
 @api_router.get("/auth/verify-email/{token}")
@@ -647,6 +1751,7 @@ async def verify_email(token: str):
             "$unset": {"verification_token": "", "verification_token_expires": ""}
         }
     )
+    invalidate_cached_user(user["user_id"])
     
     return {"message": "Email verified successfully"}
 
@@ -658,56 +1763,239 @@ async def get_me(request: Request, session_token: Optional[str] = Cookie(None),
 @api_router.post("/auth/logout")
 async def logout(user: User = Depends(get_current_user), session_token: Optional[str] = Cookie(None)):
     if session_token:
+        session_cache.pop(session_token, None)
         await db.user_sessions.delete_one({"session_token": session_token})
     response = JSONResponse(content={"message": "Logged out"})
     response.delete_cookie("session_token", path="/")
     return response
 
+async def sync_event_host_name(user_id: str, name: str):
+    """Refresh the host name search reads from the host's events after it changed"""
+    mentor = await db.mentors.find_one({"user_id": user_id}, {"_id": 0, "mentor_id": 1})
+    if not mentor:
+        return
+    query = {"mentor_id": mentor["mentor_id"], "mentor_name": {"$ne": name}}
+    event_ids = await db.events.distinct("event_id", query)
+    if event_ids:
+        await db.events.update_many(query, {"$set": {"mentor_name": name}})
+        await invalidate_event_cache(event_ids)
+
+async def backfill_event_catalog():
+    """Denormalize mentor approval onto events and normalize legacy string datetimes"""
+    pending = await db.events.distinct("mentor_id", {"mentor_approved": {"$exists": False}})
+    if pending:
+        approved = await db.mentors.distinct("mentor_id", {"mentor_id": {"$in": pending}, "verification_status": "APPROVED"})
+        await db.events.update_many(
+            {"mentor_id": {"$in": approved}, "mentor_approved": {"$exists": False}},
+            {"$set": {"mentor_approved": True}}
+        )
+        await db.events.update_many(
+            {"mentor_approved": {"$exists": False}},
+            {"$set": {"mentor_approved": False}}
+        )
+    
+    legacy = await db.events.find(
+        {"event_datetime": {"$type": "string"}},
+        {"_id": 0, "event_id": 1, "event_datetime": 1}
+    ).to_list(None)
+    if legacy:
+        await db.events.bulk_write([
+            UpdateOne({"event_id": e["event_id"]}, {"$set": {"event_datetime": datetime.fromisoformat(e["event_datetime"])}})
+            for e in legacy
+        ])
+        logger.info(f"Normalized event_datetime on {len(legacy)} events")
+    
+    # Search ranks events on their host's name and expertise
+    unnamed = await db.events.distinct("mentor_id", {"mentor_name": {"$exists": False}})
+    if unnamed:
+        host_names = await fetch_host_names(unnamed)
+        await db.events.bulk_write([
+            UpdateMany(
+                {"mentor_id": mentor_id, "mentor_name": {"$exists": False}},
+                {"$set": {"mentor_name": host_names.get(mentor_id, "Unknown")}}
+            )
+            for mentor_id in unnamed
+        ])
+    
+    unindexed = await db.events.distinct("mentor_id", {"mentor_expertise": {"$exists": False}})
+    if unindexed:
+        mentors = await fetch_map(db.mentors, "mentor_id", unindexed, {"expertise": 1})
+        await db.events.bulk_write([
+            UpdateMany(
+                {"mentor_id": mentor_id, "mentor_expertise": {"$exists": False}},
+                {"$set": {"mentor_expertise": mentors.get(mentor_id, {}).get("expertise", [])}}
+            )
+            for mentor_id in unindexed
+        ])
+
 @api_router.get("/events")
-async def get_events():
-    events = await db.events.find({}, {"_id": 0}).to_list(1000)
+async def get_events(
+    request: Request,
+    category: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    upcoming: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500)
+):
+    return await cached_json_response(request, await event_list_cache_key(request), lambda: load_events(
+        category, date_from, date_to, min_price, max_price, upcoming, cursor, limit
+    ))
+
+async def load_events(category, date_from, date_to, min_price, max_price, upcoming, cursor, limit):
+    query = {"mentor_approved": True}
+    if category:
+        query["category"] = category
+    
+    if upcoming:
+        now = datetime.now(timezone.utc)
+        if not date_from or date_from.replace(tzinfo=date_from.tzinfo or timezone.utc) < now:
+            date_from = now
+    if date_from or date_to:
+        query["event_datetime"] = {}
+        if date_from:
+            query["event_datetime"]["$gte"] = date_from
+        if date_to:
+            query["event_datetime"]["$lte"] = date_to
+    
+    if min_price is not None or max_price is not None:
+        query["price_per_lead"] = {}
+        if min_price is not None:
+            query["price_per_lead"]["$gte"] = min_price
+        if max_price is not None:
+            query["price_per_lead"]["$lte"] = max_price
+    
+    # Keyset pagination on (event_datetime, event_id)
+    if cursor:
+        after = decode_cursor(cursor)
+        try:
+            after_dt = datetime.fromisoformat(after["dt"])
+            after_id = after["id"]
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["$or"] = [
+            {"event_datetime": {"$gt": after_dt}},
+            {"event_datetime": after_dt, "event_id": {"$gt": after_id}}
+        ]
+    
+    events = await db.events.find(query, {"_id": 0}).sort(
+        [("event_datetime", 1), ("event_id", 1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    headers = {}
+    if len(events) > limit:
+        events = events[:limit]
+        last = events[-1]
+        headers["X-Next-Cursor"] = encode_cursor({"dt": last["event_datetime"], "id": last["event_id"]})
+    
+    host_names = await fetch_host_names([e["mentor_id"] for e in events], approved_only=True)
     for event in events:
         if isinstance(event['event_datetime'], str):
             event['event_datetime'] = datetime.fromisoformat(event['event_datetime'])
         if isinstance(event['created_at'], str):
             event['created_at'] = datetime.fromisoformat(event['created_at'])
         
-        mentor = await db.mentors.find_one({"mentor_id": event["mentor_id"]}, {"_id": 0})
-        if mentor and mentor.get("verification_status") == "APPROVED":
-            user = await db.users.find_one({"user_id": mentor["user_id"]}, {"_id": 0})
-            event["mentor_name"] = user.get("name", "Unknown")
-    
-    return [e for e in events if e.get("mentor_name")]
+        if event["mentor_id"] in host_names:
+            event["mentor_name"] = host_names[event["mentor_id"]]
+    
+    return [e for e in events if e.get("mentor_name")], headers
+
+@api_router.get("/events/search")
+async def search_events(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    upcoming: bool = False,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Approved events ranked against `q`, with category and price facet counts"""
+    return await cached_json_response(request, await event_list_cache_key(request), lambda: load_search(
+        q, category, min_price, max_price, upcoming, limit
+    ))
+
+async def load_search(q, category, min_price, max_price, upcoming, limit):
+    terms = search_terms(q)
+    if not terms:
+        return {"results": [], "total": 0, "facets": format_facets({}, {})}, {}
+    
+    upcoming_from = datetime.now(timezone.utc) if upcoming else None
+    if SEARCH_BACKEND == "memory":
+        found = await search_with_memory_index(terms, upcoming_from, category, min_price, max_price, limit)
+    else:
+        base = {"event_datetime": {"$gte": upcoming_from}} if upcoming_from else {}
+        category_match = {"category": category} if category else {}
+        price_match = {}
+        if min_price is not None or max_price is not None:
+            price_match["price_per_lead"] = {}
+            if min_price is not None:
+                price_match["price_per_lead"]["$gte"] = min_price
+            if max_price is not None:
+                price_match["price_per_lead"]["$lte"] = max_price
+        found = await search_with_text_index(q, base, category_match, price_match, limit)
+    
+    host_names = await fetch_host_names([e["mentor_id"] for e in found["results"]], approved_only=True)
+    for event in found["results"]:
+        event["mentor_name"] = host_names.get(event["mentor_id"])
+        event["score"] = round(event["score"], 4)
+    found["results"] = [e for e in found["results"] if e["mentor_name"]]
+    return found, {}
 
 @api_router.get("/events/{event_id}")
-async def get_event(event_id: str):
-    event = await db.events.find_one({"event_id": event_id}, {"_id": 0})
-    if not event:
+async def get_event(event_id: str, request: Request):
+    return await cached_json_response(request, event_cache_key(event_id), lambda: load_event(event_id))
+
+async def load_event(event_id: str):
+    # Event, host profile and host name in one round-trip
+    found = await db.events.aggregate([
+        {"$match": {"event_id": event_id}},
+        {"$limit": 1},
+        {"$lookup": {"from": "mentors", "localField": "mentor_id", "foreignField": "mentor_id", "as": "mentor"}},
+        {"$addFields": {"mentor": {"$arrayElemAt": ["$mentor", 0]}}},
+        {"$lookup": {"from": "users", "localField": "mentor.user_id", "foreignField": "user_id", "as": "mentor_user"}},
+        {"$project": {
+            "_id": 0,
+            "mentor._id": 0,
+            "mentor_user._id": 0,
+            "mentor_user.password_hash": 0,
+            "mentor_user.verification_token": 0
+        }}
+    ]).to_list(1)
+    if not found:
         raise HTTPException(status_code=404, detail="Event not found")
+    event = found[0]
+    mentor = event.pop("mentor", None)
+    mentor_users = event.pop("mentor_user", [])
     
     if isinstance(event['event_datetime'], str):
         event['event_datetime'] = datetime.fromisoformat(event['event_datetime'])
     if isinstance(event['created_at'], str):
         event['created_at'] = datetime.fromisoformat(event['created_at'])
     
-    mentor = await db.mentors.find_one({"mentor_id": event["mentor_id"]}, {"_id": 0})
     if mentor:
-        user = await db.users.find_one({"user_id": mentor["user_id"]}, {"_id": 0})
-        event["mentor_name"] = user.get("name", "Unknown")
+        event["mentor_name"] = mentor_users[0].get("name", "Unknown") if mentor_users else "Unknown"
         event["mentor_bio"] = mentor.get("bio", "")
         event["mentor_expertise"] = mentor.get("expertise", [])
     
-    return event
+    return event, {}
 
 @api_router.post("/events/{event_id}/book")
 async def book_event(event_id: str, data: BookingCreate, user: User = Depends(get_current_user)):
     await require_role(user, [Role.USER])
     
-    event = await db.events.find_one({"event_id": event_id})
+    # Reserve a slot atomically so concurrent bookings can never oversell
+    event = await db.events.find_one_and_update(
+        {"event_id": event_id, "available_slots": {"$gt": 0}},
+        {"$inc": {"available_slots": -1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
     if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    if event.get("available_slots", 0) <= 0:
+        if not await db.events.count_documents({"event_id": event_id}, limit=1):
+            raise HTTPException(status_code=404, detail="Event not found")
         raise HTTPException(status_code=400, detail="No slots available")
     
     is_valid_email = validate_email(data.email)
@@ -728,12 +2016,16 @@ async def book_event(event_id: str, data: BookingCreate, user: User = Depends(ge
         "verification_status": verification_status,
         "created_at": datetime.now(timezone.utc)
     }
-    await db.leads.insert_one(lead_doc)
-    
-    await db.events.update_one(
-        {"event_id": event_id},
-        {"$inc": {"available_slots": -1}}
-    )
+    try:
+        await db.leads.insert_one(lead_doc)
+    except Exception:
+        # Give the reserved slot back
+        await db.events.update_one({"event_id": event_id}, {"$inc": {"available_slots": 1}})
+        raise
+    finally:
+        await invalidate_event_cache([event_id])
+    await bump_stats(lead_transition(None, lead_doc["status"]), event.get("mentor_id"), event_id)
+    await publish_change("leads", "insert", lead_doc)
     
     # Send booking confirmation email
     event_date = event.get("event_datetime", datetime.now(timezone.utc))
@@ -744,7 +2036,7 @@ async def book_event(event_id: str, data: BookingCreate, user: User = Depends(ge
         event.get("title", "Event"),
         event_date.strftime("%B %d, %Y at %I:%M %p")
     )
-    await send_email_async(data.email, "Booking Confirmed - LeadBridge", html_content)
+    await enqueue_email(data.email, "Booking Confirmed - LeadBridge", html_content, f"booking:{lead_id}")
     
     # Notify mentor of new lead if auto-verified
     if verification_status == "AUTO_VERIFIED":
@@ -752,28 +2044,26 @@ async def book_event(event_id: str, data: BookingCreate, user: User = Depends(ge
         if mentor:
             mentor_user = await db.users.find_one({"user_id": mentor["user_id"]}, {"_id": 0})
             if mentor_user:
-                lead_count = await db.leads.count_documents({
-                    "event_id": event_id,
-                    "status": "VERIFIED"
-                })
+                lead_count = (await get_stats(f"event:{event_id}")).get("leads_VERIFIED", 0)
                 html_content = create_lead_notification_email(
                     mentor_user["name"],
                     event.get("title", "Your Event"),
                     lead_count
                 )
-                await send_email_async(mentor_user["email"], "New Verified Lead - LeadBridge", html_content)
+                await enqueue_email(mentor_user["email"], "New Verified Lead - LeadBridge", html_content, f"new-lead:{lead_id}")
     
     return {"lead_id": lead_id, "message": "Booking successful"}
 
-@api_router.get("/user/bookings")
+@api_router.get("/user/bookings", response_model=List[BookingView])
 async def get_user_bookings(user: User = Depends(get_current_user)):
     await require_role(user, [Role.USER])
     
-    leads = await db.leads.find({"user_id": user.user_id}, {"_id": 0}).to_list(1000)
+    leads = await db.leads.find({"user_id": user.user_id}, projection_of(BookingView)).to_list(1000)
+    events = await fetch_map(db.events, "event_id", [l["event_id"] for l in leads], {"title": 1})
     for lead in leads:
         if isinstance(lead.get('created_at'), str):
             lead['created_at'] = datetime.fromisoformat(lead['created_at'])
-        event = await db.events.find_one({"event_id": lead["event_id"]}, {"_id": 0})
+        event = events.get(lead["event_id"])
         if event:
             lead["event_title"] = event.get("title", "Unknown")
     
@@ -797,11 +2087,23 @@ async def update_mentor_profile(data: MentorProfileUpdate, user: User = Depends(
     if not update_data:
         raise HTTPException(status_code=400, detail="No data to update")
     
-    await db.mentors.update_one(
+    mentor = await db.mentors.find_one_and_update(
         {"user_id": user.user_id},
-        {"$set": update_data}
+        {"$set": update_data},
+        projection={"_id": 0, "mentor_id": 1}
     )
     
+    # Event details embed the host's bio and expertise; of the list pages only
+    # search results depend on expertise, through the copy on each event
+    if mentor:
+        if "expertise" in update_data:
+            await db.events.update_many(
+                {"mentor_id": mentor["mentor_id"]},
+                {"$set": {"mentor_expertise": update_data["expertise"]}}
+            )
+        event_ids = await db.events.distinct("event_id", {"mentor_id": mentor["mentor_id"]})
+        await invalidate_event_cache(event_ids, lists="expertise" in update_data)
+    
     return {"message": "Profile updated"}
 
 @api_router.get("/mentor/events")
@@ -837,9 +2139,14 @@ async def create_event(data: EventCreate, user: User = Depends(get_current_user)
         "event_id": event_id,
         "mentor_id": mentor["mentor_id"],
         **data.model_dump(),
+        "mentor_approved": True,
+        "mentor_name": user.name,
+        "mentor_expertise": mentor.get("expertise", []),
         "created_at": datetime.now(timezone.utc)
     }
     await db.events.insert_one(event_doc)
+    await bump_stats({"events": 1}, mentor["mentor_id"])
+    await invalidate_event_cache([event_id])
     
     return {"event_id": event_id, "message": "Event created"}
 
@@ -856,6 +2163,7 @@ async def update_event(event_id: str, data: EventUpdate, user: User = Depends(ge
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     if update_data:
         await db.events.update_one({"event_id": event_id}, {"$set": update_data})
+        await invalidate_event_cache([event_id])
     
     return {"message": "Event updated"}
 
@@ -869,26 +2177,29 @@ async def delete_event(event_id: str, user: User = Depends(get_current_user)):
     if not event or event.get("mentor_id") != mentor.get("mentor_id"):
         raise HTTPException(status_code=404, detail="Event not found")
     
-    await db.events.delete_one({"event_id": event_id})
+    result = await db.events.delete_one({"event_id": event_id})
+    if result.deleted_count:
+        await bump_stats({"events": -1}, event["mentor_id"])
+        await invalidate_event_cache([event_id])
     return {"message": "Event deleted"}
 
-@api_router.get("/mentor/leads")
+@api_router.get("/mentor/leads", response_model=List[MentorLeadView])
 async def get_mentor_leads(user: User = Depends(get_current_user)):
     await require_role(user, [Role.MENTOR])
     
-    mentor = await db.mentors.find_one({"user_id": user.user_id}, {"_id": 0})
+    mentor = await db.mentors.find_one({"user_id": user.user_id}, {"_id": 0, "mentor_id": 1})
     if not mentor:
         raise HTTPException(status_code=404, detail="Mentor profile not found")
     
-    events = await db.events.find({"mentor_id": mentor["mentor_id"]}, {"_id": 0}).to_list(1000)
-    event_ids = [e["event_id"] for e in events]
+    events = await db.events.find({"mentor_id": mentor["mentor_id"]}, {"_id": 0, "event_id": 1, "title": 1, "price_per_lead": 1}).to_list(1000)
+    events_by_id = {e["event_id"]: e for e in events}
     
-    leads = await db.leads.find({"event_id": {"$in": event_ids}, "status": {"$in": ["VERIFIED", "PURCHASED"]}}, {"_id": 0}).to_list(1000)
+    leads = await db.leads.find({"event_id": {"$in": list(events_by_id)}, "status": {"$in": ["VERIFIED", "PURCHASED"]}}, projection_of(MentorLeadView)).to_list(1000)
     
     for lead in leads:
         if isinstance(lead.get('created_at'), str):
             lead['created_at'] = datetime.fromisoformat(lead['created_at'])
-        event = await db.events.find_one({"event_id": lead["event_id"]}, {"_id": 0})
+        event = events_by_id.get(lead["event_id"])
         if event:
             lead["event_title"] = event.get("title", "Unknown")
             lead["price_per_lead"] = event.get("price_per_lead", 0)
@@ -901,10 +2212,16 @@ async def get_mentor_leads(user: User = Depends(get_current_user)):
     return leads
 
 @api_router.post("/mentor/leads/{lead_id}/purchase")
-async def purchase_lead(lead_id: str, user: User = Depends(get_current_user)):
+@idempotent
+async def purchase_lead(lead_id: str, request: Request, user: User = Depends(get_current_user)):
     await require_role(user, [Role.MENTOR])
     
-    lead = await db.leads.find_one({"lead_id": lead_id}, {"_id": 0})
+    found = await fan_out(
+        lead=lambda: db.leads.find_one({"lead_id": lead_id}, {"_id": 0}),
+        mentor=lambda: db.mentors.find_one({"user_id": user.user_id}, {"_id": 0}),
+        event=lambda lead: db.events.find_one({"event_id": lead["event_id"]}, {"_id": 0})
+    )
+    lead, mentor, event = found["lead"], found["mentor"], found["event"]
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
     
@@ -914,10 +2231,7 @@ async def purchase_lead(lead_id: str, user: User = Depends(get_current_user)):
     if lead.get("status") != "VERIFIED":
         raise HTTPException(status_code=400, detail="Lead not verified yet")
     
-    event = await db.events.find_one({"event_id": lead["event_id"]}, {"_id": 0})
-    mentor = await db.mentors.find_one({"user_id": user.user_id}, {"_id": 0})
-    
-    if event.get("mentor_id") != mentor.get("mentor_id"):
+    if not event or not mentor or event.get("mentor_id") != mentor.get("mentor_id"):
         raise HTTPException(status_code=403, detail="Not authorized")
     
     amount = event.get("price_per_lead", 0)
@@ -970,6 +2284,7 @@ async def purchase_lead(lead_id: str, user: User = Depends(get_current_user)):
     # }
 
 @api_router.post("/mentor/payment-verify")
+@idempotent
 async def verify_payment(request: Request, user: User = Depends(get_current_user)):
     await require_role(user, [Role.MENTOR])
     
@@ -981,7 +2296,11 @@ async def verify_payment(request: Request, user: User = Depends(get_current_user
         raise HTTPException(status_code=400, detail="Missing payment details")
     
     # DEMO PAYMENT VERIFICATION
-    payment = await db.payments.find_one({"payment_id": payment_id}, {"_id": 0})
+    found = await fan_out(
+        payment=lambda: db.payments.find_one({"payment_id": payment_id}, {"_id": 0}),
+        mentor=lambda: db.mentors.find_one({"user_id": user.user_id}, {"_id": 0})
+    )
+    payment, mentor = found["payment"], found["mentor"]
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
     
@@ -989,91 +2308,68 @@ async def verify_payment(request: Request, user: User = Depends(get_current_user
     if payment.get("demo_payment_code") != demo_payment_code:
         raise HTTPException(status_code=400, detail="Invalid payment code")
     
-    # Update payment status
-    await db.payments.update_one(
-        {"payment_id": payment_id},
-        {"$set": {"status": "COMPLETED", "completed_at": datetime.now(timezone.utc)}}
-    )
+    if payment.get("lead_ids"):
+        raise HTTPException(status_code=400, detail="Batch payments are verified via /mentor/payment-verify-batch")
     
-    # Update lead status
-    mentor = await db.mentors.find_one({"user_id": user.user_id}, {"_id": 0})
-    await db.leads.update_one(
-        {"lead_id": payment["lead_id"]},
-        {"$set": {
-            "status": "PURCHASED",
-            "purchased_by": mentor["mentor_id"],
-            "payment_id": payment_id,
-            "purchased_at": datetime.now(timezone.utc)
-        }}
+    # A repeated verification must not move the lead back to PURCHASED or resend the receipt
+    if payment.get("status") == "COMPLETED":
+        lead = await db.leads.find_one({"lead_id": payment["lead_id"]}, {"_id": 0})
+        return {"message": "Payment verified successfully", "lead": lead}
+    
+    # Mark the lead purchased only while it is still VERIFIED (a batch payment may
+    # have bought it since checkout); the payment completes only if that matched,
+    # and only the first verification counts towards revenue
+    lead_update = {
+        "status": "PURCHASED",
+        "purchased_by": mentor["mentor_id"],
+        "payment_id": payment_id,
+        "purchased_at": datetime.now(timezone.utc)
+    }
+    written = await fan_out(
+        previous=lambda: db.leads.find_one_and_update(
+            {"lead_id": payment["lead_id"], "status": "VERIFIED"},
+            {"$set": lead_update},
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        ),
+        payment_result=lambda previous: db.payments.update_one(
+            {"payment_id": payment_id, "status": {"$ne": "COMPLETED"}},
+            {"$set": {"status": "COMPLETED", "completed_at": datetime.now(timezone.utc)}}
+        ),
+        event=lambda previous: db.events.find_one({"event_id": previous["event_id"]}, {"_id": 0})
     )
+    previous, event = written["previous"], written["event"]
+    if not previous:
+        lead = await db.leads.find_one({"lead_id": payment["lead_id"]}, {"_id": 0})
+        # A concurrent duplicate of this verification got there first
+        if lead and lead.get("payment_id") == payment_id:
+            return {"message": "Payment verified successfully", "lead": lead}
+        raise HTTPException(status_code=400, detail="Lead already purchased")
     
     # Get lead details to send email
-    lead = await db.leads.find_one({"lead_id": payment["lead_id"]}, {"_id": 0})
-    event = await db.events.find_one({"event_id": lead["event_id"]}, {"_id": 0})
+    lead = {**previous, **lead_update}
+    
+    revenue = {"lead_revenue": payment.get("amount", 0), "lead_payments": 1} if written["payment_result"].modified_count else {}
+    await asyncio.gather(
+        bump_stats(lead_transition(previous.get("status"), "PURCHASED"), event.get("mentor_id"), lead["event_id"]),
+        bump_stats(revenue, payment["mentor_id"]),
+        publish_change("leads", "update", lead)
+    )
     
     # Send email with lead details
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; background-color: #f5f5f5; font-family: Arial, sans-serif;">
-        <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 20px;">
-            <tr>
-                <td align="center">
-                    <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                        <tr>
-                            <td style="background: linear-gradient(135deg, #0A1628 0%, #243B53 100%); padding: 40px; text-align: center; border-radius: 8px 8px 0 0;">
-                                <h1 style="color: #ffffff; margin: 0; font-size: 28px;">Lead Purchase Successful!</h1>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 40px;">
-                                <h2 style="color: #0A1628; margin-top: 0;">Hi {user.name},</h2>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    You have successfully purchased a lead for your event: <strong>{event.get("title", "")}</strong>
-                                </p>
-                                <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #F3F4F6; border-radius: 6px; padding: 20px; margin: 20px 0;">
-                                    <tr>
-                                        <td>
-                                            <p style="margin: 0 0 10px 0; color: #6B7280; font-size: 14px;"><strong>Lead Details:</strong></p>
-                                            <p style="margin: 0 0 10px 0; color: #0A1628;"><strong>Name:</strong> {lead.get("name")}</p>
-                                            <p style="margin: 0 0 10px 0; color: #0A1628;"><strong>Email:</strong> {lead.get("email")}</p>
-                                            <p style="margin: 0 0 10px 0; color: #0A1628;"><strong>Phone:</strong> {lead.get("phone")}</p>
-                                            {('<p style="margin: 0; color: #0A1628;"><strong>Message:</strong> ' + lead.get("message", "") + '</p>') if lead.get("message") else ''}
-                                        </td>
-                                    </tr>
-                                </table>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    Amount Paid: <strong>₹{payment.get("amount", 0)}</strong><br>
-                                    Payment Code: <strong>{demo_payment_code}</strong>
-                                </p>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    You can now reach out to this potential student directly!
-                                </p>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="background-color: #F3F4F6; padding: 20px; text-align: center; border-radius: 0 0 8px 8px;">
-                                <p style="color: #6B7280; font-size: 12px; margin: 0;">
-                                    © 2025 LeadBridge. All rights reserved.
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
+    html_content = create_lead_purchase_email(
+        user.name,
+        event.get("title", ""),
+        lead,
+        payment.get("amount", 0),
+        demo_payment_code
+    )
     
-    await send_email_async(
+    await enqueue_email(
         user.email,
         f"Lead Purchase Receipt - {event.get('title', 'Event')}",
-        html_content
+        html_content,
+        f"lead-receipt:{payment_id}"
     )
     
     return {"message": "Payment verified successfully", "lead": lead}
@@ -1110,6 +2406,184 @@ async def verify_payment(request: Request, user: User = Depends(get_current_user
     # lead = await db.leads.find_one({"lead_id": payment["lead_id"]}, {"_id": 0})
     # return {"message": "Payment verified", "lead": lead}
 
+@api_router.post("/mentor/leads/purchase-batch")
+@idempotent
+async def purchase_leads_batch(data: BatchPurchaseRequest, request: Request, user: User = Depends(get_current_user)):
+    """Create one payment covering many verified leads"""
+    await require_role(user, [Role.MENTOR])
+    
+    lead_ids = list(dict.fromkeys(data.lead_ids))
+    found = await fan_out(
+        mentor=lambda: db.mentors.find_one({"user_id": user.user_id}, {"_id": 0}),
+        leads=lambda: db.leads.find(
+            {"lead_id": {"$in": lead_ids}},
+            {"_id": 0, "lead_id": 1, "event_id": 1, "status": 1}
+        ).to_list(None),
+        events=lambda leads: fetch_map(db.events, "event_id", [lead["event_id"] for lead in leads], {"mentor_id": 1, "price_per_lead": 1})
+    )
+    mentor, leads, events = found["mentor"], found["leads"], found["events"]
+    if not mentor:
+        raise HTTPException(status_code=404, detail="Mentor profile not found")
+    
+    missing = set(lead_ids) - {lead["lead_id"] for lead in leads}
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Leads not found: {', '.join(sorted(missing))}")
+    
+    not_verified = [lead["lead_id"] for lead in leads if lead.get("status") != "VERIFIED"]
+    if not_verified:
+        raise HTTPException(status_code=400, detail=f"Leads not available for purchase: {', '.join(sorted(not_verified))}")
+    
+    if any(events.get(lead["event_id"], {}).get("mentor_id") != mentor["mentor_id"] for lead in leads):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    lead_prices = {lead["lead_id"]: events[lead["event_id"]].get("price_per_lead", 0) for lead in leads}
+    amount = sum(lead_prices.values())
+    
+    # DEMO PAYMENT GATEWAY: one payment record for the whole batch
+    payment_id = f"payment_{uuid.uuid4().hex[:12]}"
+    demo_payment_code = f"DEMO{uuid.uuid4().hex[:6].upper()}"
+    
+    payment_doc = {
+        "payment_id": payment_id,
+        "mentor_id": mentor["mentor_id"],
+        "lead_ids": lead_ids,
+        "lead_prices": lead_prices,
+        "demo_payment_code": demo_payment_code,
+        "amount": amount,
+        "status": "PENDING",
+        "created_at": datetime.now(timezone.utc)
+    }
+    await db.payments.insert_one(payment_doc)
+    
+    return {
+        "payment_id": payment_id,
+        "demo_payment_code": demo_payment_code,
+        "amount": amount,
+        "lead_count": len(lead_ids),
+        "message": "Use this demo code to complete payment"
+    }
+
+async def completed_batch_response(payment_id: str) -> dict:
+    """What a repeated batch verification returns: the stored outcome, without a new receipt"""
+    payment = await db.payments.find_one({"payment_id": payment_id}, {"_id": 0})
+    if payment.get("status") != "COMPLETED":
+        raise HTTPException(status_code=409, detail="Payment verification is still in progress")
+    leads = await db.leads.find({"payment_id": payment_id}, {"_id": 0}).to_list(None)
+    return {
+        "message": "Payment verified successfully",
+        "purchased_count": len(leads),
+        "amount": payment.get("amount", 0),
+        "unavailable_lead_ids": payment.get("unavailable_lead_ids", []),
+        "leads": leads
+    }
+
+@api_router.post("/mentor/payment-verify-batch")
+@idempotent
+async def verify_payment_batch(request: Request, user: User = Depends(get_current_user)):
+    """Complete a batch payment and unlock all of its leads at once"""
+    await require_role(user, [Role.MENTOR])
+    
+    body = await request.json()
+    demo_payment_code = body.get("demo_payment_code")
+    payment_id = body.get("payment_id")
+    
+    if not demo_payment_code or not payment_id:
+        raise HTTPException(status_code=400, detail="Missing payment details")
+    
+    found = await fan_out(
+        mentor=lambda: db.mentors.find_one({"user_id": user.user_id}, {"_id": 0}),
+        payment=lambda: db.payments.find_one({"payment_id": payment_id}, {"_id": 0})
+    )
+    mentor, payment = found["mentor"], found["payment"]
+    if not payment or not payment.get("lead_ids"):
+        raise HTTPException(status_code=404, detail="Payment not found")
+    
+    if not mentor or payment.get("mentor_id") != mentor["mentor_id"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    if payment.get("demo_payment_code") != demo_payment_code:
+        raise HTTPException(status_code=400, detail="Invalid payment code")
+    
+    # Claim the payment so exactly one request unlocks its leads and sends the receipt;
+    # a claim whose request died is up for grabs again after IDEMPOTENCY_LOCK_SECONDS
+    now = datetime.now(timezone.utc)
+    claim = await db.payments.update_one(
+        {"payment_id": payment_id, "$or": [
+            {"status": {"$nin": ["COMPLETED", "PROCESSING"]}},
+            {"status": "PROCESSING", "processing_at": {"$lte": now - timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)}}
+        ]},
+        {"$set": {"status": "PROCESSING", "processing_at": now}}
+    )
+    if not claim.modified_count:
+        return await completed_batch_response(payment_id)
+    
+    # Flip every lead that is still VERIFIED in one write
+    await db.leads.update_many(
+        {"lead_id": {"$in": payment["lead_ids"]}, "status": "VERIFIED"},
+        {"$set": {
+            "status": "PURCHASED",
+            "purchased_by": mentor["mentor_id"],
+            "payment_id": payment_id,
+            "purchased_at": now
+        }}
+    )
+    
+    leads = await db.leads.find({"payment_id": payment_id}, {"_id": 0}).to_list(None)
+    events = await fetch_map(db.events, "event_id", [lead["event_id"] for lead in leads], {"title": 1, "price_per_lead": 1})
+    
+    # Leads bought by another payment (or rejected) since checkout are not charged for
+    purchased_ids = {lead["lead_id"] for lead in leads}
+    unavailable = [lead_id for lead_id in payment["lead_ids"] if lead_id not in purchased_ids]
+    lead_prices = payment.get("lead_prices", {})
+    amount = sum(
+        lead_prices.get(lead["lead_id"], events.get(lead["event_id"], {}).get("price_per_lead", 0))
+        for lead in leads
+    )
+    
+    completion = {"status": "COMPLETED", "completed_at": datetime.now(timezone.utc), "amount": amount}
+    if unavailable:
+        completion.update(quoted_amount=payment.get("amount", 0), unavailable_lead_ids=unavailable)
+    completed = await db.payments.update_one(
+        {"payment_id": payment_id, "status": "PROCESSING", "processing_at": now},
+        {"$set": completion, "$unset": {"processing_at": ""}}
+    )
+    if not completed.modified_count:
+        # Our claim expired and another request finished the payment
+        return await completed_batch_response(payment_id)
+    
+    per_event = {}
+    for lead in leads:
+        per_event[lead["event_id"]] = per_event.get(lead["event_id"], 0) + 1
+    await asyncio.gather(*(
+        bump_stats(lead_transition("VERIFIED", "PURCHASED", count), mentor["mentor_id"], event_id)
+        for event_id, count in per_event.items()
+    ))
+    await bump_stats({"lead_revenue": amount, "lead_payments": 1}, mentor["mentor_id"])
+    for lead in leads:
+        await publish_change("leads", "update", lead)
+    
+    # One consolidated receipt for the whole batch
+    html_content = create_lead_purchase_batch_email(
+        user.name,
+        [{**lead, "event_title": events.get(lead["event_id"], {}).get("title", "Event")} for lead in leads],
+        amount,
+        demo_payment_code
+    )
+    await enqueue_email(
+        user.email,
+        f"Lead Purchase Receipt - {len(leads)} leads",
+        html_content,
+        f"lead-receipt:{payment_id}"
+    )
+    
+    return {
+        "message": "Payment verified successfully",
+        "purchased_count": len(leads),
+        "amount": amount,
+        "unavailable_lead_ids": unavailable,
+        "leads": leads
+    }
+
 # ==================== GUEST INVITATION & TICKETING ENDPOINTS ====================
 
 @api_router.post("/mentor/leads/{lead_id}/invite")
@@ -1117,7 +2591,14 @@ async def invite_guest(lead_id: str, data: InviteGuestRequest, user: User = Depe
     """Host invites a guest from purchased leads"""
     await require_role(user, [Role.MENTOR])
     
-    lead = await db.leads.find_one({"lead_id": lead_id}, {"_id": 0})
+    found = await fan_out(
+        lead=lambda: db.leads.find_one({"lead_id": lead_id}, {"_id": 0}),
+        existing_invitation=lambda: db.invitations.find_one({"lead_id": lead_id}, {"_id": 0, "invitation_id": 1}),
+        mentor=lambda: db.mentors.find_one({"user_id": user.user_id}, {"_id": 0}),
+        event=lambda lead: db.events.find_one({"event_id": lead["event_id"]}, {"_id": 0}),
+        guest_user=lambda lead: db.users.find_one({"user_id": lead["user_id"]}, {"_id": 0, "name": 1, "email": 1})
+    )
+    lead, mentor, event, guest_user = found["lead"], found["mentor"], found["event"], found["guest_user"]
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
     
@@ -1125,14 +2606,10 @@ async def invite_guest(lead_id: str, data: InviteGuestRequest, user: User = Depe
         raise HTTPException(status_code=400, detail="Lead must be purchased before inviting")
     
     # Check if already invited
-    existing_invitation = await db.invitations.find_one({"lead_id": lead_id})
-    if existing_invitation:
+    if found["existing_invitation"]:
         raise HTTPException(status_code=400, detail="Guest already invited for this lead")
     
-    mentor = await db.mentors.find_one({"user_id": user.user_id}, {"_id": 0})
-    event = await db.events.find_one({"event_id": lead["event_id"]}, {"_id": 0})
-    
-    if not mentor or event.get("mentor_id") != mentor.get("mentor_id"):
+    if not mentor or not event or event.get("mentor_id") != mentor.get("mentor_id"):
         raise HTTPException(status_code=403, detail="Not authorized")
     
     invitation_id = f"inv_{uuid.uuid4().hex[:12]}"
@@ -1149,59 +2626,22 @@ async def invite_guest(lead_id: str, data: InviteGuestRequest, user: User = Depe
     await db.invitations.insert_one(invitation_doc)
     
     # Update lead status to INVITED
-    await db.leads.update_one(
-        {"lead_id": lead_id},
+    result = await db.leads.update_one(
+        {"lead_id": lead_id, "status": "PURCHASED"},
         {"$set": {"status": "INVITED", "invitation_id": invitation_id}}
     )
+    follow_ups = [
+        publish_change("invitations", "insert", invitation_doc),
+        publish_change("leads", "update", {**lead, "status": "INVITED", "invitation_id": invitation_id})
+    ]
+    if result.modified_count:
+        follow_ups.append(bump_stats(lead_transition("PURCHASED", "INVITED"), mentor["mentor_id"], lead["event_id"]))
     
     # Send invitation email to guest
-    guest_user = await db.users.find_one({"user_id": lead["user_id"]}, {"_id": 0})
     if guest_user:
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <body style="margin: 0; padding: 0; background-color: #f5f5f5; font-family: Arial, sans-serif;">
-            <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 20px;">
-                <tr>
-                    <td align="center">
-                        <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px;">
-                            <tr>
-                                <td style="background: linear-gradient(135deg, #0A1628 0%, #243B53 100%); padding: 40px; text-align: center; border-radius: 8px 8px 0 0;">
-                                    <h1 style="color: #ffffff; margin: 0; font-size: 28px;">🎉 You're Invited!</h1>
-                                </td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 40px;">
-                                    <h2 style="color: #0A1628; margin-top: 0;">Hi {guest_user.get("name", "Guest")}!</h2>
-                                    <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                        Great news! You've been selected to attend:
-                                    </p>
-                                    <table width="100%" style="background-color: #F3F4F6; border-radius: 6px; padding: 20px; margin: 20px 0;">
-                                        <tr>
-                                            <td>
-                                                <p style="margin: 0; color: #0A1628; font-size: 18px; font-weight: bold;">{event.get("title", "Event")}</p>
-                                                <p style="margin: 10px 0 0 0; color: #6B7280;">Ticket Price: <strong>₹{data.ticket_price}</strong></p>
-                                            </td>
-                                        </tr>
-                                    </table>
-                                    <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                        Visit your dashboard to pay for your ticket and confirm your spot!
-                                    </p>
-                                </td>
-                            </tr>
-                            <tr>
-                                <td style="background-color: #F3F4F6; padding: 20px; text-align: center; border-radius: 0 0 8px 8px;">
-                                    <p style="color: #6B7280; font-size: 12px; margin: 0;">© 2025 The Social Circle</p>
-                                </td>
-                            </tr>
-                        </table>
-                    </td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
-        await send_email_async(guest_user["email"], f"You're Invited to {event.get('title', 'an Event')}!", html_content)
+        html_content = create_invitation_email(guest_user.get("name", "Guest"), event.get("title", "Event"), data.ticket_price)
+        follow_ups.append(enqueue_email(guest_user["email"], f"You're Invited to {event.get('title', 'an Event')}!", html_content, f"invitation:{invitation_id}"))
+    await asyncio.gather(*follow_ups)
     
     return {"invitation_id": invitation_id, "message": "Guest invited successfully"}
 
@@ -1210,86 +2650,193 @@ async def pass_guest(lead_id: str, user: User = Depends(get_current_user)):
     """Host passes/rejects a guest from purchased leads"""
     await require_role(user, [Role.MENTOR])
     
-    lead = await db.leads.find_one({"lead_id": lead_id}, {"_id": 0})
+    found = await fan_out(
+        lead=lambda: db.leads.find_one({"lead_id": lead_id}, {"_id": 0}),
+        mentor=lambda: db.mentors.find_one({"user_id": user.user_id}, {"_id": 0}),
+        event=lambda lead: db.events.find_one({"event_id": lead["event_id"]}, {"_id": 0}),
+        guest_user=lambda lead: db.users.find_one({"user_id": lead["user_id"]}, {"_id": 0, "name": 1, "email": 1})
+    )
+    lead, mentor, event, guest_user = found["lead"], found["mentor"], found["event"], found["guest_user"]
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
     
     if lead.get("status") != "PURCHASED":
         raise HTTPException(status_code=400, detail="Lead must be purchased before passing")
     
-    mentor = await db.mentors.find_one({"user_id": user.user_id}, {"_id": 0})
-    event = await db.events.find_one({"event_id": lead["event_id"]}, {"_id": 0})
-    
-    if not mentor or event.get("mentor_id") != mentor.get("mentor_id"):
+    if not mentor or not event or event.get("mentor_id") != mentor.get("mentor_id"):
         raise HTTPException(status_code=403, detail="Not authorized")
     
     # Update lead status to PASSED
-    await db.leads.update_one(
-        {"lead_id": lead_id},
+    result = await db.leads.update_one(
+        {"lead_id": lead_id, "status": "PURCHASED"},
         {"$set": {"status": "PASSED", "passed_at": datetime.now(timezone.utc)}}
     )
+    follow_ups = []
+    if result.modified_count:
+        follow_ups.append(bump_stats(lead_transition("PURCHASED", "PASSED"), mentor["mentor_id"], lead["event_id"]))
+        follow_ups.append(publish_change("leads", "update", {**lead, "status": "PASSED"}))
     
     # Send rejection email to guest
-    guest_user = await db.users.find_one({"user_id": lead["user_id"]}, {"_id": 0})
     if guest_user:
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <body style="margin: 0; padding: 0; background-color: #f5f5f5; font-family: 'Nunito', Arial, sans-serif;">
-            <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 20px;">
-                <tr>
-                    <td align="center">
-                        <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 16px; overflow: hidden;">
-                            <tr>
-                                <td style="background: linear-gradient(135deg, #0A1628 0%, #243B53 100%); padding: 40px; text-align: center;">
-                                    <h1 style="color: #ffffff; margin: 0; font-size: 28px;">Update on Your Application</h1>
-                                </td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 40px;">
-                                    <h2 style="color: #0A1628; margin-top: 0;">Hi {guest_user.get("name", "Guest")}!</h2>
-                                    <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                        Thank you for your interest in attending:
-                                    </p>
-                                    <table width="100%" style="background-color: #FEF2F2; border-radius: 12px; padding: 20px; margin: 20px 0;">
-                                        <tr>
-                                            <td>
-                                                <p style="margin: 0; color: #0A1628; font-size: 18px; font-weight: bold;">{event.get("title", "Event")}</p>
-                                            </td>
-                                        </tr>
-                                    </table>
-                                    <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                        Unfortunately, the host has decided to go with other guests for this particular event. 
-                                        Don't be discouraged - there are many more amazing experiences waiting for you!
-                                    </p>
-                                    <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                        🎉 <strong>Keep exploring!</strong> Check out other upcoming events on The Social Circle and apply to ones that match your interests.
-                                    </p>
-                                    <table width="100%" style="margin: 30px 0;">
-                                        <tr>
-                                            <td align="center">
-                                                <a href="{FRONTEND_URL}/events" style="display: inline-block; background: linear-gradient(135deg, #FF6B6B 0%, #FA5252 100%); color: white; padding: 16px 40px; text-decoration: none; border-radius: 50px; font-weight: bold; font-size: 16px;">Browse More Events</a>
-                                            </td>
-                                        </tr>
-                                    </table>
-                                </td>
-                            </tr>
-                            <tr>
-                                <td style="background-color: #F8FAFC; padding: 20px; text-align: center;">
-                                    <p style="color: #6B7280; font-size: 12px; margin: 0;">© 2025 The Social Circle - Where strangers become friends</p>
-                                </td>
-                            </tr>
-                        </table>
-                    </td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
-        await send_email_async(guest_user["email"], f"Update on your application for {event.get('title', 'Event')}", html_content)
+        html_content = create_pass_email(guest_user.get("name", "Guest"), event.get("title", "Event"))
+        follow_ups.append(enqueue_email(guest_user["email"], f"Update on your application for {event.get('title', 'Event')}", html_content, f"pass:{lead_id}"))
+    await asyncio.gather(*follow_ups)
     
     return {"message": "Guest passed successfully"}
 
+async def load_purchased_leads(event_id: str, lead_ids: List[str], user: User):
+    """
+    Resolve the host's event once and load the requested leads with one $in.
+    Returns (mentor, event, results, eligible) where results holds one entry per
+    distinct lead_id and eligible lists the PURCHASED leads that can be acted on.
+    """
+    lead_ids = list(dict.fromkeys(lead_ids))
+    found = await fan_out(
+        mentor=lambda: db.mentors.find_one({"user_id": user.user_id}, {"_id": 0}),
+        event=lambda: db.events.find_one({"event_id": event_id}, {"_id": 0}),
+        leads=lambda: fetch_map(db.leads, "lead_id", lead_ids, {"event_id": 1, "user_id": 1, "status": 1})
+    )
+    mentor, event, leads = found["mentor"], found["event"], found["leads"]
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if not mentor or event.get("mentor_id") != mentor.get("mentor_id"):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    results = {}
+    eligible = []
+    for lead_id in lead_ids:
+        lead = leads.get(lead_id)
+        results[lead_id] = {"lead_id": lead_id, "applied": False}
+        if not lead or lead["event_id"] != event_id:
+            results[lead_id]["error"] = "Lead not found"
+        elif lead.get("status") != "PURCHASED":
+            results[lead_id]["error"] = f"Lead is {lead.get('status')}, not PURCHASED"
+        else:
+            eligible.append(lead)
+    return mentor, event, results, eligible
+
+def batch_response(results: dict) -> dict:
+    applied = sum(1 for r in results.values() if r["applied"])
+    return {"applied": applied, "failed": len(results) - applied, "results": list(results.values())}
+
+@api_router.post("/mentor/events/{event_id}/invite-batch")
+async def invite_guests_batch(event_id: str, data: BatchInviteRequest, user: User = Depends(get_current_user)):
+    """Host invites many purchased leads of one event at once"""
+    await require_role(user, [Role.MENTOR])
+    
+    mentor, event, results, eligible = await load_purchased_leads(event_id, data.lead_ids, user)
+    
+    now = datetime.now(timezone.utc)
+    invitations = {
+        lead["lead_id"]: {
+            "invitation_id": f"inv_{uuid.uuid4().hex[:12]}",
+            "lead_id": lead["lead_id"],
+            "event_id": event_id,
+            "host_id": mentor["mentor_id"],
+            "guest_id": lead["user_id"],
+            "ticket_price": data.ticket_price,
+            "status": "PENDING",
+            "invited_at": now
+        }
+        for lead in eligible
+    }
+    
+    # The unique index on invitations.lead_id rejects leads that were already invited
+    if invitations:
+        docs = list(invitations.values())
+        try:
+            await db.invitations.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details["writeErrors"]:
+                lead_id = docs[error["index"]]["lead_id"]
+                results[lead_id]["error"] = "Guest already invited for this lead" if error.get("code") == 11000 else error.get("errmsg", "Write failed")
+                del invitations[lead_id]
+    
+    if invitations:
+        result = await db.leads.bulk_write([
+            UpdateOne(
+                {"lead_id": lead_id, "status": "PURCHASED"},
+                {"$set": {"status": "INVITED", "invitation_id": invitation["invitation_id"]}}
+            )
+            for lead_id, invitation in invitations.items()
+        ], ordered=False)
+        await bump_stats(lead_transition("PURCHASED", "INVITED", result.modified_count), mentor["mentor_id"], event_id)
+        if result.modified_count < len(invitations):
+            # A lead left PURCHASED after it was loaded; drop the invitations whose update did not match
+            leads = await fetch_map(db.leads, "lead_id", list(invitations), {"invitation_id": 1})
+            stale = [
+                lead_id for lead_id, invitation in invitations.items()
+                if leads.get(lead_id, {}).get("invitation_id") != invitation["invitation_id"]
+            ]
+            await db.invitations.delete_many({"invitation_id": {"$in": [invitations[lead_id]["invitation_id"] for lead_id in stale]}})
+            for lead_id in stale:
+                results[lead_id]["error"] = "Lead changed concurrently"
+                del invitations[lead_id]
+    
+    guests = await fetch_map(db.users, "user_id", [i["guest_id"] for i in invitations.values()], {"name": 1, "email": 1})
+    title = event.get("title", "Event")
+    emails = []
+    for lead_id, invitation in invitations.items():
+        results[lead_id].update(applied=True, invitation_id=invitation["invitation_id"])
+        await publish_change("invitations", "insert", invitation)
+        await publish_change("leads", "update", {
+            "lead_id": lead_id,
+            "event_id": event_id,
+            "user_id": invitation["guest_id"],
+            "status": "INVITED",
+            "invitation_id": invitation["invitation_id"]
+        })
+        guest = guests.get(invitation["guest_id"])
+        if guest:
+            html_content = create_invitation_email(guest.get("name", "Guest"), title, data.ticket_price)
+            emails.append((guest["email"], f"You're Invited to {event.get('title', 'an Event')}!", html_content, f"invitation:{invitation['invitation_id']}"))
+    await enqueue_emails(emails)
+    
+    return batch_response(results)
+
+@api_router.post("/mentor/events/{event_id}/pass-batch")
+async def pass_guests_batch(event_id: str, data: BatchPassRequest, user: User = Depends(get_current_user)):
+    """Host passes on many purchased leads of one event at once"""
+    await require_role(user, [Role.MENTOR])
+    
+    mentor, event, results, eligible = await load_purchased_leads(event_id, data.lead_ids, user)
+    
+    if eligible:
+        now = datetime.now(timezone.utc)
+        result = await db.leads.bulk_write([
+            UpdateOne(
+                {"lead_id": lead["lead_id"], "status": "PURCHASED"},
+                {"$set": {"status": "PASSED", "passed_at": now}}
+            )
+            for lead in eligible
+        ], ordered=False)
+        await bump_stats(lead_transition("PURCHASED", "PASSED", result.modified_count), mentor["mentor_id"], event_id)
+        if result.modified_count < len(eligible):
+            # A lead left PURCHASED after it was loaded; only the ones stamped by this batch were passed
+            matched = set(await db.leads.distinct("lead_id", {
+                "lead_id": {"$in": [lead["lead_id"] for lead in eligible]},
+                "status": "PASSED",
+                "passed_at": now
+            }))
+            for lead in eligible:
+                if lead["lead_id"] not in matched:
+                    results[lead["lead_id"]]["error"] = "Lead changed concurrently"
+            eligible = [lead for lead in eligible if lead["lead_id"] in matched]
+    
+    guests = await fetch_map(db.users, "user_id", [lead["user_id"] for lead in eligible], {"name": 1, "email": 1})
+    title = event.get("title", "Event")
+    emails = []
+    for lead in eligible:
+        results[lead["lead_id"]]["applied"] = True
+        await publish_change("leads", "update", {**lead, "status": "PASSED"})
+        guest = guests.get(lead["user_id"])
+        if guest:
+            html_content = create_pass_email(guest.get("name", "Guest"), title)
+            emails.append((guest["email"], f"Update on your application for {title}", html_content, f"pass:{lead['lead_id']}"))
+    await enqueue_emails(emails)
+    
+    return batch_response(results)
+
 @api_router.get("/mentor/leads/projected-revenue")
 async def get_projected_revenue(user: User = Depends(get_current_user)):
     """Get projected revenue from verified leads for host"""
@@ -1299,65 +2846,74 @@ async def get_projected_revenue(user: User = Depends(get_current_user)):
     if not mentor:
         raise HTTPException(status_code=404, detail="Mentor profile not found")
     
-    # Get all events by this mentor
-    events = await db.events.find({"mentor_id": mentor["mentor_id"]}, {"_id": 0}).to_list(1000)
-    event_ids = [e["event_id"] for e in events]
-    
-    # Get all verified leads for these events
-    verified_leads = await db.leads.find({
-        "event_id": {"$in": event_ids},
-        "status": "VERIFIED"
-    }, {"_id": 0}).to_list(1000)
+    # One pipeline: count each event's verified leads, price them and total them up
+    result = await db.events.aggregate([
+        {"$match": {"mentor_id": mentor["mentor_id"]}},
+        {"$lookup": {
+            "from": "leads",
+            "let": {"event_id": "$event_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$event_id", "$$event_id"]},
+                    {"$eq": ["$status", "VERIFIED"]}
+                ]}}},
+                {"$count": "count"}
+            ],
+            "as": "verified"
+        }},
+        {"$project": {
+            "_id": 0,
+            "event_id": 1,
+            "event_title": {"$ifNull": ["$title", "Unknown"]},
+            "lead_count": {"$ifNull": [{"$arrayElemAt": ["$verified.count", 0]}, 0]},
+            "price_per_lead": {"$ifNull": ["$price_per_lead", 0]}
+        }},
+        {"$match": {"lead_count": {"$gt": 0}}},
+        {"$addFields": {"potential_revenue": {"$multiply": ["$lead_count", "$price_per_lead"]}}},
+        {"$facet": {
+            "projected_data": [{"$sort": {"event_id": 1}}],
+            "totals": [{"$group": {
+                "_id": None,
+                "total_leads": {"$sum": "$lead_count"},
+                "total_potential_revenue": {"$sum": "$potential_revenue"}
+            }}]
+        }}
+    ]).to_list(1)
     
-    # Calculate projected revenue
-    projected_data = []
-    for event in events:
-        event_leads = [lead for lead in verified_leads if lead["event_id"] == event["event_id"]]
-        lead_count = len(event_leads)
-        potential_revenue = lead_count * event.get("price_per_lead", 0)
-        
-        if lead_count > 0:
-            projected_data.append({
-                "event_id": event["event_id"],
-                "event_title": event.get("title", "Unknown"),
-                "lead_count": lead_count,
-                "price_per_lead": event.get("price_per_lead", 0),
-                "potential_revenue": potential_revenue
-            })
-    
-    total_leads = sum(p["lead_count"] for p in projected_data)
-    total_potential_revenue = sum(p["potential_revenue"] for p in projected_data)
+    facets = result[0] if result else {"projected_data": [], "totals": []}
+    totals = facets["totals"][0] if facets["totals"] else {"total_leads": 0, "total_potential_revenue": 0}
     
     return {
-        "projected_data": projected_data,
-        "total_leads": total_leads,
-        "total_potential_revenue": total_potential_revenue
+        "projected_data": facets["projected_data"],
+        "total_leads": totals["total_leads"],
+        "total_potential_revenue": totals["total_potential_revenue"]
     }
 
-@api_router.get("/user/invitations")
+@api_router.get("/user/invitations", response_model=List[GuestInvitationView])
 async def get_user_invitations(user: User = Depends(get_current_user)):
     """Get all invitations for the current user"""
     await require_role(user, [Role.USER])
     
-    invitations = await db.invitations.find({"guest_id": user.user_id}, {"_id": 0}).to_list(1000)
+    invitations = await db.invitations.find({"guest_id": user.user_id}, projection_of(GuestInvitationView)).to_list(1000)
+    events = await fetch_map(db.events, "event_id", [i["event_id"] for i in invitations], EVENT_SUMMARY_FIELDS)
+    host_names = await fetch_host_names([e["mentor_id"] for e in events.values()])
     
     for invitation in invitations:
-        event = await db.events.find_one({"event_id": invitation["event_id"]}, {"_id": 0})
+        event = events.get(invitation["event_id"])
         if event:
             invitation["event_title"] = event.get("title", "Unknown Event")
             invitation["event_datetime"] = event.get("event_datetime")
             invitation["event_description"] = event.get("description", "")
             invitation["event_duration"] = event.get("duration", 0)
             
-            mentor = await db.mentors.find_one({"mentor_id": event["mentor_id"]}, {"_id": 0})
-            if mentor:
-                host_user = await db.users.find_one({"user_id": mentor["user_id"]}, {"_id": 0})
-                invitation["host_name"] = host_user.get("name", "Unknown") if host_user else "Unknown"
+            if event["mentor_id"] in host_names:
+                invitation["host_name"] = host_names[event["mentor_id"]]
     
     return invitations
 
 @api_router.post("/user/invitations/{invitation_id}/pay")
-async def pay_for_ticket(invitation_id: str, user: User = Depends(get_current_user)):
+@idempotent
+async def pay_for_ticket(invitation_id: str, request: Request, user: User = Depends(get_current_user)):
     """Guest initiates ticket payment"""
     await require_role(user, [Role.USER])
     
@@ -1397,7 +2953,72 @@ async def pay_for_ticket(invitation_id: str, user: User = Depends(get_current_us
         "message": "Use this demo code to complete ticket payment"
     }
 
+async def complete_ticket_payment(payment: dict, session=None) -> dict:
+    """
+    Move a verified ticket payment through payment COMPLETED -> invitation PAID
+    -> lead CONFIRMED -> ticket issued, writing through the given session.
+    
+    The payment_id is the idempotency key: once its ticket exists a replay
+    returns it without writing, and the unique tickets.payment_id index turns a
+    racing duplicate into DuplicateKeyError. Returns {ticket, created} plus, for
+    a fresh ticket, the invitation, the lead's previous status and whether this
+    call completed the payment.
+    """
+    payment_id = payment["payment_id"]
+    ticket = await db.tickets.find_one({"payment_id": payment_id}, {"_id": 0}, session=session)
+    if ticket:
+        return {"ticket": ticket, "created": False}
+    
+    now = datetime.now(timezone.utc)
+    invitation_id = payment.get("invitation_id")
+    invitation = await db.invitations.find_one_and_update(
+        {"invitation_id": invitation_id, "$or": [{"status": {"$ne": "PAID"}}, {"payment_id": payment_id}]},
+        {"$set": {"status": "PAID", "paid_at": now, "payment_id": payment_id}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+        session=session
+    )
+    if not invitation:
+        if await db.invitations.count_documents({"invitation_id": invitation_id}, limit=1, session=session):
+            raise HTTPException(status_code=400, detail="Ticket already paid")
+        raise HTTPException(status_code=404, detail="Invitation not found")
+    
+    # The ticket goes in before the remaining writes so that, without a
+    # transaction, only the caller that issued it completes the payment
+    ticket = {
+        "ticket_id": f"ticket_{uuid.uuid4().hex[:12]}",
+        "invitation_id": invitation_id,
+        "event_id": invitation.get("event_id"),
+        "guest_id": payment.get("guest_id"),
+        "ticket_price": payment.get("amount"),
+        "payment_id": payment_id,
+        "status": "CONFIRMED",
+        "created_at": now
+    }
+    await db.tickets.insert_one(ticket, session=session)
+    ticket.pop("_id", None)
+    
+    payment_result = await db.ticket_payments.update_one(
+        {"payment_id": payment_id, "status": {"$ne": "COMPLETED"}},
+        {"$set": {"status": "COMPLETED", "completed_at": now}},
+        session=session
+    )
+    previous = await db.leads.find_one_and_update(
+        {"lead_id": invitation.get("lead_id")},
+        {"$set": {"status": "CONFIRMED"}},
+        projection={"_id": 0, "status": 1},
+        session=session
+    )
+    return {
+        "ticket": ticket,
+        "created": True,
+        "invitation": invitation,
+        "previous": previous,
+        "completed": bool(payment_result.modified_count)
+    }
+
 @api_router.post("/user/ticket-payment-verify")
+@idempotent
 async def verify_ticket_payment(request: Request, user: User = Depends(get_current_user)):
     """Guest verifies ticket payment"""
     await require_role(user, [Role.USER])
@@ -1419,102 +3040,52 @@ async def verify_ticket_payment(request: Request, user: User = Depends(get_curre
     if payment.get("demo_payment_code") != demo_payment_code:
         raise HTTPException(status_code=400, detail="Invalid payment code")
     
-    # Update payment status
-    await db.ticket_payments.update_one(
-        {"payment_id": payment_id},
-        {"$set": {"status": "COMPLETED", "completed_at": datetime.now(timezone.utc)}}
-    )
-    
-    # Update invitation status
-    invitation_id = payment.get("invitation_id")
-    await db.invitations.update_one(
-        {"invitation_id": invitation_id},
-        {"$set": {"status": "PAID", "paid_at": datetime.now(timezone.utc), "payment_id": payment_id}}
-    )
-    
-    # Update lead status to CONFIRMED
-    invitation = await db.invitations.find_one({"invitation_id": invitation_id}, {"_id": 0})
-    if invitation:
-        await db.leads.update_one(
-            {"lead_id": invitation.get("lead_id")},
-            {"$set": {"status": "CONFIRMED"}}
-        )
-    
-    # Create ticket record
-    ticket_id = f"ticket_{uuid.uuid4().hex[:12]}"
-    event = await db.events.find_one({"event_id": invitation.get("event_id")}, {"_id": 0})
-    
-    ticket_doc = {
-        "ticket_id": ticket_id,
-        "invitation_id": invitation_id,
-        "event_id": invitation.get("event_id"),
-        "guest_id": user.user_id,
-        "ticket_price": payment.get("amount"),
-        "payment_id": payment_id,
-        "status": "CONFIRMED",
-        "created_at": datetime.now(timezone.utc)
-    }
-    await db.tickets.insert_one(ticket_doc)
+    try:
+        outcome = await run_transaction(lambda session: complete_ticket_payment(payment, session))
+    except DuplicateKeyError:
+        # A concurrent verification of the same payment issued the ticket first
+        ticket = await db.tickets.find_one({"payment_id": payment_id}, {"_id": 0})
+        outcome = {"ticket": ticket, "created": False}
+    ticket = outcome["ticket"]
+    
+    response = {"message": "Ticket payment verified successfully", "ticket_id": ticket["ticket_id"]}
+    if not outcome["created"]:
+        return response
+    
+    invitation, previous = outcome["invitation"], outcome["previous"]
+    deltas = lead_transition(previous.get("status"), "CONFIRMED") if previous else {}
+    if outcome["completed"]:
+        deltas.update({"ticket_revenue": payment.get("amount", 0), "ticket_payments": 1})
     
     # Send confirmation email
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <body style="margin: 0; padding: 0; background-color: #f5f5f5; font-family: Arial, sans-serif;">
-        <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 20px;">
-            <tr>
-                <td align="center">
-                    <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px;">
-                        <tr>
-                            <td style="background: linear-gradient(135deg, #0A1628 0%, #243B53 100%); padding: 40px; text-align: center; border-radius: 8px 8px 0 0;">
-                                <h1 style="color: #ffffff; margin: 0; font-size: 28px;">🎫 Ticket Confirmed!</h1>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 40px;">
-                                <h2 style="color: #0A1628; margin-top: 0;">Hi {user.name}!</h2>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    Your ticket has been confirmed for:
-                                </p>
-                                <table width="100%" style="background-color: #F3F4F6; border-radius: 6px; padding: 20px; margin: 20px 0;">
-                                    <tr>
-                                        <td>
-                                            <p style="margin: 0; color: #0A1628; font-size: 18px; font-weight: bold;">{event.get("title", "Event")}</p>
-                                            <p style="margin: 10px 0 0 0; color: #6B7280;">Ticket ID: <strong>{ticket_id}</strong></p>
-                                            <p style="margin: 5px 0 0 0; color: #6B7280;">Amount Paid: <strong>₹{payment.get("amount")}</strong></p>
-                                        </td>
-                                    </tr>
-                                </table>
-                                <p style="color: #374151; font-size: 16px; line-height: 1.6;">
-                                    See you at the event! 🎉
-                                </p>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="background-color: #F3F4F6; padding: 20px; text-align: center; border-radius: 0 0 8px 8px;">
-                                <p style="color: #6B7280; font-size: 12px; margin: 0;">© 2025 The Social Circle</p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
-    await send_email_async(user.email, f"Ticket Confirmed - {event.get('title', 'Event')}", html_content)
+    event = await db.events.find_one({"event_id": invitation.get("event_id")}, {"_id": 0, "title": 1}) or {}
+    html_content = create_ticket_confirmation_email(user.name, event.get("title", "Event"), ticket["ticket_id"], payment.get("amount"))
+    await asyncio.gather(
+        bump_stats(deltas, invitation.get("host_id"), invitation.get("event_id")),
+        publish_change("invitations", "update", invitation),
+        publish_change("leads", "update", {
+            "lead_id": invitation.get("lead_id"),
+            "event_id": invitation.get("event_id"),
+            "user_id": invitation.get("guest_id"),
+            "status": "CONFIRMED"
+        }),
+        publish_change("tickets", "insert", ticket),
+        enqueue_email(user.email, f"Ticket Confirmed - {event.get('title', 'Event')}", html_content, f"ticket:{payment_id}")
+    )
     
-    return {"message": "Ticket payment verified successfully", "ticket_id": ticket_id}
+    return response
 
-@api_router.get("/user/tickets")
+@api_router.get("/user/tickets", response_model=List[TicketView])
 async def get_user_tickets(user: User = Depends(get_current_user)):
     """Get all confirmed tickets for the current user"""
     await require_role(user, [Role.USER])
     
-    tickets = await db.tickets.find({"guest_id": user.user_id}, {"_id": 0}).to_list(1000)
+    tickets = await db.tickets.find({"guest_id": user.user_id}, projection_of(TicketView)).to_list(1000)
+    events = await fetch_map(db.events, "event_id", [t["event_id"] for t in tickets], EVENT_SUMMARY_FIELDS)
+    host_names = await fetch_host_names([e["mentor_id"] for e in events.values()])
     
     for ticket in tickets:
-        event = await db.events.find_one({"event_id": ticket["event_id"]}, {"_id": 0})
+        event = events.get(ticket["event_id"])
         if event:
             ticket["event_title"] = event.get("title", "Unknown Event")
             ticket["event_datetime"] = event.get("event_datetime")
@@ -1522,14 +3093,12 @@ async def get_user_tickets(user: User = Depends(get_current_user)):
             ticket["event_duration"] = event.get("duration", 0)
             ticket["event_category"] = event.get("category", "")
             
-            mentor = await db.mentors.find_one({"mentor_id": event["mentor_id"]}, {"_id": 0})
-            if mentor:
-                host_user = await db.users.find_one({"user_id": mentor["user_id"]}, {"_id": 0})
-                ticket["host_name"] = host_user.get("name", "Unknown") if host_user else "Unknown"
+            if event["mentor_id"] in host_names:
+                ticket["host_name"] = host_names[event["mentor_id"]]
     
     return tickets
 
-@api_router.get("/mentor/invitations")
+@api_router.get("/mentor/invitations", response_model=List[HostInvitationView])
 async def get_mentor_invitations(user: User = Depends(get_current_user)):
     """Get all invitations sent by the host"""
     await require_role(user, [Role.MENTOR])
@@ -1538,15 +3107,19 @@ async def get_mentor_invitations(user: User = Depends(get_current_user)):
     if not mentor:
         raise HTTPException(status_code=404, detail="Mentor profile not found")
     
-    invitations = await db.invitations.find({"host_id": mentor["mentor_id"]}, {"_id": 0}).to_list(1000)
+    invitations = await db.invitations.find({"host_id": mentor["mentor_id"]}, projection_of(HostInvitationView)).to_list(1000)
+    leads, events = await asyncio.gather(
+        fetch_map(db.leads, "lead_id", [i["lead_id"] for i in invitations], {"name": 1, "email": 1}),
+        fetch_map(db.events, "event_id", [i["event_id"] for i in invitations], {"title": 1})
+    )
     
     for invitation in invitations:
-        lead = await db.leads.find_one({"lead_id": invitation["lead_id"]}, {"_id": 0})
+        lead = leads.get(invitation["lead_id"])
         if lead:
             invitation["guest_name"] = lead.get("name", "Unknown")
             invitation["guest_email"] = lead.get("email", "")
         
-        event = await db.events.find_one({"event_id": invitation["event_id"]}, {"_id": 0})
+        event = events.get(invitation["event_id"])
         if event:
             invitation["event_title"] = event.get("title", "Unknown Event")
     
@@ -1554,23 +3127,51 @@ async def get_mentor_invitations(user: User = Depends(get_current_user)):
 
 # ==================== END GUEST INVITATION & TICKETING ENDPOINTS ====================
 
-@api_router.get("/admin/users")
-async def get_all_users(user: User = Depends(get_current_user)):
+@api_router.get("/admin/users", response_model=List[User])
+async def get_all_users(
+    response: Response,
+    role: Optional[Role] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    user: User = Depends(get_current_user)
+):
+    """Users by signup date (newest first by default), keyset-paginated on (created_at, user_id)"""
     await require_role(user, [Role.ADMIN])
     
-    users = await db.users.find({}, {"_id": 0, "password_hash": 0}).to_list(1000)
+    query = created_range(created_from, created_to)
+    if role:
+        query["role"] = role.value
+    
+    users, next_cursor = await keyset_page(db.users, query, "user_id", projection_of(User), cursor, limit, order == "desc")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return users
 
-@api_router.get("/admin/mentors")
-async def get_all_mentors(user: User = Depends(get_current_user)):
+@api_router.get("/admin/mentors", response_model=List[MentorView])
+async def get_all_mentors(
+    response: Response,
+    verification_status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    user: User = Depends(get_current_user)
+):
+    """Mentor profiles by creation date, keyset-paginated on (created_at, mentor_id)"""
     await require_role(user, [Role.ADMIN])
     
-    mentors = await db.mentors.find({}, {"_id": 0}).to_list(1000)
-    for mentor in mentors:
-        user_doc = await db.users.find_one({"user_id": mentor["user_id"]}, {"_id": 0})
-        mentor["name"] = user_doc.get("name", "Unknown")
-        mentor["email"] = user_doc.get("email", "Unknown")
+    query = created_range(created_from, created_to)
+    if verification_status:
+        query["verification_status"] = verification_status
     
+    mentors, next_cursor = await keyset_page(db.mentors, query, "mentor_id", projection_of(MentorView), cursor, limit, order == "desc")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    await join_mentor_users(mentors)
     return mentors
 
 @api_router.put("/admin/mentors/{mentor_id}/verify")
@@ -1586,46 +3187,84 @@ async def verify_mentor(mentor_id: str, data: VerifyMentorRequest, user: User =
         {"$set": {"verification_status": data.status}}
     )
     
+    # Keep the denormalized catalog flag in sync
+    await db.events.update_many(
+        {"mentor_id": mentor_id},
+        {"$set": {"mentor_approved": data.status == "APPROVED"}}
+    )
+    await invalidate_event_cache(await db.events.distinct("event_id", {"mentor_id": mentor_id}))
+    
     # Send notification email to mentor
     mentor_user = await db.users.find_one({"user_id": mentor["user_id"]}, {"_id": 0})
     if mentor_user:
         html_content = create_mentor_approval_email(mentor_user["name"], data.status)
         subject = "Application Approved - LeadBridge" if data.status == "APPROVED" else "Application Update - LeadBridge"
-        await send_email_async(mentor_user["email"], subject, html_content)
+        await enqueue_email(mentor_user["email"], subject, html_content)
     
     return {"message": "Mentor verification updated"}
 
-@api_router.get("/admin/leads")
-async def get_all_leads(user: User = Depends(get_current_user)):
+@api_router.get("/admin/leads", response_model=List[LeadView])
+async def get_all_leads(
+    response: Response,
+    status: Optional[LeadStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    user: User = Depends(get_current_user)
+):
+    """Leads by booking date, keyset-paginated on (created_at, lead_id)"""
     await require_role(user, [Role.ADMIN])
     
-    leads = await db.leads.find({}, {"_id": 0}).to_list(1000)
-    for lead in leads:
-        if isinstance(lead.get('created_at'), str):
-            lead['created_at'] = datetime.fromisoformat(lead['created_at'])
-        event = await db.events.find_one({"event_id": lead["event_id"]}, {"_id": 0})
-        if event:
-            lead["event_title"] = event.get("title", "Unknown")
+    query = created_range(created_from, created_to)
+    if status:
+        query["status"] = status.value
+    
+    leads, next_cursor = await keyset_page(db.leads, query, "lead_id", projection_of(LeadView), cursor, limit, order == "desc")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    await join_lead_events(leads)
+    return leads
+
+@api_router.get("/admin/leads/pending", response_model=List[LeadView])
+async def get_pending_leads(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    user: User = Depends(get_current_user)
+):
+    """Moderation queue: PENDING leads oldest first, keyset-paginated on (created_at, lead_id)"""
+    await require_role(user, [Role.ADMIN])
     
+    query = {"status": LeadStatus.PENDING.value}
+    leads, next_cursor = await keyset_page(db.leads, query, "lead_id", projection_of(LeadView), cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    await join_lead_events(leads)
     return leads
 
 @api_router.put("/admin/leads/{lead_id}/verify")
 async def verify_lead(lead_id: str, data: VerifyLeadRequest, user: User = Depends(get_current_user)):
     await require_role(user, [Role.ADMIN])
     
-    lead = await db.leads.find_one({"lead_id": lead_id})
-    if not lead:
-        raise HTTPException(status_code=404, detail="Lead not found")
-    
     update_data = {
         "status": data.status,
         "verification_status": "MANUAL_VERIFIED" if data.status == "VERIFIED" else "REJECTED"
     }
     
-    await db.leads.update_one(
+    lead = await db.leads.find_one_and_update(
         {"lead_id": lead_id},
-        {"$set": update_data}
+        {"$set": update_data},
+        projection={"_id": 0, "status": 1, "event_id": 1, "user_id": 1}
     )
+    if not lead:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    
+    deltas = lead_transition(lead.get("status"), data.status)
+    if deltas:
+        await bump_stats(deltas, await event_owner(lead["event_id"]), lead["event_id"])
+    await publish_change("leads", "update", {**lead, "lead_id": lead_id, **update_data})
     
     log_doc = {
         "log_id": f"log_{uuid.uuid4().hex[:12]}",
@@ -1639,30 +3278,370 @@ async def verify_lead(lead_id: str, data: VerifyLeadRequest, user: User = Depend
     
     return {"message": "Lead verification updated"}
 
-@api_router.get("/admin/analytics")
-async def get_analytics(user: User = Depends(get_current_user)):
+LEAD_VERIFY_CHUNK = 500
+
+@api_router.put("/admin/leads/verify-batch")
+async def verify_leads_batch(data: BatchVerifyLeadsRequest, user: User = Depends(get_current_user)):
+    """Apply many moderation decisions at once; returns one result per decision"""
     await require_role(user, [Role.ADMIN])
     
-    total_users = await db.users.count_documents({"role": "USER"})
-    total_mentors = await db.mentors.count_documents({})
-    total_events = await db.events.count_documents({})
-    total_leads = await db.leads.count_documents({})
-    verified_leads = await db.leads.count_documents({"status": "VERIFIED"})
-    purchased_leads = await db.leads.count_documents({"status": "PURCHASED"})
+    lead_ids = [d.lead_id for d in data.decisions]
+    leads = await fetch_map(db.leads, "lead_id", lead_ids, {"status": 1, "event_id": 1, "user_id": 1})
+    
+    results = []
+    pending = []
+    seen = set()
+    for decision in data.decisions:
+        result = {"lead_id": decision.lead_id, "status": decision.status, "applied": False}
+        results.append(result)
+        if decision.lead_id not in leads:
+            result["error"] = "Lead not found"
+        elif decision.lead_id in seen:
+            result["error"] = "Duplicate lead_id in batch"
+        else:
+            seen.add(decision.lead_id)
+            pending.append((decision, result))
+    
+    # Ordered chunks: a failed write stops the batch, like applying them one by one
+    applied = []
+    for start in range(0, len(pending), LEAD_VERIFY_CHUNK):
+        chunk = pending[start:start + LEAD_VERIFY_CHUNK]
+        operations = [
+            UpdateOne({"lead_id": decision.lead_id}, {"$set": {
+                "status": decision.status,
+                "verification_status": "MANUAL_VERIFIED" if decision.status == "VERIFIED" else "REJECTED"
+            }})
+            for decision, _ in chunk
+        ]
+        try:
+            await db.leads.bulk_write(operations, ordered=True)
+            applied.extend(chunk)
+        except BulkWriteError as e:
+            failed_at = e.details["writeErrors"][0]["index"]
+            applied.extend(chunk[:failed_at])
+            chunk[failed_at][1]["error"] = e.details["writeErrors"][0].get("errmsg", "Write failed")
+            for _, result in pending[start + failed_at + 1:]:
+                result["error"] = "Skipped after an earlier failure"
+            break
+    
+    now = datetime.now(timezone.utc)
+    per_event = {}
+    for decision, result in applied:
+        result["applied"] = True
+        lead = leads[decision.lead_id]
+        deltas = per_event.setdefault(lead["event_id"], {})
+        for field, value in lead_transition(lead.get("status"), decision.status).items():
+            deltas[field] = deltas.get(field, 0) + value
+        await publish_change("leads", "update", {
+            **lead,
+            "status": decision.status,
+            "verification_status": "MANUAL_VERIFIED" if decision.status == "VERIFIED" else "REJECTED"
+        })
+    
+    if applied:
+        await db.verification_logs.insert_many([
+            {
+                "log_id": f"log_{uuid.uuid4().hex[:12]}",
+                "lead_id": decision.lead_id,
+                "verified_by": user.user_id,
+                "status": decision.status,
+                "reason": decision.reason,
+                "timestamp": now
+            }
+            for decision, _ in applied
+        ], ordered=False)
+        
+        events = await fetch_map(db.events, "event_id", list(per_event), {"mentor_id": 1})
+        await asyncio.gather(*(
+            bump_stats(deltas, events.get(event_id, {}).get("mentor_id"), event_id)
+            for event_id, deltas in per_event.items()
+        ))
     
-    payments = await db.payments.find({"status": "COMPLETED"}, {"_id": 0}).to_list(1000)
-    total_revenue = sum(p.get("amount", 0) for p in payments)
+    return {
+        "applied": len(applied),
+        "failed": len(results) - len(applied),
+        "results": results
+    }
+
+async def daily_revenue(collection, since: datetime) -> dict:
+    """Per-day revenue of payments completed since `since`, computed server-side"""
+    rows = await collection.aggregate([
+        {"$match": {"status": "COMPLETED", "completed_at": {"$gte": since}}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$completed_at"}},
+            "revenue": {"$sum": "$amount"},
+            "count": {"$sum": 1}
+        }}
+    ]).to_list(None)
+    return {row["_id"]: row for row in rows}
+
+@api_router.get("/admin/analytics")
+async def get_analytics(days: int = Query(30, ge=1, le=365), user: User = Depends(get_current_user)):
+    await require_role(user, [Role.ADMIN])
+    
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    stats, lead_daily, ticket_daily = await asyncio.gather(
+        get_stats("global"),
+        daily_revenue(db.payments, since),
+        daily_revenue(db.ticket_payments, since)
+    )
     
     return {
-        "total_users": total_users,
-        "total_mentors": total_mentors,
-        "total_events": total_events,
-        "total_leads": total_leads,
-        "verified_leads": verified_leads,
-        "purchased_leads": purchased_leads,
-        "total_revenue": total_revenue
+        "total_users": stats.get("users", 0),
+        "total_mentors": stats.get("mentors", 0),
+        "total_events": stats.get("events", 0),
+        "total_leads": stats.get("leads", 0),
+        "verified_leads": stats.get("leads_VERIFIED", 0),
+        "purchased_leads": stats.get("leads_PURCHASED", 0),
+        "total_revenue": stats.get("lead_revenue", 0),
+        "ticket_revenue": stats.get("ticket_revenue", 0),
+        "daily_revenue": [
+            {
+                "date": day,
+                "lead_revenue": lead_daily.get(day, {}).get("revenue", 0),
+                "lead_payments": lead_daily.get(day, {}).get("count", 0),
+                "ticket_revenue": ticket_daily.get(day, {}).get("revenue", 0),
+                "ticket_payments": ticket_daily.get(day, {}).get("count", 0)
+            }
+            for day in sorted(set(lead_daily) | set(ticket_daily))
+        ]
     }
 
+@api_router.post("/admin/stats/reconcile")
+async def reconcile_stats_endpoint(dry_run: bool = False, user: User = Depends(get_current_user)):
+    """Rebuild dashboard counters from source collections and report drift"""
+    await require_role(user, [Role.ADMIN])
+    return await reconcile_stats(dry_run=dry_run)
+
+# ==================== LIVE UPDATE ENDPOINTS ====================
+
+@api_router.get("/live")
+async def live_updates(request: Request, user: User = Depends(get_current_user)):
+    """Server-sent events: lead, invitation and ticket deltas visible to the caller"""
+    audiences = [f"user:{user.user_id}"]
+    if user.role == Role.MENTOR:
+        mentor = await db.mentors.find_one({"user_id": user.user_id}, {"_id": 0, "mentor_id": 1})
+        if mentor:
+            audiences.append(f"mentor:{mentor['mentor_id']}")
+    
+    async def stream():
+        queue = live_hub.subscribe(audiences)
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(jsonable_encoder(message))}\n\n"
+        finally:
+            live_hub.unsubscribe(audiences, queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ==================== ADMIN EXPORTS ====================
+
+# Exports walk the whole collection with a Motor cursor instead of to_list(), so
+# memory stays flat however many rows there are. Joins are resolved one batch
+# at a time with fetch_map and each batch is flushed as soon as it is ready.
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+
+async def join_mentor_users(mentors: list):
+    users = await fetch_map(db.users, "user_id", [m["user_id"] for m in mentors], {"name": 1, "email": 1})
+    for mentor in mentors:
+        user_doc = users.get(mentor["user_id"], {})
+        mentor["name"] = user_doc.get("name", "Unknown")
+        mentor["email"] = user_doc.get("email", "Unknown")
+
+async def join_lead_events(leads: list):
+    events = await fetch_map(db.events, "event_id", [l["event_id"] for l in leads], {"title": 1})
+    for lead in leads:
+        event = events.get(lead["event_id"])
+        if event:
+            lead["event_title"] = event.get("title", "Unknown")
+
+# dataset -> (collection, row model, per-batch join)
+EXPORTS = {
+    "users": ("users", User, None),
+    "mentors": ("mentors", MentorView, join_mentor_users),
+    "leads": ("leads", LeadView, join_lead_events),
+}
+
+async def export_batches(collection: str, model, join):
+    """Yield lists of up to EXPORT_BATCH_SIZE rows in _id order, joined"""
+    cursor = db[collection].find({}, projection_of(model)).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            if join:
+                await join(batch)
+            yield batch
+            batch = []
+    if batch:
+        if join:
+            await join(batch)
+        yield batch
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ";".join(str(v) for v in value)
+    return value
+
+@api_router.get("/admin/export/{dataset}")
+async def export_dataset(dataset: str, format: str = Query("ndjson", pattern="^(ndjson|csv)$"), user: User = Depends(get_current_user)):
+    """Stream every user, mentor or lead as NDJSON or CSV"""
+    await require_role(user, [Role.ADMIN])
+    if dataset not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export")
+    collection, model, join = EXPORTS[dataset]
+    columns = list(model.model_fields)
+    
+    async def ndjson():
+        async for batch in export_batches(collection, model, join):
+            yield "".join(json.dumps(row, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v)) + "\n" for row in batch)
+    
+    async def csv_rows():
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        async for batch in export_batches(collection, model, join):
+            writer.writerows([csv_value(row.get(column)) for column in columns] for row in batch)
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+    return StreamingResponse(
+        ndjson() if format == "ndjson" else csv_rows(),
+        media_type="application/x-ndjson" if format == "ndjson" else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{dataset}-{stamp}.{format}"'}
+    )
+
+# ==================== INDEXES ====================
+
+# (collection, keys, options) for every query shape the endpoints above issue
+INDEX_SPECS = [
+    ("users", [("email", ASCENDING)], {"unique": True}),
+    ("users", [("user_id", ASCENDING)], {"unique": True}),
+    ("users", [("created_at", ASCENDING), ("user_id", ASCENDING)], {}),
+    ("users", [("role", ASCENDING), ("created_at", ASCENDING), ("user_id", ASCENDING)], {}),
+    ("users", [("verification_token", ASCENDING)], {"sparse": True}),
+    ("user_sessions", [("session_token", ASCENDING)], {"unique": True}),
+    # TTL: Mongo purges sessions once expires_at has passed
+    ("user_sessions", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ("mentors", [("user_id", ASCENDING)], {"unique": True}),
+    ("mentors", [("mentor_id", ASCENDING)], {"unique": True}),
+    ("mentors", [("created_at", ASCENDING), ("mentor_id", ASCENDING)], {}),
+    ("mentors", [("verification_status", ASCENDING), ("created_at", ASCENDING), ("mentor_id", ASCENDING)], {}),
+    ("events", [("event_id", ASCENDING)], {"unique": True}),
+    ("events", [("mentor_id", ASCENDING)], {}),
+    ("events", [("mentor_approved", ASCENDING), ("event_datetime", ASCENDING), ("event_id", ASCENDING)], {}),
+    ("events", [("mentor_approved", ASCENDING), ("category", ASCENDING), ("event_datetime", ASCENDING), ("event_id", ASCENDING)], {}),
+    # A collection has at most one text index; the mentor_approved prefix keeps searches off unapproved events
+    ("events", [("mentor_approved", ASCENDING)] + [(field, TEXT) for field in SEARCH_WEIGHTS], {"name": "event_search", "weights": SEARCH_WEIGHTS}),
+    ("leads", [("lead_id", ASCENDING)], {"unique": True}),
+    ("leads", [("event_id", ASCENDING), ("status", ASCENDING)], {}),
+    ("leads", [("user_id", ASCENDING)], {}),
+    ("leads", [("status", ASCENDING), ("created_at", ASCENDING), ("lead_id", ASCENDING)], {}),
+    ("leads", [("created_at", ASCENDING), ("lead_id", ASCENDING)], {}),
+    ("leads", [("payment_id", ASCENDING)], {"sparse": True}),
+    ("invitations", [("invitation_id", ASCENDING)], {"unique": True}),
+    ("invitations", [("guest_id", ASCENDING)], {}),
+    ("invitations", [("host_id", ASCENDING)], {}),
+    ("invitations", [("lead_id", ASCENDING)], {"unique": True}),
+    ("tickets", [("guest_id", ASCENDING)], {}),
+    ("tickets", [("payment_id", ASCENDING)], {"unique": True}),
+    ("payments", [("payment_id", ASCENDING)], {"unique": True}),
+    ("payments", [("status", ASCENDING), ("completed_at", ASCENDING)], {}),
+    ("ticket_payments", [("payment_id", ASCENDING)], {"unique": True}),
+    ("ticket_payments", [("status", ASCENDING), ("completed_at", ASCENDING)], {}),
+    ("email_outbox", [("dedup_key", ASCENDING)], {"unique": True}),
+    ("email_outbox", [("outbox_id", ASCENDING)], {"unique": True}),
+    ("email_outbox", [("status", ASCENDING), ("next_attempt_at", ASCENDING)], {}),
+    ("idempotency_keys", [("created_at", ASCENDING)], {"expireAfterSeconds": IDEMPOTENCY_TTL_SECONDS}),
+]
+
+# (endpoint, collection, filter, sort) used by `python server.py --explain`
+EXPLAIN_QUERIES = [
+    ("POST /auth/login", "users", {"email": "sample@example.com"}, None),
+    ("GET /auth/verify-email", "users", {"verification_token": "sample"}, None),
+    ("get_current_user (session)", "user_sessions", {"session_token": "sample"}, None),
+    ("get_current_user (user)", "users", {"user_id": "sample"}, None),
+    ("GET /events", "events", {"mentor_approved": True}, [("event_datetime", 1), ("event_id", 1)]),
+    ("GET /events?category=", "events", {"mentor_approved": True, "category": "sample"}, [("event_datetime", 1), ("event_id", 1)]),
+    ("GET /events/search", "events", {"mentor_approved": True, "$text": {"$search": "sample"}}, None),
+    ("GET /events/{event_id}", "events", {"event_id": "sample"}, None),
+    ("GET /mentor/profile", "mentors", {"user_id": "sample"}, None),
+    ("GET /mentor/events", "events", {"mentor_id": "sample"}, None),
+    ("GET /mentor/leads", "leads", {"event_id": {"$in": ["sample"]}, "status": {"$in": ["VERIFIED", "PURCHASED"]}}, None),
+    ("GET /admin/users", "users", {}, [("created_at", -1), ("user_id", -1)]),
+    ("GET /admin/users?role=", "users", {"role": "MENTOR"}, [("created_at", -1), ("user_id", -1)]),
+    ("GET /admin/mentors", "mentors", {}, [("created_at", -1), ("mentor_id", -1)]),
+    ("GET /admin/mentors?verification_status=", "mentors", {"verification_status": "PENDING"}, [("created_at", -1), ("mentor_id", -1)]),
+    ("GET /admin/leads", "leads", {}, [("created_at", -1), ("lead_id", -1)]),
+    ("GET /admin/leads?status=", "leads", {"status": "VERIFIED"}, [("created_at", -1), ("lead_id", -1)]),
+    ("GET /admin/leads/pending", "leads", {"status": "PENDING"}, [("created_at", 1), ("lead_id", 1)]),
+    ("GET /user/bookings", "leads", {"user_id": "sample"}, None),
+    ("POST /mentor/leads/{lead_id}/purchase", "leads", {"lead_id": "sample"}, None),
+    ("POST /mentor/payment-verify", "payments", {"payment_id": "sample"}, None),
+    ("POST /mentor/leads/{lead_id}/invite", "invitations", {"lead_id": "sample"}, None),
+    ("GET /user/invitations", "invitations", {"guest_id": "sample"}, None),
+    ("GET /mentor/invitations", "invitations", {"host_id": "sample"}, None),
+    ("POST /user/ticket-payment-verify", "ticket_payments", {"payment_id": "sample"}, None),
+    ("GET /user/tickets", "tickets", {"guest_id": "sample"}, None),
+    ("GET /admin/analytics (payments)", "payments", {"status": "COMPLETED", "completed_at": {"$gte": datetime(2025, 1, 1)}}, None),
+    ("GET /admin/analytics (tickets)", "ticket_payments", {"status": "COMPLETED", "completed_at": {"$gte": datetime(2025, 1, 1)}}, None),
+]
+
+async def ensure_indexes():
+    """Idempotently create every index in INDEX_SPECS"""
+    for collection, keys, options in INDEX_SPECS:
+        try:
+            try:
+                await db[collection].create_index(keys, **options)
+            except OperationFailure as e:
+                # A named index whose definition changed (e.g. new search fields) is rebuilt
+                if e.code not in (85, 86) or "name" not in options:
+                    raise
+                logger.info(f"Rebuilding index {options['name']} on {collection}")
+                await db[collection].drop_index(options["name"])
+                await db[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            # e.g. duplicate data blocking a unique index; keep serving and surface it
+            logger.error(f"Could not create index {keys} on {collection}: {e}")
+
+def summarize_plan(plan: dict) -> str:
+    """Flatten a winning plan into 'STAGE(index) <- STAGE ...'"""
+    plan = plan.get("queryPlan", plan)
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage += f"({plan['indexName']})"
+        stages.append(stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return " <- ".join(stages)
+
+async def explain_queries():
+    for endpoint, collection, query, sort in EXPLAIN_QUERIES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+        summary = summarize_plan(plan["queryPlanner"]["winningPlan"])
+        marker = "!!" if "COLLSCAN" in summary else "ok"
+        print(f"[{marker}] {endpoint:<40} {collection:<16} {summary}")
+
 app.include_router(api_router)
 
 app.add_middleware(
@@ -1671,8 +3650,51 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed"],
 )
 
+@app.on_event("startup")
+async def startup_tasks():
+    await ensure_indexes()
+    await backfill_event_catalog()
+    if not await db.stats.count_documents({"_id": "global"}, limit=1):
+        # First boot with counters: seed them from the source collections
+        await reconcile_stats()
+    app.state.email_outbox_task = asyncio.create_task(run_email_outbox())
+    app.state.change_stream_task = asyncio.create_task(run_change_stream())
+    # Open the outbound connection pool now rather than on the first login
+    get_http_client()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for name in ("email_outbox_task", "change_stream_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    await close_http_client()
     client.close()
+    password_executor.shutdown(wait=False)
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Maintenance commands for the API database")
+    parser.add_argument("--ensure-indexes", action="store_true", help="create all indexes and exit")
+    parser.add_argument("--explain", action="store_true", help="print the query plan of each endpoint query")
+    parser.add_argument("--reconcile-stats", action="store_true", help="rebuild the stats counters and print any drift")
+    parser.add_argument("--dry-run", action="store_true", help="with --reconcile-stats, report drift without repairing it")
+    args = parser.parse_args()
+    
+    async def main():
+        if args.ensure_indexes or args.explain:
+            await ensure_indexes()
+        if args.explain:
+            await explain_queries()
+        if args.reconcile_stats:
+            report = await reconcile_stats(dry_run=args.dry_run)
+            for row in report["drift"]:
+                print(f"{row['key']:<32} {row['field']:<20} stored={row['stored']} actual={row['actual']}")
+            print(f"{len(report['drift'])} drifted counters across {report['documents']} documents"
+                  f"{' (dry run)' if args.dry_run else ''}")
+    
+    asyncio.run(main())
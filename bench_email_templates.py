@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of email template rendering throughput.
+
+Renders every email template from backend/templates/email in a tight loop and
+reports renders per second, so bulk notification sends can be sized.
+
+Usage: python bench_email_templates.py [--iterations N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# server.py reads these at import; no database connection is opened
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench")
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import server  # noqa: E402
+
+LEAD = {
+    "name": "Priya Sharma",
+    "email": "priya@example.com",
+    "phone": "9876543210",
+    "message": "Looking forward to meeting <everyone> & sharing stories!"
+}
+
+CASES = {
+    "verification": lambda: server.create_verification_email("Priya", "https://thesocialcircle.in/verify-email?token=abc"),
+    "booking_confirmation": lambda: server.create_booking_confirmation_email("Priya", "Startup Founders Dinner", "January 15, 2025 at 07:00 PM"),
+    "mentor_approval": lambda: server.create_mentor_approval_email("Rajiv", "APPROVED"),
+    "lead_notification": lambda: server.create_lead_notification_email("Rajiv", "Startup Founders Dinner", 3),
+    "lead_purchase": lambda: server.create_lead_purchase_email("Rajiv", "Startup Founders Dinner", LEAD, 2000, "DEMO12AB34"),
+    "lead_purchase_batch": lambda: server.create_lead_purchase_batch_email("Rajiv", [{**LEAD, "event_title": "Startup Founders Dinner"}] * 20, 40000, "DEMO12AB34"),
+    "invitation": lambda: server.create_invitation_email("Priya", "Startup Founders Dinner", 1500),
+    "pass": lambda: server.create_pass_email("Priya", "Startup Founders Dinner"),
+    "ticket_confirmation": lambda: server.create_ticket_confirmation_email("Priya", "Startup Founders Dinner", "ticket_0123456789ab", 1500),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"🔍 Rendering each template {args.iterations} times\n")
+    print(f"{'template':<22} {'renders/s':>12} {'µs/render':>10} {'bytes':>7}")
+    total_start = time.perf_counter()
+    for name, render in CASES.items():
+        size = len(render().encode("utf-8"))
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            render()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<22} {args.iterations / elapsed:>12,.0f} {elapsed / args.iterations * 1e6:>10.1f} {size:>7}")
+
+    total = time.perf_counter() - total_start
+    print(f"\n{len(CASES) * args.iterations / total:,.0f} renders/s overall")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare a new httpx client per call (the old OAuth exchange) with the shared
+outbound pool, against the local upstream stub.
+
+Starts stub_upstream.py on a free port unless --url points at a running one
+(e.g. a stub behind TLS, where connection setup costs more), then fires the
+same OAuth session-data calls both ways and reports throughput and latency.
+
+Usage: python bench_http_pool.py [--requests N] [--concurrency N] [--latency-ms N] [--url URL]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# server.py reads these at import; no database connection is opened
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench")
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import server  # noqa: E402
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def start_stub(latency_ms):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    stub = subprocess.Popen(
+        [sys.executable, str(Path(__file__).parent / "stub_upstream.py"), "--port", str(port), "--latency-ms", str(latency_ms)]
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.post(f"{url}/_stub/config", json={})
+            return stub, url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    stub.kill()
+    raise RuntimeError("stub server did not start")
+
+async def per_call_client(url, i):
+    async with httpx.AsyncClient() as http_client:
+        return await http_client.get(url, headers={"X-Session-ID": f"bench{i}"})
+
+async def shared_pool(url, i):
+    return await server.upstream_request("bench", "GET", url, headers={"X-Session-ID": f"bench{i}"})
+
+async def run(call, url, requests, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one(i):
+        async with slots:
+            start = time.perf_counter()
+            response = await call(url, i)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return samples, time.perf_counter() - start
+
+async def main(args):
+    url = f"{args.url}/auth/v1/env/oauth/session-data"
+    print(f"🔍 {args.requests} calls, {args.concurrency} in flight, HTTP/2 {'on' if server.HTTP2_AVAILABLE else 'off (pip install h2)'}\n")
+    print(f"{'client':<16} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, call in (("per-call client", per_call_client), ("shared pool", shared_pool)):
+        await run(call, url, min(args.requests, 50), args.concurrency)  # warm-up
+        samples, elapsed = await run(call, url, args.requests, args.concurrency)
+        print(f"{label:<16} {args.requests / elapsed:>9,.0f} {statistics.median(samples):>8.2f} {percentile(samples, 99):>8.2f}")
+    await server.close_http_client()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--url", help="base URL of an already running stub")
+    args = parser.parse_args()
+
+    stub = None
+    if not args.url:
+        stub, args.url = start_stub(args.latency_ms)
+    try:
+        asyncio.run(main(args))
+    finally:
+        if stub:
+            stub.terminate()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Measure GET /api/events latency while logins hammer bcrypt.
+
+Runs the catalog probe twice: once on an idle server and once while LOGIN_THREADS
+clients log in back to back. If password hashing blocked the event loop, p99 in
+the second run would jump by hundreds of milliseconds per concurrent login.
+
+Usage: python bench_login_latency.py [base_url] [--seconds N] [--login-threads N]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def probe_events(base_url, stop, samples):
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = session.get(f"{base_url}/api/events")
+        samples.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            print(f"❌ /api/events returned {response.status_code}")
+
+def hammer_login(base_url, creds, stop, counts):
+    session = requests.Session()
+    while not stop.is_set():
+        response = session.post(f"{base_url}/api/auth/login", json=creds)
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+def run_phase(base_url, creds, seconds, login_threads):
+    stop = threading.Event()
+    samples = []
+    counts = {}
+    with ThreadPoolExecutor(max_workers=login_threads + 1) as pool:
+        pool.submit(probe_events, base_url, stop, samples)
+        for _ in range(login_threads):
+            pool.submit(hammer_login, base_url, creds, stop, counts)
+        time.sleep(seconds)
+        stop.set()
+    return samples, counts
+
+def report(label, samples, counts, seconds):
+    if not samples:
+        print(f"{label}: no samples")
+        return
+    print(f"{label}")
+    print(f"  /api/events requests: {len(samples)}")
+    print(f"  p50: {statistics.median(samples):8.1f} ms")
+    print(f"  p95: {percentile(samples, 95):8.1f} ms")
+    print(f"  p99: {percentile(samples, 99):8.1f} ms")
+    print(f"  max: {max(samples):8.1f} ms")
+    if counts:
+        logins = sum(counts.values())
+        print(f"  logins: {logins} ({logins / seconds:.1f}/s) by status {counts}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base_url", nargs="?", default="http://localhost:8001")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--login-threads", type=int, default=16)
+    parser.add_argument("--email", default="amit.tech@gmail.com")
+    parser.add_argument("--password", default="guest123")
+    args = parser.parse_args()
+
+    creds = {"email": args.email, "password": args.password}
+    response = requests.post(f"{args.base_url}/api/auth/login", json=creds)
+    if response.status_code != 200:
+        print(f"❌ Login with {args.email} failed: {response.status_code} {response.text}")
+        return 1
+
+    print(f"🔍 Benchmarking {args.base_url} for {args.seconds}s per phase\n")
+    samples, counts = run_phase(args.base_url, creds, args.seconds, 0)
+    report("Idle", samples, counts, args.seconds)
+    samples, counts = run_phase(args.base_url, creds, args.seconds, args.login_threads)
+    report(f"Under {args.login_threads} concurrent login loops", samples, counts, args.seconds)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Compare bytes transferred and decode time of list queries with and without
+their response-model projections.
+
+Seeds a throwaway database on a local MongoDB (MONGO_URL, default
+mongodb://localhost:27017), then runs every query with its old projection
+(only _id removed) and with the one derived from its response model.
+
+Usage: python bench_projections.py [--docs N] [--repeat N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import MongoClient
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = f"projection_bench_{uuid.uuid4().hex[:8]}"
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import server  # noqa: E402
+
+# (label, collection, before, after)
+CASES = [
+    ("get_current_user", "users", {"_id": 0}, server.projection_of(server.User)),
+    ("GET /admin/users", "users", {"_id": 0, "password_hash": 0}, server.projection_of(server.User)),
+    ("GET /admin/leads", "leads", {"_id": 0}, server.projection_of(server.LeadView)),
+    ("GET /mentor/leads", "leads", {"_id": 0}, server.projection_of(server.MentorLeadView)),
+    ("GET /mentor/invitations", "invitations", {"_id": 0}, server.projection_of(server.HostInvitationView)),
+    ("GET /user/tickets (events)", "events", {"_id": 0}, {"_id": 0, **server.EVENT_SUMMARY_FIELDS}),
+]
+
+def seed(db, docs):
+    now = datetime.now(timezone.utc)
+    db.users.insert_many([{
+        "user_id": f"user_{i}",
+        "email": f"guest{i}@example.com",
+        "name": f"Guest {i}",
+        "password_hash": "$2b$12$" + "x" * 53,
+        "verification_token": uuid.uuid4().hex * 2,
+        "verification_token_expires": now + timedelta(days=1),
+        "role": "USER",
+        "email_verified": True,
+        "created_at": now
+    } for i in range(docs)])
+    db.leads.insert_many([{
+        "lead_id": f"lead_{i}",
+        "event_id": f"event_{i % 50}",
+        "user_id": f"user_{i}",
+        "name": f"Guest {i}",
+        "email": f"guest{i}@example.com",
+        "phone": "9876543210",
+        "message": "Looking forward to meeting everyone and sharing stories over dinner!",
+        "status": "PURCHASED",
+        "verification_status": "AUTO_VERIFIED",
+        "verified_by": "user_admin",
+        "verified_at": now,
+        "purchased_by": "mentor_0",
+        "payment_id": f"payment_{i}",
+        "purchased_at": now,
+        "created_at": now
+    } for i in range(docs)])
+    db.invitations.insert_many([{
+        "invitation_id": f"inv_{i}",
+        "lead_id": f"lead_{i}",
+        "event_id": f"event_{i % 50}",
+        "host_id": "mentor_0",
+        "guest_id": f"user_{i}",
+        "ticket_price": 1500.0,
+        "status": "PAID",
+        "payment_id": f"ticket_pay_{i}",
+        "invited_at": now,
+        "paid_at": now
+    } for i in range(docs)])
+    db.events.insert_many([{
+        "event_id": f"event_{i}",
+        "mentor_id": "mentor_0",
+        "title": f"Startup Founders Dinner {i}",
+        "description": "An evening of conversations about building companies. " * 10,
+        "category": "Networking",
+        "event_datetime": now + timedelta(days=i),
+        "duration": 120,
+        "available_slots": 20,
+        "price_per_lead": 299.0,
+        "mentor_approved": True,
+        "created_at": now
+    } for i in range(docs)])
+
+def measure(collection, projection, repeat):
+    """Bytes returned by the server, and median ms to decode them into dicts"""
+    raw = collection.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+    docs = list(raw.find({}, projection))
+    payload = b"".join(doc.raw for doc in docs)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        bson.decode_all(payload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return len(payload), statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ["MONGO_URL"])
+    db = client[os.environ["DB_NAME"]]
+    try:
+        seed(db, args.docs)
+        print(f"🔍 {args.docs} documents per collection, decode median of {args.repeat} runs\n")
+        print(f"{'query':<28} {'bytes before':>13} {'bytes after':>12} {'saved':>6} {'decode before':>14} {'decode after':>13}")
+        for label, name, before, after in CASES:
+            bytes_before, ms_before = measure(db[name], before, args.repeat)
+            bytes_after, ms_after = measure(db[name], after, args.repeat)
+            saved = 1 - bytes_after / bytes_before
+            print(f"{label:<28} {bytes_before:>13,} {bytes_after:>12,} {saved:>6.0%} {ms_before:>11.2f} ms {ms_after:>10.2f} ms")
+    finally:
+        client.drop_database(os.environ["DB_NAME"])
+
+if __name__ == "__main__":
+    main()
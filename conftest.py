@@ -0,0 +1,101 @@
+"""
+Shared setup for the root test scripts that drive backend/server.py in-process.
+
+server is imported once per process, so its module-level settings cannot differ
+between test files. Each test goes through run() instead, which gives it its own
+throwaway database on MONGO_URL (default mongodb://localhost:27017), patches the
+settings it needs onto server, and resets server's per-process state. The
+scripts import this module, so they also run on their own: python test_x.py
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+from cachetools import TTLCache
+from motor.motor_asyncio import AsyncIOMotorClient
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "socialcircle_test")
+os.environ.setdefault("EMAIL_BACKEND", "fake")
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import server  # noqa: E402
+
+def session_cookie(token: str) -> dict:
+    return {"Cookie": f"session_token={token}"}
+
+def user_doc(user_id: str, role: str = "USER", **fields) -> dict:
+    return {
+        "user_id": user_id,
+        "email": f"{user_id}@example.com",
+        "name": user_id,
+        "role": role,
+        "email_verified": True,
+        "created_at": datetime.now(timezone.utc),
+        **fields
+    }
+
+async def seed_users(*users: dict):
+    """Insert `users` (see user_doc), each with a day-long session: user_x logs in as session_x"""
+    now = datetime.now(timezone.utc)
+    await server.db.users.insert_many(list(users))
+    await server.db.user_sessions.insert_many([{
+        "user_id": user["user_id"],
+        "session_token": user["user_id"].replace("user_", "session_", 1),
+        "expires_at": now + timedelta(days=1),
+        "created_at": now
+    } for user in users])
+
+def api_client(raise_app_exceptions: bool = True, **kwargs) -> httpx.AsyncClient:
+    """A client calling server.app in-process"""
+    transport = httpx.ASGITransport(app=server.app, raise_app_exceptions=raise_app_exceptions)
+    return httpx.AsyncClient(transport=transport, base_url="http://test", **kwargs)
+
+def fresh_state() -> dict:
+    """New instances of server's caches, clients and loop-bound primitives"""
+    return {
+        "session_cache": TTLCache(maxsize=server.session_cache.maxsize, ttl=server.session_cache.ttl),
+        "event_owner_cache": TTLCache(maxsize=server.event_owner_cache.maxsize, ttl=server.event_owner_cache.ttl),
+        "response_cache": server.create_response_cache(),
+        "search_index": server.SearchIndex(),
+        "live_hub": server.LiveHub(),
+        "fake_resend": server.FakeResend(),
+        "outbox_wakeup": asyncio.Event(),
+        "password_slots": asyncio.Semaphore(server.PASSWORD_HASH_WORKERS + server.PASSWORD_HASH_MAX_QUEUE),
+        "circuit_breakers": {},
+        "http_client": None,
+        "transactions_available": None,
+    }
+
+async def in_throwaway_database(patch, mongo_url: str, main, args):
+    # Motor clients bind to the first event loop that uses them, so each run gets its own
+    client = AsyncIOMotorClient(mongo_url)
+    patch.setattr(server, "client", client)
+    patch.setattr(server, "db", client[f"{os.environ['DB_NAME']}_{uuid.uuid4().hex[:8]}"])
+    try:
+        await server.ensure_indexes()
+        await main(*args)
+    finally:
+        await server.close_http_client()
+        await client.drop_database(server.db.name)
+        client.close()
+
+def run(main, *args, mongo_url: str = None, **settings):
+    """
+    asyncio.run(main(*args)) in a throwaway database, with `settings` patched onto
+    server (e.g. OUTBOX_MAX_ATTEMPTS=3) and everything restored afterwards.
+    Emails go to server.fake_resend unless EMAIL_BACKEND is given.
+    """
+    with pytest.MonkeyPatch.context() as patch:
+        for name, value in {"EMAIL_BACKEND": "fake", **settings}.items():
+            patch.setattr(server, name, value)
+        # After the settings, so e.g. RESPONSE_CACHE_BACKEND picks the cache type
+        for name, value in fresh_state().items():
+            patch.setattr(server, name, value)
+        asyncio.run(in_throwaway_database(patch, mongo_url or os.environ["MONGO_URL"], main, args))
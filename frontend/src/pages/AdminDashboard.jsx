@@ -8,12 +8,22 @@ import { Users, UserCheck, TrendingUp, DollarSign, CheckCircle, XCircle } from '
 import { toast } from 'sonner';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+const PAGE_SIZE = 50;
+
+// Each admin list is keyset-paginated; `param` is the query filter its select sets
+const LISTS = {
+  users: { url: '/api/admin/users', param: 'role', options: ['USER', 'MENTOR', 'ADMIN'] },
+  mentors: { url: '/api/admin/mentors', param: 'verification_status', options: ['PENDING', 'APPROVED', 'REJECTED'] },
+  leads: { url: '/api/admin/leads', param: 'status', options: ['PENDING', 'VERIFIED', 'REJECTED', 'PURCHASED', 'INVITED', 'CONFIRMED', 'PASSED'] },
+};
 
 function AdminDashboard() {
   const [user, setUser] = useState(null);
   const [users, setUsers] = useState([]);
   const [mentors, setMentors] = useState([]);
   const [leads, setLeads] = useState([]);
+  const [cursors, setCursors] = useState({});
+  const [filters, setFilters] = useState({ users: '', mentors: 'PENDING', leads: 'PENDING' });
   const [analytics, setAnalytics] = useState(null);
   const [loading, setLoading] = useState(true);
   const navigate = useNavigate();
@@ -43,18 +53,30 @@ function AdminDashboard() {
     checkAuth();
   }, [navigate, location.state]);
 
+  const setters = { users: setUsers, mentors: setMentors, leads: setLeads };
+
+  // Loads the first page of a list, or appends the next one when `more` is set
+  const fetchPage = async (list, { more = false, filter = filters[list] } = {}) => {
+    const { url, param } = LISTS[list];
+    const response = await axios.get(`${BACKEND_URL}${url}`, {
+      params: {
+        limit: PAGE_SIZE,
+        ...(filter && { [param]: filter }),
+        ...(more && { cursor: cursors[list] }),
+      },
+      withCredentials: true,
+    });
+    setters[list]((rows) => (more ? [...rows, ...response.data] : response.data));
+    setCursors((current) => ({ ...current, [list]: response.headers['x-next-cursor'] || null }));
+  };
+
   const fetchData = async () => {
     try {
-      const [usersRes, mentorsRes, leadsRes, analyticsRes] = await Promise.all([
-        axios.get(`${BACKEND_URL}/api/admin/users`, { withCredentials: true }),
-        axios.get(`${BACKEND_URL}/api/admin/mentors`, { withCredentials: true }),
-        axios.get(`${BACKEND_URL}/api/admin/leads`, { withCredentials: true }),
+      const [analyticsRes] = await Promise.all([
         axios.get(`${BACKEND_URL}/api/admin/analytics`, { withCredentials: true }),
+        ...Object.keys(LISTS).map((list) => fetchPage(list)),
       ]);
       
-      setUsers(usersRes.data);
-      setMentors(mentorsRes.data);
-      setLeads(leadsRes.data);
       setAnalytics(analyticsRes.data);
     } catch (error) {
       console.error('Error fetching data:', error);
@@ -63,6 +85,50 @@ function AdminDashboard() {
     }
   };
 
+  const handleFilter = async (list, filter) => {
+    setFilters((current) => ({ ...current, [list]: filter }));
+    try {
+      await fetchPage(list, { filter });
+    } catch (error) {
+      toast.error('Failed to load list');
+    }
+  };
+
+  const handleLoadMore = async (list) => {
+    try {
+      await fetchPage(list, { more: true });
+    } catch (error) {
+      toast.error('Failed to load more');
+    }
+  };
+
+  const renderFilter = (list, allLabel) => (
+    <select
+      value={filters[list]}
+      onChange={(e) => handleFilter(list, e.target.value)}
+      className="px-4 py-2 rounded-xl border border-border text-sm focus:outline-none focus:ring-2 focus:ring-primary/20 bg-white"
+      data-testid={`filter-${list}`}
+    >
+      <option value="">{allLabel}</option>
+      {LISTS[list].options.map((option) => (
+        <option key={option} value={option}>{option}</option>
+      ))}
+    </select>
+  );
+
+  const renderLoadMore = (list) => cursors[list] && (
+    <div className="text-center mt-6">
+      <Button
+        variant="outline"
+        onClick={() => handleLoadMore(list)}
+        className="rounded-full"
+        data-testid={`load-more-${list}`}
+      >
+        Load more
+      </Button>
+    </div>
+  );
+
   const handleVerifyMentor = async (mentorId, status) => {
     try {
       await axios.put(
@@ -172,11 +238,16 @@ function AdminDashboard() {
 
           <TabsContent value="mentors">
             <div className="bg-white border border-border shadow-sm rounded-xl p-8">
-              <h2 className="text-2xl font-heading font-bold mb-6">Mentor Verification</h2>
+              <div className="flex items-center justify-between mb-6">
+                <h2 className="text-2xl font-heading font-bold">Mentor Verification</h2>
+                {renderFilter('mentors', 'All statuses')}
+              </div>
               
               {mentors.length === 0 ? (
                 <div className="text-center py-12 bg-muted rounded-xl">
-                  <p className="text-muted-foreground">No mentors registered yet.</p>
+                  <p className="text-muted-foreground">
+                    {filters.mentors ? `No ${filters.mentors.toLowerCase()} mentors.` : 'No mentors registered yet.'}
+                  </p>
                 </div>
               ) : (
                 <div className="space-y-4">
@@ -247,16 +318,22 @@ function AdminDashboard() {
                   ))}
                 </div>
               )}
+              {renderLoadMore('mentors')}
             </div>
           </TabsContent>
 
           <TabsContent value="leads">
             <div className="bg-white border border-border shadow-sm rounded-xl p-8">
-              <h2 className="text-2xl font-heading font-bold mb-6">Lead Verification</h2>
+              <div className="flex items-center justify-between mb-6">
+                <h2 className="text-2xl font-heading font-bold">Lead Verification</h2>
+                {renderFilter('leads', 'All statuses')}
+              </div>
               
               {leads.length === 0 ? (
                 <div className="text-center py-12 bg-muted rounded-xl">
-                  <p className="text-muted-foreground">No leads yet.</p>
+                  <p className="text-muted-foreground">
+                    {filters.leads ? `No ${filters.leads.toLowerCase()} leads.` : 'No leads yet.'}
+                  </p>
                 </div>
               ) : (
                 <div className="space-y-4">
@@ -322,16 +399,22 @@ function AdminDashboard() {
                   ))}
                 </div>
               )}
+              {renderLoadMore('leads')}
             </div>
           </TabsContent>
 
           <TabsContent value="users">
             <div className="bg-white border border-border shadow-sm rounded-xl p-8">
-              <h2 className="text-2xl font-heading font-bold mb-6">All Users</h2>
+              <div className="flex items-center justify-between mb-6">
+                <h2 className="text-2xl font-heading font-bold">All Users</h2>
+                {renderFilter('users', 'All roles')}
+              </div>
               
               {users.length === 0 ? (
                 <div className="text-center py-12 bg-muted rounded-xl">
-                  <p className="text-muted-foreground">No users registered yet.</p>
+                  <p className="text-muted-foreground">
+                    {filters.users ? `No users with role ${filters.users}.` : 'No users registered yet.'}
+                  </p>
                 </div>
               ) : (
                 <div className="overflow-x-auto">
@@ -371,6 +454,7 @@ function AdminDashboard() {
                   </table>
                 </div>
               )}
+              {renderLoadMore('users')}
             </div>
           </TabsContent>
         </Tabs>
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import axios from 'axios';
 import Navbar from '../components/Navbar';
 import Footer from '../components/Footer';
@@ -8,6 +8,8 @@ import { Calendar, Clock, Users, Search, Filter, ArrowRight, X, Utensils, Palett
 import { Link } from 'react-router-dom';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+const PAGE_SIZE = 24;
+const SEARCH_LIMIT = 100;
 
 // Category data
 const CATEGORIES = [
@@ -30,64 +32,109 @@ const EVENT_IMAGES = [
   'https://images.unsplash.com/photo-1543007630-9710e4a00a20?w=600&h=400&fit=crop',
 ];
 
+const PRICE_RANGES = [
+  { value: '0-1000', label: 'Under ₹1,000' },
+  { value: '1000-2500', label: '₹1,000 - ₹2,500' },
+  { value: '2500-5000', label: '₹2,500 - ₹5,000' },
+  { value: '5000-', label: '₹5,000+' },
+];
+
+// Query params for the selected category pill and price range (e.g. '1000-2500', '5000-')
+const filterParams = (category, priceRange) => {
+  const params = category !== 'All' ? { category } : {};
+  if (priceRange !== 'all') {
+    const [min, max] = priceRange.split('-');
+    params.min_price = Number(min);
+    if (max) params.max_price = Number(max);
+  }
+  return params;
+};
+
 function Events() {
   const [events, setEvents] = useState([]);
-  const [filteredEvents, setFilteredEvents] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedCategory, setSelectedCategory] = useState('All');
   const [searchQuery, setSearchQuery] = useState('');
+  // { results, total, facets } from /events/search while a query is typed
+  const [search, setSearch] = useState(null);
   const [priceRange, setPriceRange] = useState('all');
+  // Bumped when the filters change, so pages of an older listing are dropped
+  const listing = useRef(0);
 
   useEffect(() => {
+    listing.current += 1;
     fetchEvents();
-  }, []);
+  }, [selectedCategory, priceRange]);
 
+  // Search runs server-side with the selected filters, once typing pauses
   useEffect(() => {
-    filterEvents();
-  }, [events, selectedCategory, searchQuery, priceRange]);
+    const query = searchQuery.trim();
+    if (!query) {
+      setSearch(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get(`${BACKEND_URL}/api/events/search`, {
+          params: { q: query, upcoming: true, limit: SEARCH_LIMIT, ...filterParams(selectedCategory, priceRange) }
+        });
+        if (!cancelled) setSearch(response.data);
+      } catch (error) {
+        console.error('Error searching events:', error);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchQuery, selectedCategory, priceRange]);
 
-  const fetchEvents = async () => {
+  // One page of upcoming events; with a cursor the page is appended ("Load more")
+  const fetchEvents = async (cursor = null) => {
+    const current = listing.current;
+    if (cursor) {
+      setLoadingMore(true);
+    } else {
+      setLoading(true);
+    }
     try {
-      const response = await axios.get(`${BACKEND_URL}/api/events`);
-      setEvents(response.data);
+      const response = await axios.get(`${BACKEND_URL}/api/events`, {
+        params: {
+          upcoming: true,
+          limit: PAGE_SIZE,
+          ...filterParams(selectedCategory, priceRange),
+          ...(cursor && { cursor }),
+        }
+      });
+      if (current !== listing.current) return;
+      setEvents((shown) => (cursor ? [...shown, ...response.data] : response.data));
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching events:', error);
     } finally {
-      setLoading(false);
+      if (current === listing.current) {
+        setLoading(false);
+        setLoadingMore(false);
+      }
     }
   };
 
-  const filterEvents = () => {
-    let filtered = [...events];
-    
-    if (selectedCategory !== 'All') {
-      filtered = filtered.filter(event => 
-        event.category?.toLowerCase().includes(selectedCategory.toLowerCase()) ||
-        selectedCategory.toLowerCase().includes(event.category?.toLowerCase())
-      );
-    }
-    
-    if (searchQuery) {
-      const query = searchQuery.toLowerCase();
-      filtered = filtered.filter(event =>
-        event.title?.toLowerCase().includes(query) ||
-        event.description?.toLowerCase().includes(query) ||
-        event.mentor_name?.toLowerCase().includes(query)
-      );
-    }
-    
-    if (priceRange !== 'all') {
-      const [min, max] = priceRange.split('-').map(Number);
-      filtered = filtered.filter(event => {
-        const price = event.price_per_lead || 0;
-        if (max) {
-          return price >= min && price <= max;
-        }
-        return price >= min;
-      });
-    }
-    
-    setFilteredEvents(filtered);
+  const shownEvents = search ? search.results : events;
+
+  // Facet counts of the current search; each ignores its own filter, so they
+  // tell how many matches picking that category or price range would give
+  const categoryCount = (name) => {
+    if (!search) return null;
+    if (name === 'All') return search.facets.category.reduce((sum, row) => sum + row.count, 0);
+    return search.facets.category.find((row) => row.value === name)?.count ?? 0;
+  };
+  const priceCount = (range) => {
+    if (!search) return null;
+    const min = Number(range.split('-')[0]);
+    return search.facets.price.find((row) => row.min === min)?.count ?? 0;
   };
 
   const getCategoryIcon = (category) => {
@@ -155,6 +202,7 @@ function Events() {
                 >
                   <Icon className="w-4 h-4" />
                   {cat.name}
+                  {search && <span className="opacity-60">({categoryCount(cat.name)})</span>}
                 </button>
               );
             })}
@@ -172,10 +220,11 @@ function Events() {
               className="px-4 py-2 rounded-xl border border-cream-300 text-sm focus:outline-none focus:ring-2 focus:ring-navy-200 bg-cream-50"
             >
               <option value="all">All Prices</option>
-              <option value="0-1000">Under ₹1,000</option>
-              <option value="1000-2500">₹1,000 - ₹2,500</option>
-              <option value="2500-5000">₹2,500 - ₹5,000</option>
-              <option value="5000-">₹5,000+</option>
+              {PRICE_RANGES.map((range) => (
+                <option key={range.value} value={range.value}>
+                  {range.label}{search ? ` (${priceCount(range.value)})` : ''}
+                </option>
+              ))}
             </select>
             
             {(selectedCategory !== 'All' || searchQuery || priceRange !== 'all') && (
@@ -188,7 +237,16 @@ function Events() {
             )}
             
             <div className="ml-auto text-sm text-navy-500">
-              {filteredEvents.length} event{filteredEvents.length !== 1 ? 's' : ''} found
+              {search ? (
+                <>
+                  {search.total} event{search.total !== 1 ? 's' : ''} found
+                  {search.total > search.results.length && ` (showing the top ${search.results.length})`}
+                </>
+              ) : (
+                <>
+                  {events.length}{nextCursor ? '+' : ''} event{events.length !== 1 ? 's' : ''} found
+                </>
+              )}
             </div>
           </div>
         </div>
@@ -201,7 +259,7 @@ function Events() {
             <div className="flex justify-center py-20">
               <div className="w-12 h-12 border-3 border-navy-200 border-t-navy-600 rounded-full animate-spin"></div>
             </div>
-          ) : filteredEvents.length === 0 ? (
+          ) : shownEvents.length === 0 ? (
             <div className="text-center py-20">
               <Search className="w-16 h-16 text-navy-300 mx-auto mb-6" />
               <h3 className="text-2xl font-heading text-navy-900 mb-2">No events found</h3>
@@ -212,7 +270,7 @@ function Events() {
             </div>
           ) : (
             <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-8">
-              {filteredEvents.map((event, index) => {
+              {shownEvents.map((event, index) => {
                 const CategoryIcon = getCategoryIcon(event.category);
                 const eventDate = new Date(event.event_datetime);
                 
@@ -288,6 +346,19 @@ function Events() {
               })}
             </div>
           )}
+          
+          {!loading && !search && nextCursor && (
+            <div className="text-center mt-12">
+              <Button
+                variant="outline"
+                onClick={() => fetchEvents(nextCursor)}
+                disabled={loadingMore}
+                className="rounded-xl border-navy-200 text-navy-700 hover:bg-cream-100 px-8"
+              >
+                {loadingMore ? 'Loading...' : 'Load more events'}
+              </Button>
+            </div>
+          )}
         </div>
       </section>
 
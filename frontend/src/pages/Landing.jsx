@@ -37,7 +37,7 @@ function Landing() {
 
   const fetchEvents = async () => {
     try {
-      const response = await axios.get(`${BACKEND_URL}/api/events`);
+      const response = await axios.get(`${BACKEND_URL}/api/events`, { params: { upcoming: true, limit: 6 } });
       setEvents(response.data);
     } catch (error) {
       console.error('Error fetching events:', error);
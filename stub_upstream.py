@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the upstream APIs the backend calls: the Emergent OAuth
+session-data endpoint and Resend's POST /emails.
+
+Adds a fixed latency to every call and can be told to fail, so the pooled HTTP
+client and its circuit breaker can be measured and tested offline. Point the
+backend at it with
+    OAUTH_SESSION_URL=http://127.0.0.1:8099/auth/v1/env/oauth/session-data
+    RESEND_API_URL=http://127.0.0.1:8099
+
+Usage: python stub_upstream.py [--port N] [--latency-ms N]
+"""
+
+import argparse
+import asyncio
+import uuid
+
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI()
+app.state.latency_ms = 0.0
+app.state.fail_next = 0
+app.state.calls = 0
+
+async def simulate():
+    """Apply latency; returns an error response while failures are queued"""
+    app.state.calls += 1
+    if app.state.latency_ms:
+        await asyncio.sleep(app.state.latency_ms / 1000)
+    if app.state.fail_next > 0:
+        app.state.fail_next -= 1
+        return JSONResponse({"error": "stub failure"}, status_code=503)
+    return None
+
+@app.get("/auth/v1/env/oauth/session-data")
+async def session_data(x_session_id: str = Header("")):
+    failure = await simulate()
+    if failure:
+        return failure
+    if not x_session_id or x_session_id.startswith("invalid"):
+        return JSONResponse({"error": "unknown session"}, status_code=404)
+    return {
+        "id": x_session_id,
+        "email": f"{x_session_id}@stub.example.com",
+        "name": f"Stub {x_session_id}",
+        "picture": None,
+        "session_token": f"stub_session_{uuid.uuid4().hex}"
+    }
+
+@app.post("/emails")
+async def send_email(request: Request):
+    failure = await simulate()
+    if failure:
+        return failure
+    await request.json()
+    return {"id": f"stub_{uuid.uuid4().hex[:12]}"}
+
+@app.post("/_stub/config")
+async def configure(request: Request):
+    """Change latency_ms / fail_next at runtime; returns the call counter"""
+    body = await request.json()
+    app.state.latency_ms = float(body.get("latency_ms", app.state.latency_ms))
+    app.state.fail_next = int(body.get("fail_next", app.state.fail_next))
+    return {"latency_ms": app.state.latency_ms, "fail_next": app.state.fail_next, "calls": app.state.calls}
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+    app.state.latency_ms = args.latency_ms
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
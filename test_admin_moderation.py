@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Lead moderation: the oldest-first PENDING queue pages through ties on
+created_at, and batch decisions report duplicates, unknown ids and a failed
+ordered chunk while keeping the counters in step.
+"""
+
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from conftest import api_client, run, seed_users, server, session_cookie, user_doc
+
+ADMIN = session_cookie("session_admin")
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+async def seed():
+    await seed_users(user_doc("user_admin", "ADMIN"), user_doc("user_host", "MENTOR"))
+    await server.db.mentors.insert_one({
+        "mentor_id": "mentor_host",
+        "user_id": "user_host",
+        "verification_status": "APPROVED",
+        "created_at": NOW
+    })
+    await server.db.events.insert_one({
+        "event_id": "event_mod",
+        "mentor_id": "mentor_host",
+        "title": "Moderated Dinner",
+        "description": "d",
+        "category": "Food",
+        "event_datetime": NOW + timedelta(days=7),
+        "duration": 120,
+        "available_slots": 10,
+        "price_per_lead": 100.0,
+        "created_at": NOW
+    })
+    # Inserted newest first, three leads per created_at
+    await server.db.leads.insert_many([{
+        "lead_id": f"lead_{i:02d}",
+        "event_id": "event_mod",
+        "user_id": f"user_guest_{i}",
+        "name": f"Guest {i}",
+        "email": f"guest{i}@example.com",
+        "phone": "9876543210",
+        "status": "VERIFIED" if i == 12 else "PENDING",
+        "created_at": NOW - timedelta(minutes=10 - i // 3)
+    } for i in reversed(range(13))])
+    await server.reconcile_stats()
+
+async def pending_queue(http, limit):
+    """Lead ids of the whole PENDING queue, following X-Next-Cursor"""
+    ids, cursor = [], None
+    while True:
+        page = await http.get("/api/admin/leads/pending", params={"limit": limit, **({"cursor": cursor} if cursor else {})}, headers=ADMIN)
+        assert page.status_code == 200, page.text
+        ids += [lead["lead_id"] for lead in page.json()]
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+async def decide(http, *decisions):
+    response = await http.put("/api/admin/leads/verify-batch", json={"decisions": [
+        {"lead_id": lead_id, "status": status} for lead_id, status in decisions
+    ]}, headers=ADMIN)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def errors(result):
+    return [(r["lead_id"], r.get("error")) for r in result["results"] if not r["applied"]]
+
+class FailingLeads:
+    """db.leads whose bulk_write applies the operations before `lead_id`, then fails on it"""
+    def __init__(self, leads, lead_id):
+        self.leads, self.lead_id = leads, lead_id
+
+    def __getattr__(self, name):
+        return getattr(self.leads, name)
+
+    async def bulk_write(self, operations, ordered=True):
+        ids = [operation._filter["lead_id"] for operation in operations]
+        if self.lead_id not in ids:
+            return await self.leads.bulk_write(operations, ordered=ordered)
+        index = ids.index(self.lead_id)
+        if index:
+            await self.leads.bulk_write(operations[:index], ordered=ordered)
+        raise BulkWriteError({"writeErrors": [{"index": index, "code": 121, "errmsg": "Document failed validation"}]})
+
+class FailingDatabase:
+    def __init__(self, db, lead_id):
+        self.db, self.leads = db, FailingLeads(db.leads, lead_id)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def __getitem__(self, name):
+        return self.leads if name == "leads" else self.db[name]
+
+async def check_pending_queue(http):
+    expected = [f"lead_{i:02d}" for i in range(12)]
+    assert await pending_queue(http, limit=5) == expected
+    assert await pending_queue(http, limit=1) == expected
+    print("✅ The PENDING queue pages oldest first across created_at ties")
+
+async def check_decisions(http):
+    result = await decide(http, ("lead_00", "VERIFIED"), ("lead_01", "REJECTED"), ("lead_00", "REJECTED"), ("lead_zz", "VERIFIED"))
+    assert (result["applied"], result["failed"]) == (2, 2), result
+    assert errors(result) == [("lead_00", "Duplicate lead_id in batch"), ("lead_zz", "Lead not found")]
+    assert (await server.db.leads.find_one({"lead_id": "lead_00"}))["status"] == "VERIFIED"
+
+    stats = await server.get_stats("event:event_mod")
+    assert (stats["leads_PENDING"], stats["leads_VERIFIED"], stats["leads_REJECTED"]) == (10, 2, 1), stats
+    assert await server.db.verification_logs.count_documents({}) == 2
+    print("✅ Duplicate and unknown ids are reported; applied decisions move the counters")
+
+async def check_failed_chunk(http):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(server, "LEAD_VERIFY_CHUNK", 3)
+        patch.setattr(server, "db", FailingDatabase(server.db, "lead_06"))
+        result = await decide(http, *((f"lead_{i:02d}", "VERIFIED") for i in range(2, 9)))
+    assert result["applied"] == 4 and [r["lead_id"] for r in result["results"] if r["applied"]] == ["lead_02", "lead_03", "lead_04", "lead_05"]
+    assert errors(result) == [
+        ("lead_06", "Document failed validation"),
+        ("lead_07", "Skipped after an earlier failure"),
+        ("lead_08", "Skipped after an earlier failure")
+    ], result
+
+    assert await pending_queue(http, limit=4) == [f"lead_{i:02d}" for i in range(6, 12)]
+    stats = await server.get_stats("event:event_mod")
+    assert (stats["leads_PENDING"], stats["leads_VERIFIED"]) == (6, 6), stats
+    print("✅ A failed write stops the batch; later chunks are skipped and not counted")
+
+async def main():
+    await seed()
+    async with api_client() as http:
+        await check_pending_queue(http)
+        await check_decisions(http)
+        await check_failed_chunk(http)
+        report = await server.reconcile_stats(dry_run=True)
+        assert report["drift"] == [], report["drift"]
+
+def test_admin_moderation():
+    run(main)
+
+if __name__ == "__main__":
+    test_admin_moderation()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Keyset pagination and filters on the admin user, mentor and lead lists. Many
+rows share a created_at, so pages must break ties on id.
+"""
+
+from datetime import datetime, timezone, timedelta
+
+from conftest import api_client, run, seed_users, server, session_cookie, user_doc
+
+ADMIN = session_cookie("session_000")
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+async def seed():
+    await seed_users(*(user_doc(
+        f"user_{i:03d}",
+        "ADMIN" if i == 0 else "MENTOR" if i % 4 == 0 else "USER",
+        name=f"User {i}",
+        created_at=NOW - timedelta(hours=i // 5)
+    ) for i in range(120)))
+    await server.db.mentors.insert_many([{
+        "mentor_id": f"mentor_{i:03d}",
+        "user_id": f"user_{i:03d}",
+        "verification_status": "APPROVED" if i % 8 == 0 else "PENDING",
+        "created_at": NOW - timedelta(hours=i // 5)
+    } for i in range(4, 120, 4)])
+    await server.db.events.insert_one({
+        "event_id": "event_page",
+        "mentor_id": "mentor_004",
+        "title": "Paged Dinner",
+        "description": "d",
+        "category": "Food",
+        "event_datetime": NOW,
+        "duration": 60,
+        "available_slots": 10,
+        "price_per_lead": 100.0,
+        "created_at": NOW
+    })
+    await server.db.leads.insert_many([{
+        "lead_id": f"lead_{i:04d}",
+        "event_id": "event_page",
+        "user_id": f"user_{i % 120:03d}",
+        "name": f"Guest {i}",
+        "email": f"guest{i}@example.com",
+        "phone": "9876543210",
+        "status": ["PENDING", "VERIFIED", "REJECTED"][i % 3],
+        "verification_status": "AUTO_VERIFIED",
+        "created_at": NOW - timedelta(minutes=i // 7)
+    } for i in range(700)])
+
+async def walk(http, url, **params):
+    """Follow X-Next-Cursor to the end; returns every row"""
+    rows, cursor = [], None
+    while True:
+        page = await http.get(url, params={**params, **({"cursor": cursor} if cursor else {})}, headers=ADMIN)
+        assert page.status_code == 200, page.text
+        rows += page.json()
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows
+
+def check_order(rows, id_field, descending):
+    keys = [(row["created_at"], row[id_field]) for row in rows]
+    assert keys == sorted(keys, reverse=descending), "rows out of order"
+    assert len(set(keys)) == len(keys), "rows repeated across pages"
+
+async def check_leads(http):
+    rows = await walk(http, "/api/admin/leads", limit=64)
+    assert len(rows) == 700
+    check_order(rows, "lead_id", descending=True)
+    assert rows[0]["event_title"] == "Paged Dinner"
+
+    verified = await walk(http, "/api/admin/leads", limit=50, status="VERIFIED", order="asc")
+    assert len(verified) == len(range(1, 700, 3)) and {r["status"] for r in verified} == {"VERIFIED"}
+    check_order(verified, "lead_id", descending=False)
+
+    recent = await walk(http, "/api/admin/leads", limit=9, created_from=(NOW - timedelta(minutes=9)).isoformat())
+    assert len(recent) == 70, len(recent)
+    print("✅ Leads page through every row, filtered by status and created_at")
+
+async def check_users_and_mentors(http):
+    users = await walk(http, "/api/admin/users", limit=17)
+    assert len(users) == 120
+    check_order(users, "user_id", descending=True)
+    mentors_only = await walk(http, "/api/admin/users", limit=5, role="MENTOR")
+    assert len(mentors_only) == 29 and {u["role"] for u in mentors_only} == {"MENTOR"}
+
+    pending = await walk(http, "/api/admin/mentors", limit=4, verification_status="PENDING")
+    assert len(pending) == 15 and all(m["name"].startswith("User ") for m in pending)
+    check_order(pending, "mentor_id", descending=True)
+    print("✅ Users and mentors page with role and verification filters")
+
+async def check_bad_input(http):
+    assert (await http.get("/api/admin/leads?cursor=not-a-cursor", headers=ADMIN)).status_code == 400
+    assert (await http.get("/api/admin/leads?order=sideways", headers=ADMIN)).status_code == 422
+    assert (await http.get("/api/admin/users?role=OWNER", headers=ADMIN)).status_code == 422
+    print("✅ Bad cursors and filters are rejected")
+
+async def main():
+    await seed()
+    async with api_client() as http:
+        await check_leads(http)
+        await check_users_and_mentors(http)
+        await check_bad_input(http)
+
+def test_admin_pagination():
+    run(main)
+
+if __name__ == "__main__":
+    test_admin_pagination()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Batch invite and pass racing a single-lead action: a lead that leaves PURCHASED
+between loading and updating is reported as not applied, and gets no
+invitation, email or counter change.
+"""
+
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from conftest import api_client, run, seed_users, server, session_cookie, user_doc
+
+HOST = session_cookie("session_host")
+
+async def seed():
+    now = datetime.now(timezone.utc)
+    await seed_users(user_doc("user_host", "MENTOR", name="Host"), *(user_doc(f"user_guest_{i}") for i in range(6)))
+    await server.db.mentors.insert_one({
+        "mentor_id": "mentor_host",
+        "user_id": "user_host",
+        "verification_status": "APPROVED",
+        "created_at": now
+    })
+    await server.db.events.insert_one({
+        "event_id": "event_race",
+        "mentor_id": "mentor_host",
+        "title": "Race Dinner",
+        "description": "d",
+        "category": "Food",
+        "event_datetime": now + timedelta(days=7),
+        "duration": 120,
+        "available_slots": 10,
+        "price_per_lead": 100.0,
+        "created_at": now
+    })
+    await server.db.leads.insert_many([{
+        "lead_id": f"lead_{i}",
+        "event_id": "event_race",
+        "user_id": f"user_guest_{i}",
+        "name": f"Guest {i}",
+        "email": f"guest{i}@example.com",
+        "phone": "9876543210",
+        "status": "PURCHASED",
+        "created_at": now
+    } for i in range(6)])
+    await server.reconcile_stats()
+
+def race_on(patch, lead_id):
+    """Pass `lead_id` right after the batch has loaded it as PURCHASED"""
+    load = server.load_purchased_leads
+
+    async def load_then_race(*args):
+        loaded = await load(*args)
+        await server.db.leads.update_one({"lead_id": lead_id}, {"$set": {"status": "PASSED"}})
+        await server.bump_stats(server.lead_transition("PURCHASED", "PASSED"), "mentor_host", "event_race")
+        return loaded
+    patch.setattr(server, "load_purchased_leads", load_then_race)
+
+async def batch(http, action, lead_ids, **body):
+    response = await http.post(f"/api/mentor/events/event_race/{action}-batch", json={"lead_ids": lead_ids, **body}, headers=HOST)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def errors(result):
+    return {r["lead_id"]: r.get("error") for r in result["results"] if not r["applied"]}
+
+async def check_invite_race(http):
+    with pytest.MonkeyPatch.context() as patch:
+        race_on(patch, "lead_1")
+        result = await batch(http, "invite", ["lead_0", "lead_1", "lead_2"], ticket_price=20)
+    assert result["applied"] == 2 and errors(result) == {"lead_1": "Lead changed concurrently"}, result
+    assert await server.db.invitations.count_documents({"lead_id": "lead_1"}) == 0
+    assert await server.db.email_outbox.count_documents({"dedup_key": {"$regex": "^invitation:"}}) == 2
+    print("✅ Invite batch skips a lead passed mid-request")
+
+async def check_pass_race(http):
+    with pytest.MonkeyPatch.context() as patch:
+        race_on(patch, "lead_4")
+        result = await batch(http, "pass", ["lead_3", "lead_4", "lead_5"])
+    assert result["applied"] == 2 and errors(result) == {"lead_4": "Lead changed concurrently"}, result
+    assert await server.db.email_outbox.count_documents({"dedup_key": {"$regex": "^pass:"}}) == 2
+    print("✅ Pass batch reports a lead passed mid-request as not applied")
+
+async def main():
+    await seed()
+    async with api_client() as http:
+        await check_invite_race(http)
+        await check_pass_race(http)
+        report = await server.reconcile_stats(dry_run=True)
+        assert report["drift"] == [], report["drift"]
+        print("✅ Counters only count the leads each request changed")
+
+def test_batch_leads():
+    run(main)
+
+if __name__ == "__main__":
+    test_batch_leads()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Batch lead purchases that overlap: a lead bought by another payment between
+checkout and verification is left out of the charge and the revenue counters,
+whether that payment is another batch or a single-lead purchase. A batch
+verified twice at once is charged and receipted once.
+"""
+
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from conftest import api_client, run, seed_users, server, session_cookie, user_doc
+
+HOST = session_cookie("session_host")
+
+async def seed():
+    now = datetime.now(timezone.utc)
+    await seed_users(user_doc("user_host", "MENTOR", name="Host"))
+    await server.db.mentors.insert_one({
+        "mentor_id": "mentor_host",
+        "user_id": "user_host",
+        "verification_status": "APPROVED",
+        "created_at": now
+    })
+    await server.db.events.insert_many([{
+        "event_id": f"event_{price}",
+        "mentor_id": "mentor_host",
+        "title": f"Dinner at {price}",
+        "description": "d",
+        "category": "Food",
+        "event_datetime": now + timedelta(days=7),
+        "duration": 120,
+        "available_slots": 10,
+        "price_per_lead": float(price),
+        "mentor_approved": True,
+        "created_at": now
+    } for price in (100, 250)])
+    await server.db.leads.insert_many([{
+        "lead_id": f"lead_{i}",
+        "event_id": "event_250" if i in (3, 4) else "event_100",
+        "user_id": f"user_guest_{i}",
+        "name": f"Guest {i}",
+        "email": f"guest{i}@example.com",
+        "phone": "9876543210",
+        "status": "VERIFIED",
+        "created_at": now
+    } for i in range(8)])
+    await server.reconcile_stats()
+
+async def checkout(http, lead_ids):
+    response = await http.post("/api/mentor/leads/purchase-batch", json={"lead_ids": lead_ids}, headers=HOST)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+async def verify(http, payment):
+    response = await http.post("/api/mentor/payment-verify-batch", json=payment, headers=HOST)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+async def check_overlapping_batches(http):
+    first = await checkout(http, ["lead_0", "lead_1", "lead_3"])
+    second = await checkout(http, ["lead_1", "lead_2", "lead_3", "lead_4"])
+    assert (first["amount"], second["amount"]) == (450, 700)
+
+    assert (await verify(http, first))["amount"] == 450
+    verified = await verify(http, second)
+    assert verified["purchased_count"] == 2 and verified["amount"] == 350, verified
+    assert verified["unavailable_lead_ids"] == ["lead_1", "lead_3"]
+
+    payment = await server.db.payments.find_one({"payment_id": second["payment_id"]})
+    assert (payment["amount"], payment["quoted_amount"]) == (350, 700), payment
+    assert (await server.get_stats("global")).get("lead_revenue") == 800
+    assert (await verify(http, second))["amount"] == 350, "a replay reports the same charge"
+    print("✅ Leads bought by an earlier batch are not charged again")
+
+async def check_single_purchase_after_batch(http):
+    single = (await http.post("/api/mentor/leads/lead_5/purchase", headers=HOST)).json()
+    await verify(http, await checkout(http, ["lead_5"]))
+    response = await http.post("/api/mentor/payment-verify", json=single, headers=HOST)
+    assert response.status_code == 400 and response.json()["detail"] == "Lead already purchased", response.text
+
+    payment = await server.db.payments.find_one({"payment_id": single["payment_id"]})
+    assert payment["status"] != "COMPLETED"
+    assert (await server.get_stats("global")).get("lead_revenue") == 900
+    print("✅ A single-lead payment cannot buy a lead a batch already unlocked")
+
+async def check_concurrent_verify(http):
+    payment = await checkout(http, ["lead_6", "lead_7"])
+    fetch_map = server.fetch_map
+
+    async def slow_fetch_map(*args):
+        # Holds the first verification between its claim and completion
+        await asyncio.sleep(0.2)
+        return await fetch_map(*args)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(server, "fetch_map", slow_fetch_map)
+        first, second = await asyncio.gather(
+            http.post("/api/mentor/payment-verify-batch", json=payment, headers=HOST),
+            http.post("/api/mentor/payment-verify-batch", json=payment, headers=HOST)
+        )
+    assert sorted([first.status_code, second.status_code]) == [200, 409], (first.text, second.text)
+    winner = first if first.status_code == 200 else second
+    assert (winner.json()["purchased_count"], winner.json()["amount"]) == (2, 200)
+
+    replay = await verify(http, payment)
+    assert (replay["purchased_count"], replay["amount"], replay["unavailable_lead_ids"]) == (2, 200, [])
+    receipts = await server.db.email_outbox.find({"dedup_key": f"lead-receipt:{payment['payment_id']}"}).to_list(None)
+    assert [r["subject"] for r in receipts] == ["Lead Purchase Receipt - 2 leads"], receipts
+    assert (await server.get_stats("global")).get("lead_revenue") == 1100
+    print("✅ A double-submitted batch verification charges and receipts once")
+
+async def check_counters_reconcile(http):
+    report = await server.reconcile_stats(dry_run=True)
+    assert report["drift"] == [], report["drift"]
+    print("✅ Revenue counters match the completed payments")
+
+async def main():
+    await seed()
+    async with api_client() as http:
+        await check_overlapping_batches(http)
+        await check_single_purchase_after_batch(http)
+        await check_concurrent_verify(http)
+        await check_counters_reconcile(http)
+
+def test_batch_purchase():
+    run(main)
+
+if __name__ == "__main__":
+    test_batch_purchase()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Stress test: thousands of simultaneous bookings must never oversell an event.
+
+Usage: python test_booking_concurrency.py [--bookings N] [--slots N]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+import httpx
+
+from conftest import api_client, run, seed_users, server, session_cookie, user_doc
+
+async def seed(bookings, slots):
+    now = datetime.now(timezone.utc)
+    await seed_users(*(
+        user_doc(f"user_stress_{i}", name=f"Stress {i}", email=f"stress{i}@example.com") for i in range(bookings)
+    ))
+    await server.db.mentors.insert_one({
+        "mentor_id": "mentor_stress",
+        "user_id": "user_stress_host",
+        "verification_status": "APPROVED",
+        "created_at": now
+    })
+    await server.db.events.insert_one({
+        "event_id": "event_stress",
+        "mentor_id": "mentor_stress",
+        "title": "Flash Sale Dinner",
+        "description": "Limited seats",
+        "category": "Food",
+        "event_datetime": now + timedelta(days=7),
+        "duration": 120,
+        "available_slots": slots,
+        "price_per_lead": 500.0,
+        "mentor_approved": True,
+        "created_at": now
+    })
+
+async def book(http, i):
+    response = await http.post(
+        "/api/events/event_stress/book",
+        json={"name": f"Stress {i}", "email": f"stress{i}@example.com", "phone": "9876543210"},
+        headers=session_cookie(f"session_stress_{i}")
+    )
+    return response.status_code
+
+async def main(bookings, slots):
+    await seed(bookings, slots)
+
+    async with api_client(limits=httpx.Limits(max_connections=None)) as http:
+        statuses = await asyncio.gather(*(book(http, i) for i in range(bookings)))
+
+    confirmed = statuses.count(200)
+    sold_out = statuses.count(400)
+    leads = await server.db.leads.count_documents({"event_id": "event_stress"})
+    event = await server.db.events.find_one({"event_id": "event_stress"})
+
+    print(f"bookings fired: {bookings}, slots: {slots}")
+    print(f"200 OK: {confirmed}, 400 sold out: {sold_out}, other: {bookings - confirmed - sold_out}")
+    print(f"leads stored: {leads}, available_slots left: {event['available_slots']}")
+
+    expected = min(bookings, slots)
+    assert confirmed == expected, f"expected {expected} confirmed bookings, got {confirmed}"
+    assert leads == expected, f"expected {expected} leads, got {leads}"
+    assert event["available_slots"] == slots - expected, "slot counter drifted"
+    assert event["available_slots"] >= 0, "slots went negative"
+    print("✅ No overselling under concurrent bookings")
+
+def test_booking_concurrency():
+    run(main, 2000, 50)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--slots", type=int, default=50)
+    args = parser.parse_args()
+    run(main, args.bookings, args.slots)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Offline test of the email outbox pipeline: dedup, retries with backoff, giving
+up after OUTBOX_MAX_ATTEMPTS, and the background worker. EMAIL_BACKEND=fake
+records messages instead of sending them through Resend.
+"""
+
+import asyncio
+
+from conftest import run, server
+
+async def reset():
+    await server.db.email_outbox.delete_many({})
+    server.fake_resend.sent.clear()
+    server.fake_resend.fail_next = 0
+
+async def check_delivery_and_dedup():
+    await reset()
+    await server.enqueue_email("guest@example.com", "Booking Confirmed", "<p>hi</p>", "booking:lead_1")
+    await server.enqueue_email("guest@example.com", "Booking Confirmed", "<p>hi</p>", "booking:lead_1")
+
+    assert await server.db.email_outbox.count_documents({}) == 1, "dedup key should collapse repeats"
+    assert await server.drain_email_outbox() == 1
+    assert [m["to"] for m in server.fake_resend.sent] == [["guest@example.com"]]
+
+    mail = await server.db.email_outbox.find_one({"dedup_key": "booking:lead_1"})
+    assert mail["status"] == "SENT"
+    print("✅ Email delivered once despite duplicate enqueue")
+
+async def check_retry_then_success():
+    await reset()
+    server.fake_resend.fail_next = 2
+    await server.enqueue_email("host@example.com", "New Lead", "<p>lead</p>", "new-lead:lead_2")
+
+    for _ in range(3):
+        await server.drain_email_outbox()
+
+    mail = await server.db.email_outbox.find_one({"dedup_key": "new-lead:lead_2"})
+    assert mail["status"] == "SENT", mail
+    assert mail["attempts"] == 3, mail
+    assert len(server.fake_resend.sent) == 1
+    print("✅ Failed sends are retried until delivered")
+
+async def check_gives_up_after_max_attempts():
+    await reset()
+    server.fake_resend.fail_next = 10
+    await server.enqueue_email("host@example.com", "Receipt", "<p>r</p>", "lead-receipt:pay_3")
+
+    for _ in range(5):
+        await server.drain_email_outbox()
+
+    mail = await server.db.email_outbox.find_one({"dedup_key": "lead-receipt:pay_3"})
+    assert mail["status"] == "FAILED", mail
+    assert mail["attempts"] == 3, mail
+    assert not server.fake_resend.sent
+    print("✅ Email marked FAILED after OUTBOX_MAX_ATTEMPTS")
+
+async def check_background_worker():
+    await reset()
+    worker = asyncio.create_task(server.run_email_outbox())
+    try:
+        for i in range(20):
+            await server.enqueue_email(f"guest{i}@example.com", "Ticket Confirmed", "<p>t</p>", f"ticket:pay_{i}")
+        for _ in range(50):
+            if len(server.fake_resend.sent) == 20:
+                break
+            await asyncio.sleep(0.1)
+    finally:
+        worker.cancel()
+
+    assert len(server.fake_resend.sent) == 20, len(server.fake_resend.sent)
+    print("✅ Background worker drains the outbox")
+
+async def main():
+    await check_delivery_and_dedup()
+    await check_retry_then_success()
+    await check_gives_up_after_max_attempts()
+    await check_background_worker()
+
+def test_email_outbox():
+    run(main, OUTBOX_BACKOFF_SECONDS=0, OUTBOX_MAX_ATTEMPTS=3)
+
+if __name__ == "__main__":
+    test_email_outbox()
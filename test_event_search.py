@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Event search: ranking, facet counts, filters and host names, checked against
+both search backends (the Mongo text index and the in-process inverted index),
+which must agree on what matches.
+"""
+
+from datetime import datetime, timezone, timedelta
+
+from conftest import api_client, run, seed_users, server, session_cookie, user_doc
+
+HOST_B = session_cookie("session_b")
+HOST_NAMES = {"a": "Asha Rao", "b": "Bruno Costa", "c": "Chen Li"}
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+async def seed():
+    await seed_users(*(user_doc(f"user_{key}", "MENTOR", name=name) for key, name in HOST_NAMES.items()))
+    await server.db.mentors.insert_many([
+        {"mentor_id": "mentor_a", "user_id": "user_a", "expertise": ["startups", "fundraising"], "verification_status": "APPROVED", "created_at": NOW},
+        {"mentor_id": "mentor_b", "user_id": "user_b", "expertise": ["pasta"], "verification_status": "APPROVED", "created_at": NOW},
+        {"mentor_id": "mentor_c", "user_id": "user_c", "expertise": ["startups"], "verification_status": "PENDING", "created_at": NOW},
+    ])
+    events = [
+        ("event_founders", "mentor_a", "Startup Founders Dinner", "An evening of war stories", "Entrepreneurship", 1500, 3),
+        ("event_pasta", "mentor_b", "Italian Cooking Night", "Hand-rolled pasta and wine", "Culinary", 800, 4),
+        ("event_wine", "mentor_b", "Wine and Cheese Evening", "Startup founders welcome", "Culinary", 3000, 5),
+        ("event_pitch", "mentor_a", "Fundraising Workshop", "Rehearse your pitch deck", "Finance", 6000, 6),
+        ("event_hidden", "mentor_c", "Startup Pitch Night", "Unapproved host", "Entrepreneurship", 900, 7),
+        ("event_past", "mentor_b", "Startup Breakfast", "Coffee first", "Entrepreneurship", 500, -2),
+    ]
+    await server.db.events.insert_many([{
+        "event_id": event_id,
+        "mentor_id": mentor_id,
+        "title": title,
+        "description": description,
+        "category": category,
+        "event_datetime": NOW + timedelta(days=days),
+        "duration": 120,
+        "available_slots": 10,
+        "price_per_lead": float(price),
+        "created_at": NOW
+    } for event_id, mentor_id, title, description, category, price, days in events])
+    # Fills in mentor_approved, mentor_name and mentor_expertise as on startup
+    await server.backfill_event_catalog()
+
+async def search(http, **params):
+    response = await http.get("/api/events/search", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def counts(facet):
+    return {row.get("value", row.get("min")): row["count"] for row in facet if row["count"]}
+
+async def check_ranking_and_facets(http):
+    found = await search(http, q="startups")
+    ids = [e["event_id"] for e in found["results"]]
+    assert set(ids) == {"event_founders", "event_past", "event_pitch", "event_wine"}, ids
+    assert ids[0] == "event_founders", "title and expertise matches outrank the rest"
+    assert found["total"] == 4 and found["results"][0]["mentor_name"] == "Asha Rao"
+    assert counts(found["facets"]["category"]) == {"Entrepreneurship": 2, "Culinary": 1, "Finance": 1}
+    assert counts(found["facets"]["price"]) == {0: 1, 1000: 1, 2500: 1, 5000: 1}
+    assert found["facets"]["price"][-1] == {"min": 5000, "max": None, "count": 1}
+
+async def check_filters(http):
+    culinary = await search(http, q="startup", category="Culinary")
+    assert [e["event_id"] for e in culinary["results"]] == ["event_wine"]
+    # A facet ignores its own filter, so the other categories stay selectable
+    assert counts(culinary["facets"]["category"]) == {"Entrepreneurship": 2, "Culinary": 1, "Finance": 1}
+    assert counts(culinary["facets"]["price"]) == {2500: 1}
+
+    cheap = await search(http, q="startup", max_price=2000)
+    assert {e["event_id"] for e in cheap["results"]} == {"event_founders", "event_past"}
+    assert counts(cheap["facets"]["category"]) == {"Entrepreneurship": 2}
+    assert len(counts(cheap["facets"]["price"])) == 4
+
+    upcoming = await search(http, q="startup", upcoming="true", limit=1)
+    assert upcoming["total"] == 3 and len(upcoming["results"]) == 1
+
+async def check_host_names(http):
+    found = await search(http, q="bruno")
+    assert {e["event_id"] for e in found["results"]} == {"event_pasta", "event_wine", "event_past"}, found
+    assert (await search(http, q="chen"))["results"] == [], "unapproved hosts stay hidden"
+
+async def check_host_rename(http):
+    await server.db.users.update_one({"user_id": "user_b"}, {"$set": {"name": "Bruno Silva"}})
+    await server.sync_event_host_name("user_b", "Bruno Silva")
+    assert {e["event_id"] for e in (await search(http, q="silva"))["results"]} == {"event_pasta", "event_wine", "event_past"}
+    assert (await search(http, q="costa"))["results"] == []
+
+async def check_expertise_update(http):
+    assert "event_pasta" not in {e["event_id"] for e in (await search(http, q="fundraising"))["results"]}
+    response = await http.put("/api/mentor/profile", json={"expertise": ["pasta", "fundraising"]}, headers=HOST_B)
+    assert response.status_code == 200, response.text
+    found = await search(http, q="fundraising")
+    assert {"event_pasta", "event_wine"} <= {e["event_id"] for e in found["results"]}, found
+
+async def check_bad_input(http):
+    assert (await search(http, q="the and of"))["results"] == []
+    assert (await http.get("/api/events/search")).status_code == 422
+    assert (await http.get("/api/events/search", params={"q": "x", "limit": 500})).status_code == 422
+
+async def main():
+    await seed()
+    async with api_client() as http:
+        for backend in ("mongo", "memory"):
+            server.SEARCH_BACKEND = backend
+            await server.invalidate_event_cache()
+            await check_ranking_and_facets(http)
+            await check_filters(http)
+            await check_host_names(http)
+            print(f"✅ {backend}: ranked results, facet counts, filters and host names")
+        await check_host_rename(http)
+        await check_expertise_update(http)
+        await check_bad_input(http)
+        print("✅ Host renames and expertise edits reach search; stop-word and bad queries are handled")
+
+def test_event_search():
+    # main switches backends; patching here restores the configured one afterwards
+    run(main, SEARCH_BACKEND=server.SEARCH_BACKEND)
+
+if __name__ == "__main__":
+    test_event_search()
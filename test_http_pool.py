@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Outbound HTTP pool test: OAuth session exchange (including concurrent first
+logins) and Resend delivery through the shared client, and the circuit breaker
+that guards them. The upstreams are served in-process by stub_upstream.py.
+"""
+
+import asyncio
+
+import httpx
+
+import stub_upstream
+from conftest import api_client, run, server
+
+def reset_stub(**config):
+    stub_upstream.app.state.calls = 0
+    stub_upstream.app.state.fail_next = config.get("fail_next", 0)
+    server.circuit_breakers.clear()
+
+async def check_session_exchange(http):
+    reset_stub()
+    first = await http.post("/api/auth/session", json={"session_id": "alice"})
+    second = await http.post("/api/auth/session", json={"session_id": "alice"})
+    assert first.status_code == second.status_code == 200, (first.text, second.text)
+    assert first.json()["email"] == "alice@stub.example.com"
+    assert await server.db.users.count_documents({"email": "alice@stub.example.com"}) == 1
+
+    invalid = await http.post("/api/auth/session", json={"session_id": "invalid"})
+    assert invalid.status_code == 400, invalid.text
+    assert stub_upstream.app.state.calls == 3
+    print("✅ OAuth exchange goes through the shared client")
+
+async def check_concurrent_first_login(http):
+    reset_stub()
+    users_before = (await server.get_stats("global")).get("users", 0)
+    responses = await asyncio.gather(*(
+        http.post("/api/auth/session", json={"session_id": "carol"}) for _ in range(10)
+    ))
+    assert [r.status_code for r in responses] == [200] * 10, [r.text for r in responses]
+    assert len({r.json()["user_id"] for r in responses}) == 1
+    assert await server.db.users.count_documents({"email": "carol@stub.example.com"}) == 1
+    assert await server.db.user_sessions.count_documents({"user_id": responses[0].json()["user_id"]}) == 10
+    assert (await server.get_stats("global")).get("users", 0) == users_before + 1
+    print("✅ Concurrent first logins provision exactly one user")
+
+async def check_circuit_breaker(http):
+    reset_stub(fail_next=3)
+    statuses = [(await http.post("/api/auth/session", json={"session_id": "bob"})).status_code for _ in range(5)]
+    assert statuses == [503] * 5, statuses
+    assert stub_upstream.app.state.calls == 3, "an open circuit must not reach the upstream"
+
+    await asyncio.sleep(0.6)
+    response = await http.post("/api/auth/session", json={"session_id": "bob"})
+    assert response.status_code == 200, response.text
+    assert server.circuit_breakers["oauth"].opened_at is None
+    print("✅ Circuit opens after repeated failures and closes after a good trial call")
+
+async def check_email_delivery():
+    reset_stub(fail_next=1)
+    try:
+        await server.deliver_email("guest@example.com", "Hi", "<p>hi</p>")
+        raise AssertionError("a 503 from Resend must raise so the outbox retries")
+    except httpx.HTTPStatusError:
+        pass
+    email = await server.deliver_email("guest@example.com", "Hi", "<p>hi</p>")
+    assert email["id"].startswith("stub_"), email
+    print("✅ Resend delivery uses the pool and surfaces failures to the outbox")
+
+async def main():
+    server.http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub_upstream.app))
+    async with api_client() as http:
+        await check_session_exchange(http)
+        await check_concurrent_first_login(http)
+        await check_circuit_breaker(http)
+    await check_email_delivery()
+
+def test_http_pool():
+    run(
+        main,
+        EMAIL_BACKEND="resend",
+        RESEND_API_KEY="re_test",
+        RESEND_API_URL="http://stub",
+        OAUTH_SESSION_URL="http://stub/auth/v1/env/oauth/session-data",
+        CIRCUIT_FAILURE_THRESHOLD=3,
+        CIRCUIT_RESET_SECONDS=0.5
+    )
+
+if __name__ == "__main__":
+    test_http_pool()
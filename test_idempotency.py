@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Idempotency-Key handling on the payment endpoints.
+"""
+
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+from conftest import api_client, run, seed_users, server, session_cookie, user_doc
+
+HOST = session_cookie("session_host")
+
+async def seed():
+    now = datetime.now(timezone.utc)
+    await seed_users(user_doc("user_host", "MENTOR", name="Host"))
+    await server.db.mentors.insert_one({
+        "mentor_id": "mentor_host",
+        "user_id": "user_host",
+        "verification_status": "APPROVED",
+        "created_at": now
+    })
+    await server.db.events.insert_one({
+        "event_id": "event_idem",
+        "mentor_id": "mentor_host",
+        "title": "Retry Storm Dinner",
+        "description": "d",
+        "category": "Food",
+        "event_datetime": now + timedelta(days=7),
+        "duration": 120,
+        "available_slots": 10,
+        "price_per_lead": 500.0,
+        "created_at": now
+    })
+    await server.db.leads.insert_many([{
+        "lead_id": f"lead_idem_{i}",
+        "event_id": "event_idem",
+        "user_id": f"user_guest_{i}",
+        "name": f"Guest {i}",
+        "email": f"guest{i}@example.com",
+        "phone": "9876543210",
+        "status": "VERIFIED",
+        "created_at": now
+    } for i in range(2)])
+
+async def check_replayed_purchase(http):
+    headers = {**HOST, "Idempotency-Key": "purchase-0"}
+    first = await http.post("/api/mentor/leads/lead_idem_0/purchase", headers=headers)
+    retry = await http.post("/api/mentor/leads/lead_idem_0/purchase", headers=headers)
+
+    assert first.status_code == retry.status_code == 200, (first.text, retry.text)
+    assert retry.json() == first.json()
+    assert retry.headers.get("Idempotent-Replayed") == "true"
+    assert await server.db.payments.count_documents({"lead_id": "lead_idem_0"}) == 1
+    print("✅ A retried purchase replays the first payment instead of creating another")
+    return first.json()
+
+async def check_replayed_verification(http, payment):
+    headers = {**HOST, "Idempotency-Key": "verify-0"}
+    responses = await asyncio.gather(*(
+        http.post("/api/mentor/payment-verify", json=payment, headers=headers) for _ in range(5)
+    ))
+    statuses = sorted(r.status_code for r in responses)
+    assert 200 in statuses and set(statuses) <= {200, 409}, statuses
+
+    replay = await http.post("/api/mentor/payment-verify", json=payment, headers=headers)
+    assert replay.status_code == 200 and replay.headers.get("Idempotent-Replayed") == "true"
+    assert await server.db.email_outbox.count_documents({"dedup_key": f"lead-receipt:{payment['payment_id']}"}) == 1
+    stats = await server.get_stats("global")
+    assert stats.get("lead_payments") == 1, stats
+    print("✅ Concurrent verifications with one key run the handler once")
+
+async def check_key_reuse_and_failures(http, payment):
+    headers = {**HOST, "Idempotency-Key": "verify-0"}
+    response = await http.post("/api/mentor/payment-verify", json={**payment, "demo_payment_code": "WRONG"}, headers=headers)
+    assert response.status_code == 422, response.text
+
+    headers = {**HOST, "Idempotency-Key": "verify-bad"}
+    response = await http.post("/api/mentor/payment-verify", json={**payment, "demo_payment_code": "WRONG"}, headers=headers)
+    assert response.status_code == 400, response.text
+    assert not await server.db.idempotency_keys.find_one({"_id": "user_host:verify-bad"}), "failed requests must release their key"
+    print("✅ Reused keys are rejected and failed requests can be retried")
+
+async def main():
+    await seed()
+    async with api_client() as http:
+        payment = await check_replayed_purchase(http)
+        await check_replayed_verification(http, payment)
+        await check_key_reuse_and_failures(http, payment)
+
+def test_idempotency():
+    run(main)
+
+if __name__ == "__main__":
+    test_idempotency()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Live updates without a change stream: write handlers publish deltas through
+live_hub to the guest and host who can see them, only whitelisted fields leave
+the server, and a stalled client is told to resync instead of growing a backlog.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from conftest import api_client, run, seed_users, server, session_cookie, user_doc
+
+HOST_A = session_cookie("session_host_a")
+CONTACT_FIELDS = {"name", "email", "phone", "message"}
+
+async def seed():
+    now = datetime.now(timezone.utc)
+    await seed_users(
+        user_doc("user_host_a", "MENTOR"),
+        user_doc("user_host_b", "MENTOR"),
+        *(user_doc(f"user_guest_{i}") for i in range(2))
+    )
+    await server.db.mentors.insert_many([{
+        "mentor_id": f"mentor_{name}",
+        "user_id": f"user_host_{name}",
+        "verification_status": "APPROVED",
+        "created_at": now
+    } for name in ("a", "b")])
+    await server.db.events.insert_many([{
+        "event_id": f"event_{name}",
+        "mentor_id": f"mentor_{name}",
+        "title": f"Dinner {name.upper()}",
+        "description": "d",
+        "category": "Food",
+        "event_datetime": now + timedelta(days=7),
+        "duration": 120,
+        "available_slots": 10,
+        "price_per_lead": 100.0,
+        "created_at": now
+    } for name in ("a", "b")])
+    await server.db.leads.insert_many([{
+        "lead_id": f"lead_{i}",
+        "event_id": "event_a",
+        "user_id": f"user_guest_{i}",
+        "name": f"Guest {i}",
+        "email": f"guest{i}@example.com",
+        "phone": "9876543210",
+        "message": "Hello",
+        "status": "PURCHASED",
+        "created_at": now
+    } for i in range(2)])
+
+def drain(queue):
+    messages = []
+    while not queue.empty():
+        messages.append(queue.get_nowait())
+    return messages
+
+def summary(messages):
+    return {(m["type"], m["op"], m["data"].get("lead_id"), m["data"].get("status")) for m in messages}
+
+async def check_routing(http):
+    host_a = server.live_hub.subscribe(["mentor:mentor_a"])
+    host_b = server.live_hub.subscribe(["mentor:mentor_b"])
+    guest = server.live_hub.subscribe(["user:user_guest_0"])
+
+    response = await http.post("/api/mentor/leads/lead_0/invite", json={"ticket_price": 50}, headers=HOST_A)
+    assert response.status_code == 200, response.text
+    response = await http.post("/api/mentor/leads/lead_1/pass", headers=HOST_A)
+    assert response.status_code == 200, response.text
+
+    to_host, to_guest = drain(host_a), drain(guest)
+    assert summary(to_host) == {
+        ("invitation", "insert", "lead_0", "PENDING"),
+        ("lead", "update", "lead_0", "INVITED"),
+        ("lead", "update", "lead_1", "PASSED")
+    }, to_host
+    assert summary(to_guest) == {("invitation", "insert", "lead_0", "PENDING"), ("lead", "update", "lead_0", "INVITED")}, to_guest
+    assert drain(host_b) == [], "another host sees nothing"
+    for message in to_host + to_guest:
+        assert not CONTACT_FIELDS & set(message["data"]), message
+
+    # A new booking reaches the guest but stays off the host's dashboard until verified
+    await server.publish_change("leads", "insert", {
+        "lead_id": "lead_new",
+        "event_id": "event_a",
+        "user_id": "user_guest_0",
+        "email": "guest0@example.com",
+        "phone": "9876543210",
+        "status": "PENDING"
+    })
+    assert drain(host_a) == []
+    assert drain(guest) == [{"type": "lead", "op": "insert", "data": {"lead_id": "lead_new", "event_id": "event_a", "status": "PENDING"}}]
+    for queue, audience in ((host_a, "mentor:mentor_a"), (host_b, "mentor:mentor_b"), (guest, "user:user_guest_0")):
+        server.live_hub.unsubscribe([audience], queue)
+    print("✅ Deltas reach only the guest and host of the lead, without contact details")
+
+async def check_resync():
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(server, "LIVE_QUEUE_SIZE", 2)
+        queue = server.live_hub.subscribe(["user:user_guest_1"])
+    for i in range(3):
+        server.live_hub.publish(["user:user_guest_1"], {"type": "lead", "op": "update", "data": {"lead_id": f"lead_{i}"}})
+    assert drain(queue) == [{"type": "resync", "op": "resync", "data": {}}]
+    server.live_hub.unsubscribe(["user:user_guest_1"], queue)
+    assert server.live_hub.subscribers == {}
+    print("✅ A full queue is replaced by a single resync message")
+
+class DisconnectableRequest:
+    """Stands in for the SSE request; the stream ends once disconnected is set"""
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+async def check_stream():
+    user = server.User(**await server.db.users.find_one({"user_id": "user_host_a"}))
+    request = DisconnectableRequest()
+    response = await server.live_updates(request, user)
+    stream = response.body_iterator
+    assert await stream.__anext__() == "retry: 5000\n\n"
+
+    # The subscription starts with the stream; a host also hears its own guest events
+    pending = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)
+    assert set(server.live_hub.subscribers) == {"user:user_host_a", "mentor:mentor_a"}
+    await server.publish_change("leads", "update", {"lead_id": "lead_1", "event_id": "event_a", "user_id": "user_guest_1", "status": "PASSED"})
+    event = await asyncio.wait_for(pending, timeout=5)
+    name, data = event.strip().split("\n")
+    assert name == "event: lead" and json.loads(data.removeprefix("data: "))["data"]["status"] == "PASSED", event
+
+    request.disconnected = True
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert server.live_hub.subscribers == {}, "a disconnected stream unsubscribes"
+    print("✅ /api/live streams a host's deltas as server-sent events")
+
+async def main():
+    await seed()
+    async with api_client() as http:
+        await check_routing(http)
+    await check_resync()
+    await check_stream()
+
+def test_live_updates():
+    run(main)
+
+if __name__ == "__main__":
+    test_live_updates()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Offline test of the public event response cache and its invalidation, with
+RESPONSE_CACHE_BACKEND=fake-redis so the shared-cache code path runs without Redis.
+"""
+
+from datetime import datetime, timezone, timedelta
+
+from conftest import api_client, run, seed_users, server, session_cookie, user_doc
+
+HOST = session_cookie("session_cache_host")
+GUEST = session_cookie("session_cache_guest")
+ADMIN = session_cookie("session_cache_admin")
+
+async def seed():
+    now = datetime.now(timezone.utc)
+    await seed_users(
+        user_doc("user_cache_host", "MENTOR"),
+        user_doc("user_cache_guest", "USER"),
+        user_doc("user_cache_admin", "ADMIN")
+    )
+    await server.db.mentors.insert_one({
+        "mentor_id": "mentor_cache",
+        "user_id": "user_cache_host",
+        "verification_status": "APPROVED",
+        "bio": "Chef",
+        "created_at": now
+    })
+    await server.db.events.insert_one({
+        "event_id": "event_cache",
+        "mentor_id": "mentor_cache",
+        "title": "Supper Club",
+        "description": "Six courses",
+        "category": "Food",
+        "event_datetime": now + timedelta(days=7),
+        "duration": 120,
+        "available_slots": 10,
+        "price_per_lead": 500.0,
+        "mentor_approved": True,
+        "created_at": now
+    })
+
+async def check_etag_and_304(http):
+    first = await http.get("/api/events")
+    second = await http.get("/api/events")
+    assert first.status_code == second.status_code == 200
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["cache-control"].startswith("public")
+
+    conditional = await http.get("/api/events", headers={"If-None-Match": first.headers["etag"]})
+    assert conditional.status_code == 304, conditional.status_code
+    assert conditional.content == b""
+    print("✅ Cached list carries a stable ETag and answers 304")
+
+async def check_booking_invalidates(http):
+    before = (await http.get("/api/events/event_cache")).json()["available_slots"]
+    response = await http.post(
+        "/api/events/event_cache/book",
+        json={"name": "Guest", "email": "guest@example.com", "phone": "9876543210"},
+        headers=GUEST
+    )
+    assert response.status_code == 200, response.text
+    detail = (await http.get("/api/events/event_cache")).json()
+    listed = (await http.get("/api/events")).json()
+    assert detail["available_slots"] == before - 1
+    assert listed[0]["available_slots"] == before - 1
+    print("✅ Booking refreshes cached detail and list")
+
+async def check_host_writes_invalidate(http):
+    await http.put("/api/mentor/events/event_cache", json={"title": "Late Supper Club"}, headers=HOST)
+    assert (await http.get("/api/events/event_cache")).json()["title"] == "Late Supper Club"
+    assert (await http.get("/api/events")).json()[0]["title"] == "Late Supper Club"
+
+    await http.put("/api/mentor/profile", json={"bio": "Pastry chef"}, headers=HOST)
+    assert (await http.get("/api/events/event_cache")).json()["mentor_bio"] == "Pastry chef"
+    print("✅ Event and profile edits refresh cached responses")
+
+async def check_mentor_rejection_invalidates(http):
+    await http.put("/api/admin/mentors/mentor_cache/verify", json={"status": "REJECTED"}, headers=ADMIN)
+    assert (await http.get("/api/events")).json() == []
+    print("✅ Rejecting a host drops their events from cached lists")
+
+async def main():
+    await seed()
+    async with api_client() as http:
+        await check_etag_and_304(http)
+        await check_booking_invalidates(http)
+        await check_host_writes_invalidate(http)
+        await check_mentor_rejection_invalidates(http)
+
+def test_response_cache():
+    run(main, RESPONSE_CACHE_BACKEND="fake-redis")
+
+if __name__ == "__main__":
+    test_response_cache()
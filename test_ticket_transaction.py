@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Transaction test of the ticket payment state machine.
+
+Multi-document transactions need a replica set. MONGO_URL is used if it points
+at one, e.g. mongodb://localhost:27017/?replicaSet=rs0 (see README); otherwise
+a throwaway single-node replica set is started when mongod is on the PATH.
+
+Usage: python test_ticket_transaction.py [--verifications N]
+"""
+
+import argparse
+import asyncio
+import atexit
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone, timedelta
+
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from conftest import api_client, run, seed_users, server, session_cookie, user_doc
+
+def start_replica_set():
+    """Start mongod as a single-node replica set on a free port; returns (process, url)"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    dbpath = tempfile.mkdtemp(prefix="rs_test_")
+    process = subprocess.Popen(
+        ["mongod", "--replSet", "rs_test", "--port", str(port), "--bind_ip", "127.0.0.1", "--dbpath", dbpath],
+        stdout=subprocess.DEVNULL
+    )
+    direct = MongoClient(f"mongodb://127.0.0.1:{port}/?directConnection=true", serverSelectionTimeoutMS=20000)
+    direct.admin.command("replSetInitiate", {"_id": "rs_test", "members": [{"_id": 0, "host": f"127.0.0.1:{port}"}]})
+    deadline = time.monotonic() + 30
+    while not direct.admin.command("hello").get("isWritablePrimary"):
+        if time.monotonic() > deadline:
+            raise RuntimeError("replica set did not elect a primary")
+        time.sleep(0.2)
+    direct.close()
+    return process, f"mongodb://127.0.0.1:{port}/?replicaSet=rs_test"
+
+def replica_set_url() -> str:
+    """MONGO_URL when it is a replica set, else a throwaway one if mongod is installed"""
+    url = os.environ["MONGO_URL"]
+    with MongoClient(url, serverSelectionTimeoutMS=2000) as probe:
+        try:
+            if probe.admin.command("hello").get("setName"):
+                return url
+        except PyMongoError:
+            pass
+    if not shutil.which("mongod"):
+        return url
+    mongod, url = start_replica_set()
+    atexit.register(mongod.terminate)
+    return url
+
+async def seed(suffix):
+    """A guest holding an unpaid invitation and a pending ticket payment"""
+    now = datetime.now(timezone.utc)
+    guest_id = f"user_guest_{suffix}"
+    await seed_users(user_doc(guest_id, name="Guest"))
+    await server.db.leads.insert_one({
+        "lead_id": f"lead_{suffix}",
+        "event_id": "event_txn",
+        "user_id": guest_id,
+        "status": "INVITED",
+        "created_at": now
+    })
+    await server.db.invitations.insert_one({
+        "invitation_id": f"inv_{suffix}",
+        "lead_id": f"lead_{suffix}",
+        "event_id": "event_txn",
+        "host_id": "mentor_txn",
+        "guest_id": guest_id,
+        "ticket_price": 1500,
+        "status": "PENDING",
+        "created_at": now
+    })
+    await server.db.ticket_payments.insert_one({
+        "payment_id": f"ticket_pay_{suffix}",
+        "invitation_id": f"inv_{suffix}",
+        "guest_id": guest_id,
+        "demo_payment_code": "TICKETTXN",
+        "amount": 1500,
+        "status": "PENDING",
+        "type": "TICKET",
+        "created_at": now
+    })
+    return session_cookie(f"session_guest_{suffix}"), {"payment_id": f"ticket_pay_{suffix}", "demo_payment_code": "TICKETTXN"}
+
+async def state(suffix):
+    payment = await server.db.ticket_payments.find_one({"payment_id": f"ticket_pay_{suffix}"})
+    invitation = await server.db.invitations.find_one({"invitation_id": f"inv_{suffix}"})
+    lead = await server.db.leads.find_one({"lead_id": f"lead_{suffix}"})
+    tickets = await server.db.tickets.count_documents({"payment_id": f"ticket_pay_{suffix}"})
+    return payment["status"], invitation["status"], lead["status"], tickets
+
+async def check_concurrent_verifications(http, verifications):
+    headers, body = await seed("race")
+    responses = await asyncio.gather(*(
+        http.post("/api/user/ticket-payment-verify", json=body, headers=headers) for _ in range(verifications)
+    ))
+
+    assert [r.status_code for r in responses] == [200] * verifications, [r.text for r in responses if r.status_code != 200]
+    ticket_ids = {r.json()["ticket_id"] for r in responses}
+    assert len(ticket_ids) == 1, f"replays returned different tickets: {ticket_ids}"
+    assert await state("race") == ("COMPLETED", "PAID", "CONFIRMED", 1), await state("race")
+
+    stats = await server.get_stats("event:event_txn")
+    assert stats.get("ticket_payments") == 1 and stats.get("ticket_revenue") == 1500, stats
+    print(f"✅ {verifications} concurrent verifications issued exactly one ticket")
+
+async def check_rollback(http):
+    headers, body = await seed("crash")
+    complete_ticket_payment = server.complete_ticket_payment
+
+    async def crash_before_commit(payment, session=None):
+        await complete_ticket_payment(payment, session)
+        raise RuntimeError("simulated crash before commit")
+
+    server.complete_ticket_payment = crash_before_commit
+    try:
+        response = await http.post("/api/user/ticket-payment-verify", json=body, headers=headers)
+    finally:
+        server.complete_ticket_payment = complete_ticket_payment
+
+    assert response.status_code == 500, response.text
+    assert await state("crash") == ("PENDING", "PENDING", "INVITED", 0), await state("crash")
+
+    response = await http.post("/api/user/ticket-payment-verify", json=body, headers=headers)
+    assert response.status_code == 200, response.text
+    assert await state("crash") == ("COMPLETED", "PAID", "CONFIRMED", 1), await state("crash")
+    print("✅ A failure mid-transition rolls every write back")
+
+async def main(verifications):
+    assert await server.supports_transactions(), "MONGO_URL is not a replica set and mongod is not on the PATH"
+
+    async with api_client(raise_app_exceptions=False) as http:
+        await check_concurrent_verifications(http, verifications)
+        await check_rollback(http)
+
+def test_ticket_transaction():
+    run(main, 25, mongo_url=replica_set_url())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verifications", type=int, default=25)
+    args = parser.parse_args()
+    run(main, args.verifications, mongo_url=replica_set_url())